@@ -0,0 +1,116 @@
+# app/auth.py
+"""
+Supabase access-token verification with a cache of already verified tokens.
+
+The frontend re-sends the same token many times a minute, so a verified
+token's `sub` is kept (keyed by the token's SHA-256 digest) until the token's
+own `exp`. Tokens without `exp` are verified every time.
+
+HS256 tokens are checked against SUPABASE_JWT_SECRET. Asymmetric tokens
+(RS256 / ES256) are checked against the key with the matching `kid` in a
+local JWKS file (SUPABASE_JWKS_FILE); the key set is read once and re-read
+only when the file changes.
+
+Env:
+  SUPABASE_JWT_SECRET      HS256 shared secret
+  SUPABASE_JWKS_FILE       path to a JWKS JSON file (optional)
+  AUTH_TOKEN_CACHE_SIZE    verified tokens kept (default 1024; 0 disables)
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from jose import jwt
+
+from app.cache import LRUCache
+
+HMAC_ALGORITHM = "HS256"
+ASYMMETRIC_ALGORITHMS = ("RS256", "ES256")
+
+token_cache = LRUCache(maxsize=int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "1024")))
+
+_jwks: Optional[Dict[str, Any]] = None
+_jwks_stamp: Optional[Tuple[str, float]] = None
+_jwks_lock = threading.Lock()
+
+
+class InvalidToken(Exception):
+    pass
+
+
+def _load_jwks() -> Dict[str, Any]:
+    """Returns {kid: jwk} from SUPABASE_JWKS_FILE, cached until the file changes."""
+    global _jwks, _jwks_stamp
+    path = os.getenv("SUPABASE_JWKS_FILE")
+    if not path:
+        raise InvalidToken("Asymmetric token but no SUPABASE_JWKS_FILE configured")
+
+    try:
+        stamp = (path, os.path.getmtime(path))
+    except OSError as e:
+        raise InvalidToken(f"JWKS file unreadable: {e}")
+    if _jwks is not None and _jwks_stamp == stamp:
+        return _jwks
+
+    with _jwks_lock:
+        if _jwks is None or _jwks_stamp != stamp:
+            with open(path, encoding="utf-8") as f:
+                keys = json.load(f).get("keys", [])
+            _jwks = {k.get("kid"): k for k in keys}
+            _jwks_stamp = stamp
+    return _jwks
+
+
+def _verification_key(token: str) -> Tuple[Any, str]:
+    """Picks the key from the header's alg/kid; the alg is pinned to the key type."""
+    try:
+        header = jwt.get_unverified_header(token)
+    except Exception:
+        raise InvalidToken("Malformed token header")
+
+    alg = header.get("alg")
+    if alg == HMAC_ALGORITHM:
+        secret = os.getenv("SUPABASE_JWT_SECRET")
+        if not secret:
+            raise InvalidToken("SUPABASE_JWT_SECRET missing")
+        return secret, alg
+    if alg in ASYMMETRIC_ALGORITHMS:
+        key = _load_jwks().get(header.get("kid"))
+        if not key:
+            raise InvalidToken("Unknown signing key")
+        return key, alg
+    raise InvalidToken(f"Unsupported token algorithm: {alg}")
+
+
+def verify_token(token: str) -> str:
+    """Returns the token's `sub`, from cache when this exact token was verified before."""
+    digest = hashlib.sha256(token.encode("utf-8")).digest()
+    sub = token_cache.get(digest)
+    if sub is not None:
+        return sub
+
+    key, alg = _verification_key(token)
+    try:
+        payload = jwt.decode(token, key, algorithms=[alg], options={"verify_aud": False})
+    except Exception:
+        raise InvalidToken("Invalid token")
+
+    sub = payload.get("sub")
+    if not sub:
+        raise InvalidToken("Invalid token (sub missing)")
+
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        remaining = exp - time.time()
+        if remaining > 0:
+            token_cache.put(digest, sub, ttl=remaining)
+    return sub
+
+
+def token_cache_stats() -> Dict[str, int]:
+    return {"size": len(token_cache), "hits": token_cache.hits, "misses": token_cache.misses}
@@ -1,103 +1,478 @@
 from __future__ import annotations
 
+from dataclasses import dataclass, fields
 from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 from uuid import UUID
 
+import numpy as np
+
 from app.scenarios.schemas import ForecastParametersOut
-from .schemas import SimulationOutput, YearlyResult, SimulationRunOptions
+from .schemas import (
+    BatchVariantResult,
+    SimulationBatchOut,
+    SimulationBatchRequest,
+    SimulationOutput,
+    SimulationRunOptions,
+    SimulationVariant,
+    YearlyResult,
+)
 
 
-def run_ronet_simulation(
-    project_id: UUID,
+# Bump whenever a change alters engine output; part of the memoization key.
+ENGINE_VERSION = "2"
+
+# Unit costs (R per km per year) used to size the annual maintenance need
+UNIT_COST_PAVED = 160_000
+UNIT_COST_GRAVEL = 45_000
+
+# Replacement cost rates used when the snapshot carries no asset value
+CRC_RATE_PAVED = 3_500_000
+CRC_RATE_GRAVEL = 250_000
+
+
+# -----------------------------------------------------------------------------
+# Batch containers (columnar, one row per scenario)
+# -----------------------------------------------------------------------------
+@dataclass
+class ScenarioBatch:
+    """
+    N scenarios laid out as 1-D arrays of equal length.
+    Rates are fractions (0.06), not percentages.
+    Unit costs, decay_scale and improvement_scale default to the engine
+    constants when omitted.
+    budget_cap is an annual spend ceiling in start-year Rand (escalated by CPI
+    each year); omitted means uncapped, i.e. the full need is funded.
+    """
+    paved_km: np.ndarray
+    gravel_km: np.ndarray
+    start_vci: np.ndarray
+    asset_value: np.ndarray
+    inflation: np.ndarray
+    discount_rate: np.ndarray
+    unit_cost_paved: Optional[np.ndarray] = None
+    unit_cost_gravel: Optional[np.ndarray] = None
+    decay_scale: Optional[np.ndarray] = None   # multiplier on do-nothing VCI decay
+    budget_cap: Optional[np.ndarray] = None
+    improvement_scale: Optional[np.ndarray] = None   # multiplier on the funded VCI gain
+
+    def __post_init__(self) -> None:
+        n = self.size
+        if self.unit_cost_paved is None:
+            self.unit_cost_paved = np.full(n, float(UNIT_COST_PAVED))
+        if self.unit_cost_gravel is None:
+            self.unit_cost_gravel = np.full(n, float(UNIT_COST_GRAVEL))
+        if self.decay_scale is None:
+            self.decay_scale = np.ones(n)
+        if self.budget_cap is None:
+            self.budget_cap = np.full(n, np.inf)
+        if self.improvement_scale is None:
+            self.improvement_scale = np.ones(n)
+
+    @property
+    def size(self) -> int:
+        return int(self.paved_km.shape[0])
+
+    def repeat(self, n: int) -> "ScenarioBatch":
+        """Tiles every scenario row n times (row order: r0 x n, r1 x n, ...)."""
+        return ScenarioBatch(**{f.name: np.repeat(getattr(self, f.name), n) for f in fields(self)})
+
+
+@dataclass
+class BatchResult:
+    """
+    Columnar engine output: per-year metrics are (N, T) arrays, totals are (N,).
+    Values are unrounded; rounding happens when converting to API schemas.
+    """
+    years: np.ndarray
+    avg_condition_index: np.ndarray
+    pct_good: np.ndarray
+    pct_fair: np.ndarray
+    pct_poor: np.ndarray
+    total_maintenance_cost: np.ndarray
+    asset_value: np.ndarray
+    cumulative_cost_npv: np.ndarray
+    total_cost_npv: np.ndarray
+
+
+# -----------------------------------------------------------------------------
+# Input helpers
+# -----------------------------------------------------------------------------
+def duration_for(params: ForecastParametersOut) -> int:
+    return int(getattr(params, "analysis_duration", 5) or 5)
+
+
+def start_year_for(start_year_override: Optional[int]) -> int:
+    return start_year_override or (datetime.now(timezone.utc).year + 1)
+
+
+def _initial_asset_value(network_profile: dict, paved_km: float, gravel_km: float) -> float:
+    asset_value = float(network_profile.get("assetValue", 0) or 0)
+    # Recalculate asset value if it's missing but we have km
+    if asset_value == 0 and (paved_km > 0 or gravel_km > 0):
+        asset_value = (paved_km * CRC_RATE_PAVED) + (gravel_km * CRC_RATE_GRAVEL)
+    return asset_value
+
+
+def build_scenario_batch(
     params: ForecastParametersOut,
     network_profile: dict,
-    options: SimulationRunOptions,
-) -> SimulationOutput:
+    variants: Iterable[SimulationVariant],
+) -> ScenarioBatch:
     """
-    Enhanced RoNET-style simulation.
+    Expands saved assumptions + network profile into one row per variant.
+    Fields a variant leaves unset fall back to the saved values.
     """
+    base_cpi = float(getattr(params, "cpi_percentage", 6.0) or 6.0)
+    base_discount = float(getattr(params, "discount_rate", 8.0) or 8.0)
+    base_vci = float(network_profile.get("avgVci", 50) or 50)
 
-    yearly_results = []
+    rows = []
+    for v in variants:
+        paved = float(network_profile.get("pavedLengthKm", 0) or 0) if v.include_paved else 0.0
+        gravel = float(network_profile.get("gravelLengthKm", 0) or 0) if v.include_gravel else 0.0
+        cpi = v.cpi_percentage if v.cpi_percentage is not None else base_cpi
+        discount = v.discount_rate if v.discount_rate is not None else base_discount
+        vci = v.start_vci if v.start_vci is not None else base_vci
+        rows.append((
+            paved,
+            gravel,
+            vci,
+            _initial_asset_value(network_profile, paved, gravel),
+            cpi / 100.0,
+            discount / 100.0,
+        ))
 
-    # 1) Determine Scope
-    paved_km = network_profile.get("pavedLengthKm", 0) if options.include_paved else 0
-    gravel_km = network_profile.get("gravelLengthKm", 0) if options.include_gravel else 0
+    cols = np.array(rows, dtype=np.float64).reshape(-1, 6)
+    return ScenarioBatch(
+        paved_km=cols[:, 0],
+        gravel_km=cols[:, 1],
+        start_vci=cols[:, 2],
+        asset_value=cols[:, 3],
+        inflation=cols[:, 4],
+        discount_rate=cols[:, 5],
+    )
 
-    # 2) Time Setup
-    duration = int(getattr(params, "analysis_duration", 5) or 5)
-    start_year = options.start_year_override or (datetime.now(timezone.utc).year + 1)
 
-    # 3) Economic Parameters
-    inflation = float(getattr(params, "cpi_percentage", 6.0) or 6.0) / 100.0
-    discount_rate = float(getattr(params, "discount_rate", 8.0) or 8.0) / 100.0
+def annual_need(batch: ScenarioBatch) -> np.ndarray:
+    """Start-year maintenance need per scenario before the condition factor."""
+    return (batch.paved_km * batch.unit_cost_paved) + (batch.gravel_km * batch.unit_cost_gravel)
 
-    # 4) Unit Costs
-    UNIT_COST_PAVED = 160_000
-    UNIT_COST_GRAVEL = 45_000
 
-    base_annual_need = (float(paved_km) * UNIT_COST_PAVED) + (float(gravel_km) * UNIT_COST_GRAVEL)
+@dataclass
+class YearStep:
+    """One simulated year for every scenario in the batch; arrays are (N,)."""
+    index: int
+    year: int
+    avg_condition_index: np.ndarray
+    total_maintenance_cost: np.ndarray
+    asset_value: np.ndarray
+    cumulative_cost_npv: np.ndarray
 
-    # Initial States
-    current_vci = float(network_profile.get("avgVci", 50) or 50)
-    current_asset_value = float(network_profile.get("assetValue", 0) or 0)
-    
-    # Recalculate asset value if it's missing but we have km
-    if current_asset_value == 0 and (paved_km > 0 or gravel_km > 0):
-         current_asset_value = (paved_km * 3500000) + (gravel_km * 250000)
 
+def condition_distribution(vci: np.ndarray):
+    """(pct_good, pct_fair, pct_poor) derived from end-of-year VCI; works on any shape."""
+    pct_good = np.clip((vci - 30) * 1.5, 0.0, 100.0)
+    pct_poor = np.clip((70 - vci) * 1.5, 0.0, 100.0)
+    pct_fair = np.maximum(0.0, 100.0 - pct_good - pct_poor)
+    return pct_good, pct_fair, pct_poor
+
+
+# -----------------------------------------------------------------------------
+# Vectorized engine (all scenarios advance together, one step per year)
+# -----------------------------------------------------------------------------
+def iter_ronet_batch(batch: ScenarioBatch, duration: int, start_year: int) -> Iterator[YearStep]:
+    """
+    RoNET-style simulation for N scenarios at once, yielded year by year.
+    The year loop stays sequential (each year depends on the last);
+    everything inside it is array arithmetic over the scenario axis.
+
+    When spend is capped below the need, the year's outcome blends linearly
+    between "fully funded" (improve) and "do nothing" (decay) by the funded share.
+    """
+    n = batch.size
+
+    base_annual_need = annual_need(batch)
+    is_do_nothing = (batch.paved_km + batch.gravel_km) == 0
+
+    current_vci = batch.start_vci.astype(np.float64, copy=True)
+    current_asset_value = batch.asset_value.astype(np.float64, copy=True)
+    cumulative_npv = np.zeros(n)
+
+    growth = 1 + batch.inflation
+    discount = 1 + batch.discount_rate
+    improvement = 2.5 * batch.improvement_scale
+
+    for i in range(int(duration)):
+        # A) Demand (uses condition at the start of the year)
+        condition_cost_factor = 1.0 + ((100 - current_vci) / 100.0)
+        nominal_need = base_annual_need * condition_cost_factor * (growth ** i)
+
+        # B) Actual spend (need, limited by the escalated budget cap)
+        actual_spend = np.where(is_do_nothing, 0.0, np.minimum(nominal_need, batch.budget_cap * (growth ** i)))
+        funded = np.divide(actual_spend, nominal_need, out=np.ones(n), where=nominal_need > 0)
+
+        # C) Deterioration / improvement
+        decay_rate = np.where(current_vci > 50, 3.5, 5.0) * batch.decay_scale
+        current_vci = np.where(
+            is_do_nothing,
+            np.maximum(0.0, current_vci - decay_rate),
+            np.clip(current_vci + funded * improvement - (1 - funded) * decay_rate, 0.0, 95.0),
+        )
+        current_asset_value = current_asset_value * np.where(
+            is_do_nothing,
+            1 - 0.04,
+            funded * growth + (1 - funded) * (1 - 0.04),
+        )
+
+        # D) NPV
+        cumulative_npv = cumulative_npv + actual_spend / (discount ** i)
+
+        yield YearStep(
+            index=i,
+            year=start_year + i,
+            avg_condition_index=current_vci,
+            total_maintenance_cost=actual_spend,
+            asset_value=current_asset_value,
+            cumulative_cost_npv=cumulative_npv,
+        )
+
+
+def _run_ronet_scalar(batch: ScenarioBatch, duration: int):
+    """
+    iter_ronet_batch for a one-row batch, in plain floats. On 1-element arrays
+    the per-call NumPy overhead dominates, so single runs are several times
+    faster this way. Same arithmetic, year for year.
+    Returns per-year (vci, spend, asset value, cumulative NPV) lists.
+    """
+    paved_km = float(batch.paved_km[0])
+    gravel_km = float(batch.gravel_km[0])
+    base_annual_need = (paved_km * float(batch.unit_cost_paved[0])) + (gravel_km * float(batch.unit_cost_gravel[0]))
+    is_do_nothing = (paved_km + gravel_km) == 0
+    decay_scale = float(batch.decay_scale[0])
+    budget_cap = float(batch.budget_cap[0])
+    improvement = 2.5 * float(batch.improvement_scale[0])
+
+    current_vci = float(batch.start_vci[0])
+    current_asset_value = float(batch.asset_value[0])
     cumulative_npv = 0.0
 
-    for i in range(duration):
-        year = start_year + i
-        year_inflation_factor = (1 + inflation) ** i
+    growth = 1 + float(batch.inflation[0])
+    discount = 1 + float(batch.discount_rate[0])
+
+    vci_out, cost_out, asset_out, npv_out = [], [], [], []
+    for i in range(int(duration)):
+        escalation = growth ** i
 
-        # A) Determine Demand
+        # A) Demand (uses condition at the start of the year)
         condition_cost_factor = 1.0 + ((100 - current_vci) / 100.0)
-        nominal_need = base_annual_need * condition_cost_factor * year_inflation_factor
+        nominal_need = base_annual_need * condition_cost_factor * escalation
 
-        # B) Determine Actual Spend
-        is_do_nothing = (paved_km + gravel_km) == 0
-        actual_spend = 0.0 if is_do_nothing else nominal_need
+        # B) Actual spend (need, limited by the escalated budget cap)
+        actual_spend = 0.0 if is_do_nothing else min(nominal_need, budget_cap * escalation)
+        funded = actual_spend / nominal_need if nominal_need > 0 else 1.0
 
-        # C) Deterioration Logic
+        # C) Deterioration / improvement
+        decay_rate = (3.5 if current_vci > 50 else 5.0) * decay_scale
         if is_do_nothing:
-            decay_rate = 3.5 if current_vci > 50 else 5.0
             current_vci = max(0.0, current_vci - decay_rate)
-            current_asset_value *= (1 - 0.04) 
+            current_asset_value = current_asset_value * (1 - 0.04)
         else:
-            improvement = 2.5
-            current_vci = min(95.0, current_vci + improvement)
-            current_asset_value *= (1 + inflation)
+            current_vci = min(max(current_vci + funded * improvement - (1 - funded) * decay_rate, 0.0), 95.0)
+            current_asset_value = current_asset_value * (funded * growth + (1 - funded) * (1 - 0.04))
 
         # D) NPV
-        discount_factor = (1 + discount_rate) ** i
-        year_npv = actual_spend / discount_factor
-        cumulative_npv += year_npv
-
-        # E) Distributions
-        pct_good = max(0.0, min(100.0, (current_vci - 30) * 1.5))
-        pct_poor = max(0.0, min(100.0, (70 - current_vci) * 1.5))
-        pct_fair = max(0.0, 100.0 - pct_good - pct_poor)
-
-        yearly_results.append(
-            YearlyResult(
-                year=year,
-                avg_condition_index=round(current_vci, 2),
-                pct_good=round(pct_good, 1),
-                pct_fair=round(pct_fair, 1),
-                pct_poor=round(pct_poor, 1),
-                total_maintenance_cost=round(actual_spend, 2),
-                asset_value=round(current_asset_value, 2),
-            )
+        cumulative_npv = cumulative_npv + actual_spend / (discount ** i)
+
+        vci_out.append(current_vci)
+        cost_out.append(actual_spend)
+        asset_out.append(current_asset_value)
+        npv_out.append(cumulative_npv)
+    return vci_out, cost_out, asset_out, npv_out
+
+
+def run_ronet_batch(batch: ScenarioBatch, duration: int, start_year: int) -> BatchResult:
+    """
+    Runs iter_ronet_batch to completion and collects columnar (N, T) arrays
+    (one-row batches go through _run_ronet_scalar instead).
+    """
+    n, t = batch.size, int(duration)
+
+    vci_out = np.empty((n, t))
+    cost_out = np.empty((n, t))
+    asset_out = np.empty((n, t))
+    npv_out = np.empty((n, t))
+
+    if n == 1:
+        vci_out[0], cost_out[0], asset_out[0], npv_out[0] = _run_ronet_scalar(batch, t)
+    else:
+        for step in iter_ronet_batch(batch, t, start_year):
+            vci_out[:, step.index] = step.avg_condition_index
+            cost_out[:, step.index] = step.total_maintenance_cost
+            asset_out[:, step.index] = step.asset_value
+            npv_out[:, step.index] = step.cumulative_cost_npv
+
+    # E) Distributions (derived from end-of-year condition)
+    pct_good, pct_fair, pct_poor = condition_distribution(vci_out)
+
+    return BatchResult(
+        years=np.arange(start_year, start_year + t),
+        avg_condition_index=vci_out,
+        pct_good=pct_good,
+        pct_fair=pct_fair,
+        pct_poor=pct_poor,
+        total_maintenance_cost=cost_out,
+        asset_value=asset_out,
+        cumulative_cost_npv=npv_out,
+        total_cost_npv=npv_out[:, -1].copy() if t else np.zeros(n),
+    )
+
+
+def yearly_results_for(result: BatchResult, row: int) -> List[YearlyResult]:
+    """Converts one scenario row of a BatchResult into rounded YearlyResult objects."""
+    return [
+        YearlyResult(
+            year=int(year),
+            avg_condition_index=round(float(vci), 2),
+            pct_good=round(float(good), 1),
+            pct_fair=round(float(fair), 1),
+            pct_poor=round(float(poor), 1),
+            total_maintenance_cost=round(float(cost), 2),
+            asset_value=round(float(asset), 2),
+        )
+        for year, vci, good, fair, poor, cost, asset in zip(
+            result.years.tolist(),
+            result.avg_condition_index[row].tolist(),
+            result.pct_good[row].tolist(),
+            result.pct_fair[row].tolist(),
+            result.pct_poor[row].tolist(),
+            result.total_maintenance_cost[row].tolist(),
+            result.asset_value[row].tolist(),
+        )
+    ]
+
+
+def batch_output(
+    project_id: UUID,
+    result: BatchResult,
+    labels: List[Optional[str]],
+) -> SimulationBatchOut:
+    """Packs a BatchResult into the columnar API shape (same rounding as single runs)."""
+    vci = np.round(result.avg_condition_index, 2)
+    good = np.round(result.pct_good, 1)
+    fair = np.round(result.pct_fair, 1)
+    poor = np.round(result.pct_poor, 1)
+    cost = np.round(result.total_maintenance_cost, 2)
+    asset = np.round(result.asset_value, 2)
+    year_count = int(result.years.shape[0])
+
+    variants = [
+        BatchVariantResult(
+            label=labels[k],
+            avg_condition_index=vci[k].tolist(),
+            pct_good=good[k].tolist(),
+            pct_fair=fair[k].tolist(),
+            pct_poor=poor[k].tolist(),
+            total_maintenance_cost=cost[k].tolist(),
+            asset_value=asset[k].tolist(),
+            total_cost_npv=float(result.total_cost_npv[k]),
+            final_network_condition=float(vci[k, -1]) if year_count else 0.0,
         )
+        for k in range(len(labels))
+    ]
+
+    return SimulationBatchOut(
+        project_id=str(project_id),
+        year_count=year_count,
+        years=result.years.tolist(),
+        variants=variants,
+    )
+
+
+def run_ronet_simulation_batch(
+    project_id: UUID,
+    params: ForecastParametersOut,
+    network_profile: dict,
+    request: SimulationBatchRequest,
+) -> SimulationBatchOut:
+    """
+    Runs every requested variant in a single vectorized pass.
+    """
+    batch = build_scenario_batch(params, network_profile, request.variants)
+    result = run_ronet_batch(batch, duration_for(params), start_year_for(request.start_year_override))
+    return batch_output(project_id, result, [v.label for v in request.variants])
+
+
+def stream_ronet_simulation_batch(
+    params: ForecastParametersOut,
+    network_profile: dict,
+    request: SimulationBatchRequest,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Generator variant of run_ronet_simulation_batch: yields one row per variant
+    per year as soon as that year is simulated, then one summary row per variant.
+    Only the current year's arrays are held in memory.
+    """
+    batch = build_scenario_batch(params, network_profile, request.variants)
+    labels = [v.label for v in request.variants]
+    duration = duration_for(params)
+
+    last = None
+    for step in iter_ronet_batch(batch, duration, start_year_for(request.start_year_override)):
+        good, fair, poor = condition_distribution(step.avg_condition_index)
+        for k, label in enumerate(labels):
+            row = YearlyResult(
+                year=step.year,
+                avg_condition_index=round(float(step.avg_condition_index[k]), 2),
+                pct_good=round(float(good[k]), 1),
+                pct_fair=round(float(fair[k]), 1),
+                pct_poor=round(float(poor[k]), 1),
+                total_maintenance_cost=round(float(step.total_maintenance_cost[k]), 2),
+                asset_value=round(float(step.asset_value[k]), 2),
+            )
+            yield {"type": "year", "variant": k, "label": label, **row.model_dump()}
+        last = step
+
+    for k, label in enumerate(labels):
+        yield {
+            "type": "summary",
+            "variant": k,
+            "label": label,
+            "year_count": duration,
+            "total_cost_npv": float(last.cumulative_cost_npv[k]) if last else 0.0,
+            "final_network_condition": round(float(last.avg_condition_index[k]), 2) if last else 0.0,
+        }
+
+
+# -----------------------------------------------------------------------------
+# Single-run entry point (thin wrapper over the batch engine)
+# -----------------------------------------------------------------------------
+def run_ronet_simulation(
+    project_id: UUID,
+    params: ForecastParametersOut,
+    network_profile: dict,
+    options: SimulationRunOptions,
+) -> SimulationOutput:
+    """
+    Enhanced RoNET-style simulation.
+    """
+    variant = SimulationVariant(
+        include_paved=options.include_paved,
+        include_gravel=options.include_gravel,
+    )
+    batch = build_scenario_batch(params, network_profile, [variant])
+
+    duration = duration_for(params)
+    result = run_ronet_batch(batch, duration, start_year_for(options.start_year_override))
 
+    yearly_results = yearly_results_for(result, 0)
     final_vci = yearly_results[-1].avg_condition_index if yearly_results else 0.0
 
     return SimulationOutput(
         project_id=str(project_id),
         year_count=duration,
         yearly_data=yearly_results,
-        total_cost_npv=float(cumulative_npv),
+        total_cost_npv=float(result.total_cost_npv[0]),
         final_network_condition=float(final_vci),
         generated_at=datetime.now(timezone.utc),
-    )
\ No newline at end of file
+    )
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from typing import Callable, Optional
+from uuid import UUID
+
+import numpy as np
+
+from app.scenarios.schemas import ForecastParametersOut
+from . import engine
+from .schemas import GoalSeekOut, GoalSeekRequest, SimulationVariant
+
+# Budgets evaluated per round; each round shrinks the bracket by this factor.
+GRID_POINTS = 64
+MAX_ROUNDS = 8
+
+
+def _evaluate(base: engine.ScenarioBatch, budgets: np.ndarray, duration: int, start_year: int):
+    batch = base.repeat(budgets.shape[0])
+    batch.budget_cap = budgets
+    return engine.run_ronet_batch(batch, duration, start_year)
+
+
+def solve_min_budget(
+    project_id: UUID,
+    params: ForecastParametersOut,
+    network_profile: dict,
+    spec: GoalSeekRequest,
+    target_vci: float,
+    progress: Optional[Callable[[float], None]] = None,
+) -> GoalSeekOut:
+    """
+    Vectorized grid search over a budget-capped engine run.
+    Each round evaluates GRID_POINTS budgets in one batch call and keeps the
+    bracket [last failing, first passing] until it is within spec.tolerance.
+    `progress` is called with the share of MAX_ROUNDS done after each round.
+    """
+    variant = SimulationVariant(include_paved=spec.include_paved, include_gravel=spec.include_gravel)
+    base = engine.build_scenario_batch(params, network_profile, [variant])
+    duration = engine.duration_for(params)
+    start_year = engine.start_year_for(spec.start_year_override)
+
+    # Condition factor never exceeds 2 (VCI >= 0), so twice the base need funds every year in full.
+    lo, hi = 0.0, float(engine.annual_need(base)[0]) * 2.0
+    evaluations = 0
+
+    edges = _evaluate(base, np.array([lo, hi]), duration, start_year)
+    evaluations += 2
+    edge_ok = edges.avg_condition_index.min(axis=1) >= target_vci
+
+    feasible = bool(edge_ok[1])
+    if edge_ok[0]:
+        hi = lo
+    elif feasible:
+        for round_no in range(MAX_ROUNDS):
+            grid = np.linspace(lo, hi, GRID_POINTS)
+            ok = _evaluate(base, grid, duration, start_year).avg_condition_index.min(axis=1) >= target_vci
+            evaluations += GRID_POINTS
+            if progress is not None:
+                progress((round_no + 1) / MAX_ROUNDS)
+            first = int(np.argmax(ok))   # grid[-1] == hi always passes
+            if first == 0:
+                hi = float(grid[0])
+                break
+            lo, hi = float(grid[first - 1]), float(grid[first])
+            if hi - lo <= spec.tolerance * hi:
+                break
+
+    result = _evaluate(base, np.array([hi]), duration, start_year)
+    evaluations += 1
+
+    yearly = engine.yearly_results_for(result, 0)
+    growth = 1 + float(base.inflation[0])
+
+    return GoalSeekOut(
+        project_id=str(project_id),
+        target_vci=float(target_vci),
+        feasible=feasible,
+        annual_budget=round(hi, 2),
+        budget_profile=[round(hi * growth ** i, 2) for i in range(duration)],
+        year_count=duration,
+        yearly_data=yearly,
+        total_cost_npv=float(result.total_cost_npv[0]),
+        min_condition_index=min((y.avg_condition_index for y in yearly), default=0.0),
+        evaluations=evaluations,
+    )
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from uuid import UUID
+
+from fastapi.encoders import jsonable_encoder
+from psycopg2.extras import Json
+
+from app.db.rls import bind_user
+from app.routers.projects import get_db_connection, use_db_connection
+
+# Jobs run on this instance's threads; their state is in public.simulation_jobs,
+# so the status poll can land on any instance.
+_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("SIMULATION_JOB_WORKERS", "2")),
+    thread_name_prefix="simulation-job",
+)
+
+logger = logging.getLogger(__name__)
+
+# A queued/running job silent for this long is reported as failed (seconds)
+_STALE_AFTER = float(os.getenv("SIMULATION_JOB_STALE_AFTER", "600"))
+
+# Minimum seconds between two progress writes of the same job
+_PROGRESS_INTERVAL = float(os.getenv("SIMULATION_JOB_PROGRESS_INTERVAL", "1"))
+
+# Progress while running: 0.1 once picked up, up to 0.95 as the work reports in
+_PROGRESS_STARTED = 0.1
+_PROGRESS_WORK_SPAN = 0.85
+
+# job id / owner of the job the current worker thread is running
+_current = threading.local()
+
+_JOB_COLUMNS = """
+    id, project_id, kind, status, progress, request, result, error,
+    created_at, started_at, finished_at
+"""
+
+
+def _update_job(job_id: UUID, user_id: str, sql_set: str, values: tuple) -> None:
+    sql = f"UPDATE public.simulation_jobs SET {sql_set} WHERE id = %s"
+    with get_db_connection() as conn:
+        bind_user(conn, user_id)
+        with conn.cursor() as cur:
+            cur.execute(sql, (*values, str(job_id)))
+        conn.commit()
+
+
+def report_progress(fraction: float) -> None:
+    """
+    Called by long-running work with the share done so far (0..1). Also the
+    job's heartbeat. No-op outside a job thread and between throttled writes.
+    """
+    job_id = getattr(_current, "job_id", None)
+    now = time.monotonic()
+    if job_id is None or now - _current.reported_at < _PROGRESS_INTERVAL:
+        return
+    _current.reported_at = now
+    progress = _PROGRESS_STARTED + _PROGRESS_WORK_SPAN * min(max(fraction, 0.0), 1.0)
+    try:
+        _update_job(job_id, _current.user_id, "progress = %s, heartbeat_at = NOW()", (progress,))
+    except Exception:
+        logger.exception("Could not record progress of simulation job %s", job_id)
+
+
+def _execute(job_id: UUID, user_id: str, work: Callable[[], Any]) -> None:
+    _current.job_id, _current.user_id, _current.reported_at = job_id, user_id, time.monotonic()
+    try:
+        _update_job(
+            job_id,
+            user_id,
+            "status = 'running', progress = %s, started_at = NOW(), heartbeat_at = NOW()",
+            (_PROGRESS_STARTED,),
+        )
+        result = work()
+        _update_job(
+            job_id,
+            user_id,
+            "status = 'completed', progress = 1, result = %s, finished_at = NOW()",
+            (Json(jsonable_encoder(result)),),
+        )
+    except Exception as e:
+        detail = getattr(e, "detail", None) or str(e)
+        try:
+            _update_job(job_id, user_id, "status = 'failed', error = %s, finished_at = NOW()", (str(detail),))
+        except Exception:
+            logger.exception("Simulation job %s failed (%s) and could not be marked", job_id, detail)
+    finally:
+        _current.job_id = None
+
+
+def submit_job(
+    project_id: UUID,
+    user_id: str,
+    kind: str,
+    request: Dict[str, Any],
+    work: Callable[[], Any],
+    conn=None,
+) -> Dict[str, Any]:
+    """
+    Records a queued job, hands `work` to the pool and returns the job row.
+    `work` must not depend on request-scoped state. Always commits, so the
+    worker thread (on its own connection) can see the row.
+    """
+    sql = f"""
+        INSERT INTO public.simulation_jobs (project_id, user_id, kind, request)
+        VALUES (%s, %s, %s, %s)
+        RETURNING {_JOB_COLUMNS};
+    """
+    with use_db_connection(conn) as db:
+        with db.cursor() as cur:
+            cur.execute(sql, (str(project_id), user_id, kind, Json(request)))
+            row = cur.fetchone()
+            cols = [d[0] for d in cur.description]
+        db.commit()
+
+    job = dict(zip(cols, row))
+    _executor.submit(_execute, job["id"], user_id, work)
+    return job
+
+
+def get_job(project_id: UUID, job_id: UUID, user_id: str, conn=None) -> Optional[Dict[str, Any]]:
+    """
+    The job row. A queued/running job whose worker has not been heard from for
+    SIMULATION_JOB_STALE_AFTER seconds is marked failed first (same statement):
+    on serverless hosts the instance can be frozen or recycled mid-job.
+    The caller commits.
+    """
+    sql = f"""
+        WITH expired AS (
+            UPDATE public.simulation_jobs
+            SET status = 'failed', finished_at = NOW(),
+                error = 'The worker running this job stopped responding; submit it again.'
+            WHERE id = %(job_id)s AND project_id = %(project_id)s AND user_id = %(user_id)s
+              AND status IN ('queued', 'running')
+              AND coalesce(heartbeat_at, started_at, created_at) < NOW() - make_interval(secs => %(stale_after)s)
+            RETURNING {_JOB_COLUMNS}
+        )
+        SELECT {_JOB_COLUMNS} FROM expired
+        UNION ALL
+        SELECT {_JOB_COLUMNS}
+        FROM public.simulation_jobs
+        WHERE id = %(job_id)s AND project_id = %(project_id)s AND user_id = %(user_id)s
+          AND NOT EXISTS (SELECT 1 FROM expired)
+    """
+    params = {
+        "job_id": str(job_id), "project_id": str(project_id), "user_id": user_id,
+        "stale_after": _STALE_AFTER,
+    }
+    with use_db_connection(conn) as db:
+        with db.cursor() as cur:
+            cur.execute(sql, params)
+            row = cur.fetchone()
+            if not row:
+                return None
+            cols = [d[0] for d in cur.description]
+            if conn is None:
+                db.commit()
+            return dict(zip(cols, row))
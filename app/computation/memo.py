@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from typing import Any, Dict
+
+from app.cache import LRUCache
+from app.scenarios.schemas import ForecastParametersOut
+from . import engine
+from .schemas import SimulationRunOptions
+
+# Assumption fields that identify the row rather than the inputs
+_ASSUMPTION_META = {"id", "project_id", "updated_at"}
+
+# Run options that only label the run
+_OPTION_LABELS = {"run_name", "notes"}
+
+# (project_id, input_hash) -> id of the saved simulation_results row
+run_cache = LRUCache(maxsize=int(os.getenv("SIMULATION_CACHE_SIZE", "256")))
+
+
+def input_hash(
+    params: ForecastParametersOut,
+    network_profile: Dict[str, Any],
+    options: SimulationRunOptions,
+) -> str:
+    """
+    sha256 over everything that determines the engine output.
+    The start year is resolved first so a run without an override stops
+    matching once the calendar year rolls over.
+    """
+    assumptions = params.model_dump(mode="json", exclude=_ASSUMPTION_META)
+    run_options = options.model_dump(mode="json", exclude=_OPTION_LABELS)
+    run_options["start_year_override"] = engine.start_year_for(options.start_year_override)
+    run_options["tags"] = sorted(set(options.tags))
+
+    material = {
+        "engine_version": engine.ENGINE_VERSION,
+        "assumptions": assumptions,
+        "network": network_profile,
+        "options": run_options,
+    }
+    blob = json.dumps(material, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import os
+import secrets
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+
+from app.scenarios.schemas import ForecastParametersOut
+from . import engine
+from .schemas import MonteCarloRequest, MonteCarloOut, PercentileBand, SimulationVariant
+
+# Draws are simulated in fixed-size chunks, each with its own child seed,
+# so results for a given seed do not depend on how many workers ran them.
+CHUNK_SIZE = 2_000
+
+# Below this many draws the pool start-up costs more than it saves.
+PARALLEL_MIN_DRAWS = 4 * CHUNK_SIZE
+
+PERCENTILES = (10, 50, 90)
+
+
+def _max_workers() -> int:
+    """SIMULATION_MAX_WORKERS=1 keeps everything in-process (default on serverless)."""
+    raw = os.getenv("SIMULATION_MAX_WORKERS", "1")
+    try:
+        value = int(raw)
+    except ValueError:
+        value = 1
+    if value <= 0:
+        value = os.cpu_count() or 1
+    return value
+
+
+# -----------------------------------------------------------------------------
+# Sampling
+# -----------------------------------------------------------------------------
+def _sample_batch(
+    base: engine.ScenarioBatch,
+    spec: MonteCarloRequest,
+    rng: np.random.Generator,
+    n: int,
+) -> engine.ScenarioBatch:
+    """
+    Draws n scenarios around a single-row base batch.
+    Rates use absolute spreads (percentage points); unit costs, improvement and
+    decay use relative spreads. Everything is clipped so no draw goes negative.
+    The VCI spread of a maintained network comes from the improvement draw
+    (the run is uncapped, so every year is fully funded); decay only moves
+    do-nothing runs.
+    """
+    draws = base.repeat(n)
+
+    draws.inflation = np.maximum(0.0, rng.normal(draws.inflation, spec.cpi_sd / 100.0))
+    draws.discount_rate = np.maximum(0.0, rng.normal(draws.discount_rate, spec.discount_sd / 100.0))
+    draws.unit_cost_paved = draws.unit_cost_paved * np.maximum(0.0, rng.normal(1.0, spec.unit_cost_cv, n))
+    draws.unit_cost_gravel = draws.unit_cost_gravel * np.maximum(0.0, rng.normal(1.0, spec.unit_cost_cv, n))
+    draws.decay_scale = draws.decay_scale * np.maximum(0.0, rng.normal(1.0, spec.decay_cv, n))
+    draws.improvement_scale = draws.improvement_scale * np.maximum(0.0, rng.normal(1.0, spec.improvement_cv, n))
+    return draws
+
+
+def _simulate_chunk(
+    args: Tuple[engine.ScenarioBatch, MonteCarloRequest, np.random.SeedSequence, int, int, int],
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Worker entry point (top-level so it pickles for the process pool)."""
+    base, spec, seed_seq, n, duration, start_year = args
+    rng = np.random.default_rng(seed_seq)
+    result = engine.run_ronet_batch(_sample_batch(base, spec, rng, n), duration, start_year)
+    return result.avg_condition_index, result.asset_value, result.cumulative_cost_npv
+
+
+def _bands(values: np.ndarray, decimals: int) -> PercentileBand:
+    p10, p50, p90 = np.round(np.percentile(values, PERCENTILES, axis=0), decimals)
+    return PercentileBand(p10=p10.tolist(), p50=p50.tolist(), p90=p90.tolist())
+
+
+# -----------------------------------------------------------------------------
+# Entry point
+# -----------------------------------------------------------------------------
+def run_monte_carlo(
+    project_id: UUID,
+    params: ForecastParametersOut,
+    network_profile: dict,
+    spec: MonteCarloRequest,
+    progress: Optional[Callable[[float], None]] = None,
+) -> MonteCarloOut:
+    """
+    Samples uncertain inputs around the saved assumptions and returns
+    P10/P50/P90 bands per year for VCI, asset value and cumulative NPV.
+    `progress` is called with the share of chunks done after each one.
+    """
+    seed = spec.seed if spec.seed is not None else secrets.randbits(63)
+
+    variant = SimulationVariant(include_paved=spec.include_paved, include_gravel=spec.include_gravel)
+    base = engine.build_scenario_batch(params, network_profile, [variant])
+    duration = engine.duration_for(params)
+    start_year = engine.start_year_for(spec.start_year_override)
+
+    sizes: List[int] = [CHUNK_SIZE] * (spec.draws // CHUNK_SIZE)
+    if spec.draws % CHUNK_SIZE:
+        sizes.append(spec.draws % CHUNK_SIZE)
+    children = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(base, spec, child, n, duration, start_year) for child, n in zip(children, sizes)]
+
+    def collect(results) -> list:
+        chunks = []
+        for chunk in results:
+            chunks.append(chunk)
+            if progress is not None:
+                progress(len(chunks) / len(jobs))
+        return chunks
+
+    workers = min(_max_workers(), len(jobs))
+    if workers > 1 and spec.draws >= PARALLEL_MIN_DRAWS:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunks = collect(pool.map(_simulate_chunk, jobs))
+    else:
+        chunks = collect(_simulate_chunk(job) for job in jobs)
+
+    vci = np.concatenate([c[0] for c in chunks])
+    asset = np.concatenate([c[1] for c in chunks])
+    npv = np.concatenate([c[2] for c in chunks])
+
+    return MonteCarloOut(
+        project_id=str(project_id),
+        seed=seed,
+        draws=spec.draws,
+        year_count=duration,
+        years=list(range(start_year, start_year + duration)),
+        avg_condition_index=_bands(vci, 2),
+        asset_value=_bands(asset, 2),
+        cost_npv=_bands(npv, 2),
+    )
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List
+from uuid import UUID
+
+import numpy as np
+
+from app.scenarios.schemas import ForecastParametersOut
+from . import engine
+from .schemas import BatchVariantResult, NationalRollupOut, NationalRollupRequest
+
+CLIMATE_ZONE_COLUMNS = ("km_arid", "km_semi_arid", "km_dry_sub_humid", "km_moist_sub_humid", "km_humid")
+
+
+def _n(x) -> float:
+    return float(x or 0)
+
+
+def build_province_batch(
+    params: ForecastParametersOut,
+    provinces: List[Dict[str, Any]],
+    spec: NationalRollupRequest,
+    paved_share: float,
+) -> engine.ScenarioBatch:
+    """One scenario row per province, using that province's own km and VCI."""
+    total_km = np.array([sum(_n(p.get(c)) for c in CLIMATE_ZONE_COLUMNS) for p in provinces])
+    paved = total_km * paved_share if spec.include_paved else np.zeros(len(provinces))
+    gravel = total_km * (1 - paved_share) if spec.include_gravel else np.zeros(len(provinces))
+    start_vci = np.array([_n(p.get("avg_vci")) or 50.0 for p in provinces])
+
+    inflation = float(getattr(params, "cpi_percentage", 6.0) or 6.0) / 100.0
+    discount = float(getattr(params, "discount_rate", 8.0) or 8.0) / 100.0
+
+    return engine.ScenarioBatch(
+        paved_km=paved,
+        gravel_km=gravel,
+        start_vci=start_vci,
+        asset_value=(paved * engine.CRC_RATE_PAVED) + (gravel * engine.CRC_RATE_GRAVEL),
+        inflation=np.full(len(provinces), inflation),
+        discount_rate=np.full(len(provinces), discount),
+    )
+
+
+def run_national_rollup(
+    project_id: UUID,
+    params: ForecastParametersOut,
+    provinces: List[Dict[str, Any]],
+    spec: NationalRollupRequest,
+    paved_share: float,
+) -> NationalRollupOut:
+    """
+    Per-province series plus a national aggregate: money columns are summed,
+    condition columns are weighted by each province's km in scope.
+    """
+    batch = build_province_batch(params, provinces, spec, paved_share)
+    result = engine.run_ronet_batch(
+        batch,
+        engine.duration_for(params),
+        engine.start_year_for(spec.start_year_override),
+    )
+    per_province = engine.batch_output(project_id, result, [p["province_name"] for p in provinces])
+
+    weights = batch.paved_km + batch.gravel_km
+    if weights.sum() == 0:
+        weights = np.ones_like(weights)
+    weights = weights / weights.sum()
+
+    def weighted(values: np.ndarray, decimals: int) -> List[float]:
+        return np.round(weights @ values, decimals).tolist()
+
+    national_vci = weighted(result.avg_condition_index, 2)
+    national = BatchVariantResult(
+        label="National",
+        avg_condition_index=national_vci,
+        pct_good=weighted(result.pct_good, 1),
+        pct_fair=weighted(result.pct_fair, 1),
+        pct_poor=weighted(result.pct_poor, 1),
+        total_maintenance_cost=np.round(result.total_maintenance_cost.sum(axis=0), 2).tolist(),
+        asset_value=np.round(result.asset_value.sum(axis=0), 2).tolist(),
+        total_cost_npv=float(result.total_cost_npv.sum()),
+        final_network_condition=national_vci[-1] if national_vci else 0.0,
+    )
+
+    return NationalRollupOut(
+        project_id=str(project_id),
+        year_count=per_province.year_count,
+        years=per_province.years,
+        paved_share=paved_share,
+        provinces=per_province.variants,
+        national=national,
+    )
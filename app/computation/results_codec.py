@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import os
+from typing import Any, Dict, Optional
+
+from .schemas import YearlyResult
+
+# Column order of the per-year table (matches YearlyResult)
+YEARLY_FIELDS = tuple(YearlyResult.model_fields.keys())
+
+# rows (default) keeps the original list-of-dicts JSONB; columnar stores
+# {"yearly_data": {"year": [...], "avg_condition_index": [...], ...}}.
+STORAGE_FORMAT = os.getenv("SIMULATION_PAYLOAD_STORAGE", "rows")
+
+
+def is_columnar(payload: Optional[Dict[str, Any]]) -> bool:
+    return isinstance((payload or {}).get("yearly_data"), dict)
+
+
+def to_columnar(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Row-shaped SimulationOutput dict -> columnar dict (no-op if already columnar)."""
+    if not payload or is_columnar(payload):
+        return payload
+    rows = payload.get("yearly_data") or []
+    out = dict(payload)
+    out["yearly_data"] = {f: [r.get(f) for r in rows] for f in YEARLY_FIELDS}
+    out["format"] = "columnar"
+    return out
+
+
+def to_rows(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Columnar dict -> original row shape (no-op if already rows). Lossless."""
+    if not is_columnar(payload):
+        return payload
+    columns = payload["yearly_data"]
+    out = {k: v for k, v in payload.items() if k != "format"}
+    out["yearly_data"] = [dict(zip(YEARLY_FIELDS, values)) for values in zip(*(columns[f] for f in YEARLY_FIELDS))]
+    return out
+
+
+def for_storage(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return to_columnar(payload) if STORAGE_FORMAT == "columnar" else payload
+
+
+def present_run(row: Dict[str, Any], payload_format: str = "rows") -> Dict[str, Any]:
+    """Returns a simulation_results row with results_payload in the requested shape."""
+    convert = to_columnar if payload_format == "columnar" else to_rows
+    out = dict(row)
+    out["results_payload"] = convert(row.get("results_payload"))
+    return out
@@ -1,14 +1,37 @@
 from __future__ import annotations
 
+import asyncio
+import base64
+import json
+from datetime import datetime
 from uuid import UUID
-from typing import List, Dict, Any
-
-from fastapi import APIRouter, Depends, HTTPException, Query
-from psycopg2.extras import Json
-
-from app.routers.projects import get_current_user_id, get_db_connection
+from typing import List, Dict, Any, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from psycopg2.extras import Json, execute_values
+from pydantic import ValidationError
+
+from app.db.rls import PERMISSION_ERRORS, bind_user
+from app.db.async_pool import get_async_connection
+from app import project_summary
+from app.ownership import is_project_owned, is_project_owned_async
+from app.network_snapshot import service as network_snapshot  # module, not names: imports cycle back through project_summary
+from app.routers.projects import get_current_user_id, get_db, get_db_connection, use_db_connection
 from app.scenarios import service as scenario_service
-from . import engine, schemas
+from . import (
+    engine,
+    goal_seek,
+    jobs,
+    memo,
+    monte_carlo,
+    national,
+    results_codec,
+    schemas,
+    sensitivity,
+)
 
 router = APIRouter()
 
@@ -16,106 +39,344 @@ router = APIRouter()
 # -----------------------------------------------------------------------------
 # Helper: verify project belongs to user (security + demo safety)
 # -----------------------------------------------------------------------------
-def _assert_project_owned(project_id: UUID, user_id: str) -> None:
-    sql = "SELECT 1 FROM public.projects WHERE id = %s AND user_id = %s"
-    with get_db_connection() as conn:
-        with conn.cursor() as cur:
-            cur.execute(sql, (str(project_id), user_id))
-            if not cur.fetchone():
-                raise HTTPException(status_code=404, detail="Project not found.")
+def _assert_project_owned(project_id: UUID, user_id: str, conn) -> None:
+    if not is_project_owned(project_id, user_id, conn):
+        raise HTTPException(status_code=404, detail="Project not found.")
 
 
-# -----------------------------------------------------------------------------
-# 1. RUN SIMULATION (Saves History + Snapshots) + set ACTIVE
-# -----------------------------------------------------------------------------
-@router.post(
-    "/{project_id}/simulation/run",
-    response_model=schemas.SimulationRunOut,
-    summary="Run simulation, save snapshot, and set as ACTIVE.",
-)
-def run_simulation(
-    project_id: UUID,
-    options: schemas.SimulationRunOptions,
-    user_id: str = Depends(get_current_user_id),
-):
-    _assert_project_owned(project_id, user_id)
+async def _assert_project_owned_async(project_id: UUID, user_id: str, conn=None) -> None:
+    if not await is_project_owned_async(project_id, user_id, conn):
+        raise HTTPException(status_code=404, detail="Project not found.")
 
-    # 1) Load prerequisites
+
+def _load_prerequisites(project_id: UUID, user_id: str, conn):
+    """Returns (forecast assumptions, network profile) for the engine."""
     try:
-        scenario_params = scenario_service.get_forecast(project_id, user_id)
-        from app.network_snapshot.service import get_network_snapshot
-        network_profile = get_network_snapshot(project_id, user_id)
-    except HTTPException:
+        scenario_params = scenario_service.get_forecast(project_id, user_id, conn)
+        network_profile = network_snapshot.get_network_snapshot(project_id, user_id, conn)
+    except (HTTPException, *PERMISSION_ERRORS):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error loading prerequisites: {e}")
+    return scenario_params, network_profile
+
 
-    # 2) Run engine
+async def _load_prerequisites_async(project_id: UUID, user_id: str, conn):
+    """
+    Same as _load_prerequisites, on asyncpg. An asyncpg connection runs one
+    query at a time, so the forecast read uses `conn` while the snapshot read
+    borrows a second pooled connection and the two run concurrently.
+    """
     try:
-        result = engine.run_ronet_simulation(
-            project_id=project_id,
-            params=scenario_params,
-            network_profile=network_profile,
-            options=options,
+        scenario_params, network_profile = await asyncio.gather(
+            scenario_service.get_forecast_async(project_id, user_id, conn),
+            network_snapshot.get_network_snapshot_async(project_id, user_id),
         )
+        return scenario_params, network_profile
+    except (HTTPException, *PERMISSION_ERRORS):
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Simulation engine failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Error loading prerequisites: {e}")
+
+
+def _get_target_vci(project_id: UUID, user_id: str, conn) -> float:
+    sql = "SELECT target_vci FROM public.proposal_data WHERE project_id = %s AND user_id = %s"
+    with conn.cursor() as cur:
+        cur.execute(sql, (str(project_id), user_id))
+        row = cur.fetchone()
+    if not row or row[0] is None:
+        raise HTTPException(status_code=400, detail="No target_vci set for this project.")
+    return float(row[0])
+
+
+def _reuse_completed_run(project_id: UUID, user_id: str, run_hash: str, options, conn):
+    """
+    Returns a previously saved completed run with the same input hash (and makes
+    it the ACTIVE run), or None when these inputs have never been simulated.
+    A run_name / notes sent with the new request are returned in place of the
+    saved ones; the stored row keeps its own labels. The caller commits.
+    """
+    sql_lookup = """
+        SELECT id FROM public.simulation_results
+        WHERE project_id = %s AND input_hash = %s AND status = 'completed'
+        ORDER BY run_at DESC
+        LIMIT 1
+    """
 
-    # 3) JSON-safe snapshots (IMPORTANT)
-    assumptions_dict = scenario_params.model_dump(mode="json")
-    run_options_dict = options.model_dump(mode="json", by_alias=True)
-    results_dict = result.model_dump(mode="json")
-
-    scenario_id = str(getattr(scenario_params, "id", None)) if getattr(scenario_params, "id", None) else None
-    final_run_name = options.run_name or f"Run {result.generated_at.strftime('%H:%M')}"
-
-    sql_insert = """
-        INSERT INTO public.simulation_results
-            (project_id, scenario_id, results_payload, triggered_by, status,
-             run_name, run_options, assumptions_snapshot, network_snapshot, notes)
-        VALUES
-            (%s, %s, %s, %s, 'completed',
-             %s, %s, %s, %s, %s)
-        RETURNING
-            id, project_id, scenario_id, results_payload, run_at, triggered_by, status,
-            run_name, run_options, assumptions_snapshot, network_snapshot, notes;
+    # Confirms the run still exists and activates it in one statement.
+    sql_reuse = f"""
+        WITH sr AS (
+            SELECT * FROM public.simulation_results
+            WHERE id = %(run_id)s AND project_id = %(project_id)s AND status = 'completed'
+        ),
+        activated AS (
+            UPDATE public.projects
+            SET active_simulation_run_id = (SELECT id FROM sr), updated_at = NOW()
+            WHERE id = %(project_id)s AND user_id = %(user_id)s AND EXISTS (SELECT 1 FROM sr)
+        )
+        SELECT {_RUN_COLUMNS}
+        FROM sr{_SNAPSHOT_JOINS}
     """
 
-    sql_update_project = """
-        UPDATE public.projects
-        SET active_simulation_run_id = %s, updated_at = NOW()
-        WHERE id = %s AND user_id = %s;
+    # memo.run_cache only remembers the run id; the row is always re-read.
+    cache_key = (str(project_id), run_hash)
+    run_id = memo.run_cache.get(cache_key)
+
+    params = {"project_id": str(project_id), "user_id": user_id}
+    labels = {k: v for k, v in (("run_name", options.run_name), ("notes", options.notes)) if v is not None}
+
+    try:
+        with conn.cursor() as cur:
+            def reuse(run_id):
+                cur.execute(sql_reuse, {**params, "run_id": str(run_id)})
+                row = cur.fetchone()
+                return {**dict(zip([d[0] for d in cur.description], row)), **labels} if row else None
+
+            if run_id is not None:
+                saved = reuse(run_id)
+                if saved:
+                    return saved
+                memo.run_cache.pop(cache_key)   # the run was deleted since
+
+            cur.execute(sql_lookup, (str(project_id), run_hash))
+            found = cur.fetchone()
+            saved = reuse(found[0]) if found else None
+            if saved:
+                memo.run_cache.put(cache_key, saved["id"])
+            return saved
+    except Exception as e:
+        conn.rollback()
+        raise HTTPException(status_code=500, detail=f"Failed to reuse simulation result: {e}")
+
+
+PayloadFormat = Literal["rows", "columnar"]
+
+# simulation_results with its content-addressed snapshots joined back
+# (migration 007). Unused joins are removed by the planner (unique keys).
+_RUN_COLUMNS = """
+    sr.id, sr.project_id, sr.scenario_id, sr.results_payload, sr.run_at, sr.triggered_by, sr.status,
+    sr.run_name,
+    coalesce(ro.body, sr.run_options) AS run_options,
+    coalesce(sa.body, sr.assumptions_snapshot) AS assumptions_snapshot,
+    coalesce(sn.body, sr.network_snapshot) AS network_snapshot,
+    sr.notes"""
+
+_SNAPSHOT_JOINS = """
+    LEFT JOIN public.simulation_snapshots ro ON ro.project_id = sr.project_id AND ro.hash = sr.run_options_hash
+    LEFT JOIN public.simulation_snapshots sa ON sa.project_id = sr.project_id AND sa.hash = sr.assumptions_hash
+    LEFT JOIN public.simulation_snapshots sn ON sn.project_id = sr.project_id AND sn.hash = sr.network_hash"""
+
+_RUN_FROM = "public.simulation_results sr" + _SNAPSHOT_JOINS
+
+
+def _encode_cursor(run_at: datetime, run_id) -> str:
+    raw = f"{run_at.isoformat()}|{run_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def _decode_cursor(cursor: str):
+    try:
+        run_at, run_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|")
+        return datetime.fromisoformat(run_at), str(UUID(run_id))
+    except (ValueError, UnicodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+
+def _history_page(conn, project_id: UUID, columns: str, limit: int, cursor: Optional[str]):
     """
+    One page of a project's runs, newest first, plus the cursor for the next page
+    (None on the last page). Keyset on (run_at, id) so deep pages stay index-only.
+    """
+    where = "sr.project_id = %s"
+    params: List[Any] = [str(project_id)]
+    if cursor:
+        where += " AND (sr.run_at, sr.id) < (%s, %s)"
+        params.extend(_decode_cursor(cursor))
+
+    sql = f"""
+        SELECT {columns}
+        FROM {_RUN_FROM}
+        WHERE {where}
+        ORDER BY sr.run_at DESC, sr.id DESC
+        LIMIT %s;
+    """
+    params.append(limit + 1)
+
+    with conn.cursor() as cur:
+        cur.execute(sql, params)
+        rows = cur.fetchall()
+        cols = [d[0] for d in cur.description]
+    runs = [dict(zip(cols, r)) for r in rows[:limit]]
+
+    next_cursor = None
+    if len(rows) > limit:
+        last = runs[-1]
+        next_cursor = _encode_cursor(last["run_at"], last["id"])
+    return runs, next_cursor
+
+
+def _columnar_json(run: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Validates a run against the columnar schema. Endpoints wrap the result in a
+    JSONResponse so the rows-shaped response_model is bypassed.
+    """
+    out = schemas.SimulationRunColumnarOut.model_validate(results_codec.present_run(run, "columnar"))
+    return jsonable_encoder(out)
+
+
+# -----------------------------------------------------------------------------
+# 1. RUN SIMULATION (Saves History + Snapshots) + set ACTIVE
+# -----------------------------------------------------------------------------
+@router.post(
+    "/{project_id}/simulation/run",
+    response_model=schemas.SimulationRunOut,
+    summary="Run simulation, save snapshot, and set as ACTIVE (reuses an identical earlier run).",
+)
+async def run_simulation(
+    project_id: UUID,
+    options: schemas.SimulationRunOptions,
+    user_id: str = Depends(get_current_user_id),
+):
+    # 1) Ownership, then the two prerequisite reads concurrently (a second pooled
+    #    connection for the snapshot); all released before the write
+    async with get_async_connection(user_id) as conn:
+        await _assert_project_owned_async(project_id, user_id, conn)
+        scenario_params, network_profile = await _load_prerequisites_async(project_id, user_id, conn)
+
+    # Engine + psycopg2 writes are blocking; keep them off the event loop.
+    # The save borrows one pooled connection, so the request never holds two.
+    return await run_in_threadpool(
+        _simulate_and_save, project_id, user_id, options, scenario_params, network_profile
+    )
+
+
+def _simulate_and_save(project_id: UUID, user_id: str, options, scenario_params, network_profile, conn=None):
+    with use_db_connection(conn) as conn:
+        bind_user(conn, user_id)
+        # 1b) Memoization: identical inputs reuse the saved run instead of re-running
+        run_hash = memo.input_hash(scenario_params, network_profile, options)
+        reused = _reuse_completed_run(project_id, user_id, run_hash, options, conn)
+        if reused:
+            project_summary.refresh(conn, project_id)
+            conn.commit()
+            return results_codec.present_run(reused)
+
+        # 2) Run engine
+        try:
+            result = engine.run_ronet_simulation(
+                project_id=project_id,
+                params=scenario_params,
+                network_profile=network_profile,
+                options=options,
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Simulation engine failed: {e}")
+
+        # 3) JSON-safe snapshots (IMPORTANT)
+        assumptions_dict = scenario_params.model_dump(mode="json")
+        run_options_dict = options.model_dump(mode="json", by_alias=True)
+        results_dict = results_codec.for_storage(result.model_dump(mode="json"))
+
+        scenario_id = str(getattr(scenario_params, "id", None)) if getattr(scenario_params, "id", None) else None
+        final_run_name = options.run_name or f"Run {result.generated_at.strftime('%H:%M')}"
+
+        # Snapshots are stored once per distinct body (migration 007); the run
+        # row only references their hashes. One statement, one round trip.
+        sql_insert = """
+            WITH snap(kind, body) AS (
+                VALUES ('run_options', %(run_options)s::jsonb),
+                       ('assumptions', %(assumptions)s::jsonb),
+                       ('network', %(network)s::jsonb)
+            ),
+            hashed AS (
+                SELECT kind, body, encode(sha256(convert_to(body::text, 'UTF8')), 'hex') AS hash
+                FROM snap
+            ),
+            stored AS (
+                INSERT INTO public.simulation_snapshots (project_id, hash, body)
+                SELECT %(project_id)s::uuid, hash, body FROM hashed
+                ON CONFLICT (project_id, hash) DO NOTHING
+            )
+            INSERT INTO public.simulation_results
+                (project_id, scenario_id, results_payload, triggered_by, status,
+                 run_name, run_options_hash, assumptions_hash, network_hash, notes, input_hash,
+                 total_cost_npv, final_network_condition, year_count, tags)
+            VALUES
+                (%(project_id)s, %(scenario_id)s, %(results)s, %(user_id)s, 'completed',
+                 %(run_name)s,
+                 (SELECT hash FROM hashed WHERE kind = 'run_options'),
+                 (SELECT hash FROM hashed WHERE kind = 'assumptions'),
+                 (SELECT hash FROM hashed WHERE kind = 'network'),
+                 %(notes)s, %(input_hash)s,
+                 %(total_cost_npv)s, %(final_network_condition)s, %(year_count)s, %(tags)s)
+            RETURNING
+                id, project_id, scenario_id, results_payload, run_at, triggered_by, status,
+                run_name, notes;
+        """
+
+        sql_insert_yearly = f"""
+            INSERT INTO public.simulation_yearly (run_id, project_id, {", ".join(results_codec.YEARLY_FIELDS)})
+            VALUES %s
+        """
+
+        sql_update_project = """
+            UPDATE public.projects
+            SET active_simulation_run_id = %s, updated_at = NOW()
+            WHERE id = %s AND user_id = %s;
+        """
 
-    with get_db_connection() as conn:
         try:
             with conn.cursor() as cur:
                 # A) Insert the Simulation Result
                 cur.execute(
                     sql_insert,
-                    (
-                        str(project_id),
-                        scenario_id,
-                        Json(results_dict),
-                        user_id,  # sub from Supabase is a UUID string, OK for PG uuid
-                        final_run_name,
-                        Json(run_options_dict),
-                        Json(assumptions_dict),
-                        Json(network_profile),
-                        options.notes,
-                    ),
+                    {
+                        "project_id": str(project_id),
+                        "scenario_id": scenario_id,
+                        "results": Json(results_dict),
+                        "user_id": user_id,  # sub from Supabase is a UUID string, OK for PG uuid
+                        "run_name": final_run_name,
+                        "run_options": Json(run_options_dict),
+                        "assumptions": Json(assumptions_dict),
+                        "network": Json(network_profile),
+                        "notes": options.notes,
+                        "input_hash": run_hash,
+                        "total_cost_npv": result.total_cost_npv,
+                        "final_network_condition": result.final_network_condition,
+                        "year_count": result.year_count,
+                        "tags": sorted(set(options.tags)),
+                    },
                 )
                 new_run_row = cur.fetchone()
                 cols = [d[0] for d in cur.description]  # ✅ capture NOW (before UPDATE)
                 new_run_id = new_run_row[0]
 
+                # A2) Normalized per-year rows for cross-run analytics
+                execute_values(
+                    cur,
+                    sql_insert_yearly,
+                    [
+                        (str(new_run_id), str(project_id), *(getattr(y, f) for f in results_codec.YEARLY_FIELDS))
+                        for y in result.yearly_data
+                    ],
+                )
+
                 # B) Set active run (ownership safe)
                 cur.execute(sql_update_project, (str(new_run_id), str(project_id), user_id))
 
+            # C) Project list card
+            project_summary.refresh(conn, project_id)
             conn.commit()
-            return dict(zip(cols, new_run_row))
-
-        except HTTPException:
+            saved = dict(zip(cols, new_run_row))
+            saved.update(
+                run_options=run_options_dict,
+                assumptions_snapshot=assumptions_dict,
+                network_snapshot=network_profile,
+            )
+            memo.run_cache.put((str(project_id), run_hash), new_run_id)
+            return results_codec.present_run(saved)
+
+        except (HTTPException, *PERMISSION_ERRORS):
             conn.rollback()
             raise
         except Exception as e:
@@ -129,13 +390,15 @@ def run_simulation(
 @router.get(
     "/{project_id}/simulation/latest",
     response_model=schemas.SimulationRunOut,
-    summary="Get the ACTIVE simulation run (or most recent if none active)",
+    summary="Get the ACTIVE simulation run (or most recent if none active); ?payloadFormat=columnar for arrays",
 )
 def get_latest_simulation(
     project_id: UUID,
     user_id: str = Depends(get_current_user_id),
+    conn=Depends(get_db),
+    payload_format: PayloadFormat = Query("rows", alias="payloadFormat"),
 ):
-    _assert_project_owned(project_id, user_id)
+    _assert_project_owned(project_id, user_id, conn)
 
     sql_check_active = """
         SELECT active_simulation_run_id
@@ -143,45 +406,44 @@ def get_latest_simulation(
         WHERE id = %s AND user_id = %s
     """
 
-    sql_fetch_run = """
-        SELECT
-            id, project_id, scenario_id, results_payload, run_at, triggered_by, status,
-            run_name, run_options, assumptions_snapshot, network_snapshot, notes
-        FROM public.simulation_results
-        WHERE id = %s AND project_id = %s
+    sql_fetch_run = f"""
+        SELECT {_RUN_COLUMNS}
+        FROM {_RUN_FROM}
+        WHERE sr.id = %s AND sr.project_id = %s
     """
 
-    sql_fallback = """
-        SELECT
-            id, project_id, scenario_id, results_payload, run_at, triggered_by, status,
-            run_name, run_options, assumptions_snapshot, network_snapshot, notes
-        FROM public.simulation_results
-        WHERE project_id = %s
-        ORDER BY run_at DESC
+    sql_fallback = f"""
+        SELECT {_RUN_COLUMNS}
+        FROM {_RUN_FROM}
+        WHERE sr.project_id = %s
+        ORDER BY sr.run_at DESC
         LIMIT 1
     """
 
-    with get_db_connection() as conn:
-        with conn.cursor() as cur:
-            cur.execute(sql_check_active, (str(project_id), user_id))
-            proj_row = cur.fetchone()
-            active_id = proj_row[0] if proj_row else None
+    with conn.cursor() as cur:
+        cur.execute(sql_check_active, (str(project_id), user_id))
+        proj_row = cur.fetchone()
+        active_id = proj_row[0] if proj_row else None
 
-            target_row = None
+        target_row = None
 
-            if active_id:
-                cur.execute(sql_fetch_run, (str(active_id), str(project_id)))
-                target_row = cur.fetchone()
+        if active_id:
+            cur.execute(sql_fetch_run, (str(active_id), str(project_id)))
+            target_row = cur.fetchone()
 
-            if not target_row:
-                cur.execute(sql_fallback, (str(project_id),))
-                target_row = cur.fetchone()
+        if not target_row:
+            cur.execute(sql_fallback, (str(project_id),))
+            target_row = cur.fetchone()
 
-            if not target_row:
-                raise HTTPException(status_code=404, detail="No simulation results found.")
+        if not target_row:
+            raise HTTPException(status_code=404, detail="No simulation results found.")
 
-            cols = [d[0] for d in cur.description]
-            return dict(zip(cols, target_row))
+        cols = [d[0] for d in cur.description]
+        run = dict(zip(cols, target_row))
+
+    if payload_format == "columnar":
+        return JSONResponse(_columnar_json(run))
+    return results_codec.present_run(run)
 
 
 # -----------------------------------------------------------------------------
@@ -190,31 +452,45 @@ def get_latest_simulation(
 @router.get(
     "/{project_id}/simulation/history",
     response_model=List[schemas.SimulationRunOut],
-    summary="List all past simulation runs",
+    summary="List all past simulation runs; ?payloadFormat=columnar for arrays",
 )
 def list_simulation_history(
     project_id: UUID,
+    response: Response,
     user_id: str = Depends(get_current_user_id),
+    conn=Depends(get_db),
     limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    payload_format: PayloadFormat = Query("rows", alias="payloadFormat"),
 ):
-    _assert_project_owned(project_id, user_id)
+    _assert_project_owned(project_id, user_id, conn)
 
-    sql = """
-        SELECT
-            id, project_id, scenario_id, results_payload, run_at, triggered_by, status,
-            run_name, run_options, assumptions_snapshot, network_snapshot, notes
-        FROM public.simulation_results
-        WHERE project_id = %s
-        ORDER BY run_at DESC
-        LIMIT %s;
-    """
+    runs, next_cursor = _history_page(conn, project_id, _RUN_COLUMNS, limit, cursor)
 
-    with get_db_connection() as conn:
-        with conn.cursor() as cur:
-            cur.execute(sql, (str(project_id), limit))
-            rows = cur.fetchall()
-            cols = [d[0] for d in cur.description]
-            return [dict(zip(cols, r)) for r in rows]
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    if payload_format == "columnar":
+        return JSONResponse([_columnar_json(r) for r in runs], headers=headers)
+    response.headers.update(headers)
+    return [results_codec.present_run(r) for r in runs]
+
+
+@router.get(
+    "/{project_id}/simulation/history/summary",
+    response_model=schemas.SimulationHistoryPage,
+    summary="List past runs as lightweight summaries (keyset-paginated by run_at, id)",
+)
+def list_simulation_history_summary(
+    project_id: UUID,
+    user_id: str = Depends(get_current_user_id),
+    conn=Depends(get_db),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+):
+    _assert_project_owned(project_id, user_id, conn)
+
+    columns = "sr.id, sr.run_name, sr.run_at, sr.total_cost_npv, sr.final_network_condition, sr.year_count"
+    runs, next_cursor = _history_page(conn, project_id, columns, limit, cursor)
+    return {"items": runs, "next_cursor": next_cursor}
 
 
 # -----------------------------------------------------------------------------
@@ -229,8 +505,9 @@ def set_active_simulation(
     project_id: UUID,
     run_id: UUID,
     user_id: str = Depends(get_current_user_id),
+    conn=Depends(get_db),
 ):
-    _assert_project_owned(project_id, user_id)
+    _assert_project_owned(project_id, user_id, conn)
 
     sql_verify = "SELECT 1 FROM public.simulation_results WHERE id = %s AND project_id = %s"
 
@@ -240,19 +517,407 @@ def set_active_simulation(
         WHERE id = %s AND user_id = %s
     """
 
-    with get_db_connection() as conn:
-        try:
-            with conn.cursor() as cur:
-                cur.execute(sql_verify, (str(run_id), str(project_id)))
-                if not cur.fetchone():
-                    raise HTTPException(status_code=404, detail="Simulation run not found in this project.")
+    try:
+        with conn.cursor() as cur:
+            cur.execute(sql_verify, (str(run_id), str(project_id)))
+            if not cur.fetchone():
+                raise HTTPException(status_code=404, detail="Simulation run not found in this project.")
+
+            cur.execute(sql_update, (str(run_id), str(project_id), user_id))
+        project_summary.refresh(conn, project_id)
+        conn.commit()
+        return {"message": "Active simulation updated", "active_run_id": str(run_id)}
+    except (HTTPException, *PERMISSION_ERRORS):
+        conn.rollback()
+        raise
+    except Exception as e:
+        conn.rollback()
+        raise HTTPException(status_code=500, detail=f"Error switching active run: {e}")
 
-                cur.execute(sql_update, (str(run_id), str(project_id), user_id))
-            conn.commit()
-            return {"message": "Active simulation updated", "active_run_id": str(run_id)}
-        except HTTPException:
-            conn.rollback()
-            raise
+
+# -----------------------------------------------------------------------------
+# 5. BATCH RUN (many variants, one engine pass, nothing saved)
+# -----------------------------------------------------------------------------
+@router.post(
+    "/{project_id}/simulation/batch",
+    response_model=schemas.SimulationBatchOut,
+    summary="Run many scenario variants in one vectorized pass (not saved).",
+)
+def run_simulation_batch(
+    project_id: UUID,
+    payload: schemas.SimulationBatchRequest,
+    user_id: str = Depends(get_current_user_id),
+    conn=Depends(get_db),
+):
+    _assert_project_owned(project_id, user_id, conn)
+
+    scenario_params, network_profile = _load_prerequisites(project_id, user_id, conn)
+    conn.commit()  # keep the lazily created assumptions row; no open transaction while computing
+
+    try:
+        return engine.run_ronet_simulation_batch(
+            project_id=project_id,
+            params=scenario_params,
+            network_profile=network_profile,
+            request=payload,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Simulation engine failed: {e}")
+
+
+# -----------------------------------------------------------------------------
+# 5b. STREAMING RUN (rows sent as each year is simulated, nothing saved)
+# -----------------------------------------------------------------------------
+@router.post(
+    "/{project_id}/simulation/stream",
+    summary="Stream yearly rows for one or more variants as NDJSON or Server-Sent Events.",
+)
+def stream_simulation(
+    project_id: UUID,
+    payload: schemas.SimulationBatchRequest,
+    user_id: str = Depends(get_current_user_id),
+    conn=Depends(get_db),
+    fmt: Literal["ndjson", "sse"] = Query("ndjson", alias="format"),
+):
+    _assert_project_owned(project_id, user_id, conn)
+
+    scenario_params, network_profile = _load_prerequisites(project_id, user_id, conn)
+    conn.commit()  # keep the lazily created assumptions row; no open transaction while computing
+    rows = engine.stream_ronet_simulation_batch(scenario_params, network_profile, payload)
+
+    def body():
+        try:
+            for row in rows:
+                line = json.dumps(row)
+                yield f"data: {line}\n\n" if fmt == "sse" else f"{line}\n"
         except Exception as e:
-            conn.rollback()
-            raise HTTPException(status_code=500, detail=f"Error switching active run: {e}")
\ No newline at end of file
+            # Headers are already sent; report the failure in-band.
+            line = json.dumps({"type": "error", "detail": f"Simulation engine failed: {e}"})
+            yield f"event: error\ndata: {line}\n\n" if fmt == "sse" else f"{line}\n"
+
+    media_type = "text/event-stream" if fmt == "sse" else "application/x-ndjson"
+    return StreamingResponse(body(), media_type=media_type)
+
+
+# -----------------------------------------------------------------------------
+# 6. MONTE CARLO (P10/P50/P90 bands, seeded, nothing saved)
+# -----------------------------------------------------------------------------
+@router.post(
+    "/{project_id}/simulation/monte-carlo",
+    response_model=schemas.MonteCarloOut,
+    summary="Sample uncertain assumptions and return P10/P50/P90 bands per year.",
+)
+def run_simulation_monte_carlo(
+    project_id: UUID,
+    payload: schemas.MonteCarloRequest,
+    user_id: str = Depends(get_current_user_id),
+    conn=Depends(get_db),
+):
+    _assert_project_owned(project_id, user_id, conn)
+
+    scenario_params, network_profile = _load_prerequisites(project_id, user_id, conn)
+    conn.commit()  # keep the lazily created assumptions row; no open transaction while computing
+
+    try:
+        return monte_carlo.run_monte_carlo(
+            project_id=project_id,
+            params=scenario_params,
+            network_profile=network_profile,
+            spec=payload,
+            progress=jobs.report_progress,  # no-op unless running as a job
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Monte Carlo run failed: {e}")
+
+
+# -----------------------------------------------------------------------------
+# 7. GOAL SEEK (minimum annual budget that holds target_vci, nothing saved)
+# -----------------------------------------------------------------------------
+@router.post(
+    "/{project_id}/simulation/goal-seek",
+    response_model=schemas.GoalSeekOut,
+    summary="Find the smallest annual budget that keeps VCI at or above target_vci.",
+)
+def run_simulation_goal_seek(
+    project_id: UUID,
+    payload: schemas.GoalSeekRequest,
+    user_id: str = Depends(get_current_user_id),
+    conn=Depends(get_db),
+):
+    _assert_project_owned(project_id, user_id, conn)
+
+    scenario_params, network_profile = _load_prerequisites(project_id, user_id, conn)
+    target_vci = payload.target_vci if payload.target_vci is not None else _get_target_vci(project_id, user_id, conn)
+    conn.commit()  # keep the lazily created assumptions row; no open transaction while computing
+
+    try:
+        return goal_seek.solve_min_budget(
+            project_id=project_id,
+            params=scenario_params,
+            network_profile=network_profile,
+            spec=payload,
+            target_vci=target_vci,
+            progress=jobs.report_progress,  # no-op unless running as a job
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Goal seek failed: {e}")
+
+
+# -----------------------------------------------------------------------------
+# 8. SENSITIVITY (tornado dataset from one batched pass, nothing saved)
+# -----------------------------------------------------------------------------
+@router.post(
+    "/{project_id}/simulation/sensitivity",
+    response_model=schemas.SensitivityOut,
+    summary="Perturb each assumption up/down and rank the effect (tornado chart data).",
+)
+def run_simulation_sensitivity(
+    project_id: UUID,
+    payload: schemas.SensitivityRequest,
+    user_id: str = Depends(get_current_user_id),
+    conn=Depends(get_db),
+):
+    _assert_project_owned(project_id, user_id, conn)
+
+    scenario_params, network_profile = _load_prerequisites(project_id, user_id, conn)
+    conn.commit()  # keep the lazily created assumptions row; no open transaction while computing
+
+    try:
+        return sensitivity.run_sensitivity(
+            project_id=project_id,
+            params=scenario_params,
+            network_profile=network_profile,
+            spec=payload,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Sensitivity analysis failed: {e}")
+
+
+# -----------------------------------------------------------------------------
+# 8b. NATIONAL ROLL-UP (every provincial_stats row in one pass, nothing saved)
+# -----------------------------------------------------------------------------
+@router.post(
+    "/{project_id}/simulation/national",
+    response_model=schemas.NationalRollupOut,
+    summary="Simulate all provinces in one pass and return per-province + national series.",
+)
+def run_simulation_national(
+    project_id: UUID,
+    payload: schemas.NationalRollupRequest,
+    user_id: str = Depends(get_current_user_id),
+    conn=Depends(get_db),
+):
+    _assert_project_owned(project_id, user_id, conn)
+
+    scenario_params, network_profile = _load_prerequisites(project_id, user_id, conn)
+
+    sql = f"""
+        SELECT province_name, {", ".join(national.CLIMATE_ZONE_COLUMNS)}, avg_vci
+        FROM public.provincial_stats
+        WHERE project_id = %s
+        ORDER BY province_name ASC;
+    """
+    with conn.cursor() as cur:
+        cur.execute(sql, (str(project_id),))
+        cols = [d[0] for d in cur.description]
+        provinces = [dict(zip(cols, r)) for r in cur.fetchall()]
+    conn.commit()  # keep the lazily created assumptions row; no open transaction while computing
+
+    if not provinces:
+        raise HTTPException(status_code=404, detail="No provincial stats found for this project.")
+
+    paved_share = payload.paved_share
+    if paved_share is None:
+        total_km = float(network_profile.get("totalLengthKm", 0) or 0)
+        if total_km <= 0:
+            raise HTTPException(
+                status_code=400,
+                detail="pavedShare is required when the proposal has no paved/gravel lengths.",
+            )
+        paved_share = float(network_profile.get("pavedLengthKm", 0) or 0) / total_km
+
+    try:
+        return national.run_national_rollup(
+            project_id=project_id,
+            params=scenario_params,
+            provinces=provinces,
+            spec=payload,
+            paved_share=paved_share,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"National roll-up failed: {e}")
+
+
+# -----------------------------------------------------------------------------
+# 9. BACKGROUND JOBS (submit, then poll; state lives in simulation_jobs)
+# -----------------------------------------------------------------------------
+def _run_simulation_job(project_id: UUID, options: schemas.SimulationRunOptions, user_id: str, conn):
+    """Synchronous run_simulation for job threads (no event loop there)."""
+    _assert_project_owned(project_id, user_id, conn)
+    scenario_params, network_profile = _load_prerequisites(project_id, user_id, conn)
+    conn.commit()  # keep the lazily created assumptions row
+    return _simulate_and_save(project_id, user_id, options, scenario_params, network_profile, conn)
+
+
+_JOB_KINDS = {
+    "run": (schemas.SimulationRunOptions, _run_simulation_job),
+    "batch": (schemas.SimulationBatchRequest, run_simulation_batch),
+    "monte_carlo": (schemas.MonteCarloRequest, run_simulation_monte_carlo),
+    "goal_seek": (schemas.GoalSeekRequest, run_simulation_goal_seek),
+    "sensitivity": (schemas.SensitivityRequest, run_simulation_sensitivity),
+    "national": (schemas.NationalRollupRequest, run_simulation_national),
+}
+
+
+def _run_job_handler(handler, project_id: UUID, parsed, user_id: str):
+    """Job threads outlive the request, so each job borrows its own connection."""
+    with get_db_connection() as conn:
+        bind_user(conn, user_id)
+        return handler(project_id, parsed, user_id, conn)
+
+
+@router.post(
+    "/{project_id}/simulation/jobs",
+    response_model=schemas.SimulationJobOut,
+    status_code=202,
+    summary="Queue a simulation (run, batch, Monte Carlo, ...) and return a job id to poll.",
+)
+def submit_simulation_job(
+    project_id: UUID,
+    job: schemas.SimulationJobCreate,
+    user_id: str = Depends(get_current_user_id),
+    conn=Depends(get_db),
+):
+    _assert_project_owned(project_id, user_id, conn)
+
+    request_model, handler = _JOB_KINDS[job.kind]
+    try:
+        parsed = request_model.model_validate(job.payload)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+
+    try:
+        return jobs.submit_job(
+            project_id,
+            user_id,
+            job.kind,
+            parsed.model_dump(mode="json", by_alias=True),
+            lambda: _run_job_handler(handler, project_id, parsed, user_id),
+            conn=conn,
+        )
+    except PERMISSION_ERRORS:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to queue simulation job: {e}")
+
+
+@router.get(
+    "/{project_id}/simulation/jobs/{job_id}",
+    response_model=schemas.SimulationJobOut,
+    summary="Poll a background simulation job for status, progress and result.",
+)
+def get_simulation_job(
+    project_id: UUID,
+    job_id: UUID,
+    user_id: str = Depends(get_current_user_id),
+    conn=Depends(get_db),
+):
+    job = jobs.get_job(project_id, job_id, user_id, conn)
+    if not job:
+        raise HTTPException(status_code=404, detail="Simulation job not found.")
+    conn.commit()  # keeps a stale job marked failed
+    return job
+
+
+# -----------------------------------------------------------------------------
+# 10. CROSS-RUN ANALYTICS (plain SQL over simulation_yearly)
+# -----------------------------------------------------------------------------
+@router.get(
+    "/{project_id}/simulation/analytics/year/{year}",
+    response_model=schemas.YearAcrossRunsOut,
+    summary="One metric in a given year across all runs of the project (optionally only runs tagged X).",
+)
+def get_year_across_runs(
+    project_id: UUID,
+    year: int,
+    user_id: str = Depends(get_current_user_id),
+    conn=Depends(get_db),
+    metric: schemas.YearlyMetric = Query("avg_condition_index"),
+    tag: Optional[str] = Query(None),
+):
+    _assert_project_owned(project_id, user_id, conn)
+
+    # metric is a Literal of column names, safe to interpolate
+    sql = f"""
+        SELECT
+            sr.id, sr.run_name, sr.run_at, y.{metric} AS value,
+            count(*) OVER () AS run_count,
+            min(y.{metric}) OVER () AS min,
+            avg(y.{metric}) OVER () AS avg,
+            max(y.{metric}) OVER () AS max
+        FROM public.simulation_yearly y
+        JOIN public.simulation_results sr ON sr.id = y.run_id
+        WHERE y.project_id = %s AND y.year = %s
+          AND (%s::text IS NULL OR sr.tags @> ARRAY[%s::text])
+        ORDER BY sr.run_at DESC, sr.id DESC;
+    """
+
+    with conn.cursor() as cur:
+        cur.execute(sql, (str(project_id), year, tag, tag))
+        rows = cur.fetchall()
+
+    first = rows[0] if rows else None
+    return {
+        "project_id": project_id,
+        "year": year,
+        "metric": metric,
+        "run_count": first[4] if first else 0,
+        "min": first[5] if first else None,
+        "avg": float(first[6]) if first else None,
+        "max": first[7] if first else None,
+        "runs": [
+            {"run_id": r[0], "run_name": r[1], "run_at": r[2], "value": r[3]}
+            for r in rows
+        ],
+    }
+
+
+@router.get(
+    "/{project_id}/simulation/analytics/trajectory",
+    response_model=schemas.TrajectoryOut,
+    summary="Per-year min/avg/max of one metric across runs (optionally only runs tagged X).",
+)
+def get_metric_trajectory(
+    project_id: UUID,
+    user_id: str = Depends(get_current_user_id),
+    conn=Depends(get_db),
+    metric: schemas.YearlyMetric = Query("asset_value"),
+    tag: Optional[str] = Query(None),
+):
+    _assert_project_owned(project_id, user_id, conn)
+
+    sql = f"""
+        SELECT
+            y.year, count(*) AS run_count,
+            min(y.{metric}), avg(y.{metric}), max(y.{metric})
+        FROM public.simulation_yearly y
+        JOIN public.simulation_results sr ON sr.id = y.run_id
+        WHERE y.project_id = %s
+          AND (%s::text IS NULL OR sr.tags @> ARRAY[%s::text])
+        GROUP BY y.year
+        ORDER BY y.year;
+    """
+
+    with conn.cursor() as cur:
+        cur.execute(sql, (str(project_id), tag, tag))
+        rows = cur.fetchall()
+
+    return {
+        "project_id": project_id,
+        "metric": metric,
+        "tag": tag,
+        "points": [
+            {"year": r[0], "run_count": r[1], "min": r[2], "avg": float(r[3]), "max": r[4]}
+            for r in rows
+        ],
+    }
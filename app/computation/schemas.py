@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
-from typing import List, Optional, Dict, Any
+from typing import List, Literal, Optional, Dict, Any
 from uuid import UUID
 
 from pydantic import BaseModel, Field
@@ -23,6 +23,112 @@ class SimulationRunOptions(BaseModel):
     # New fields for history context
     run_name: Optional[str] = Field(None, alias="runName")
     notes: Optional[str] = None
+    tags: List[str] = []    # grouping labels for cross-run analytics
+
+    class Config:
+        populate_by_name = True
+
+
+class SimulationVariant(BaseModel):
+    """
+    One scenario in a batch run.
+    Unset fields fall back to the project's saved assumptions / network snapshot.
+    """
+    label: Optional[str] = None
+    include_paved: bool = Field(True, alias="includePaved")
+    include_gravel: bool = Field(True, alias="includeGravel")
+    cpi_percentage: Optional[float] = Field(None, alias="cpiPercentage")
+    discount_rate: Optional[float] = Field(None, alias="discountRate")
+    start_vci: Optional[float] = Field(None, alias="startVci", ge=0, le=100)
+
+    class Config:
+        populate_by_name = True
+
+
+class SimulationBatchRequest(BaseModel):
+    """
+    Runs many variants in one engine pass. Nothing is persisted.
+    """
+    start_year_override: Optional[int] = Field(None, alias="startYearOverride")
+    variants: List[SimulationVariant] = Field(..., min_length=1, max_length=5000)
+
+    class Config:
+        populate_by_name = True
+
+
+class MonteCarloRequest(BaseModel):
+    """
+    Uncertainty run around the saved assumptions.
+    Spreads: *_sd are percentage points, *_cv are relative (0.15 = 15%).
+    Pass the returned seed back in to reproduce a run exactly.
+    """
+    draws: int = Field(2000, ge=100, le=20000)
+    seed: Optional[int] = Field(None, ge=0)
+    start_year_override: Optional[int] = Field(None, alias="startYearOverride")
+    include_paved: bool = Field(True, alias="includePaved")
+    include_gravel: bool = Field(True, alias="includeGravel")
+
+    cpi_sd: float = Field(1.5, ge=0, alias="cpiSd")
+    discount_sd: float = Field(1.0, ge=0, alias="discountSd")
+    unit_cost_cv: float = Field(0.15, ge=0, le=1, alias="unitCostCv")
+    improvement_cv: float = Field(0.2, ge=0, le=1, alias="improvementCv")   # VCI gain of a funded year
+    decay_cv: float = Field(0.2, ge=0, le=1, alias="decayCv")               # do-nothing decay only
+
+    class Config:
+        populate_by_name = True
+
+
+class GoalSeekRequest(BaseModel):
+    """
+    Finds the smallest annual budget that keeps VCI >= target in every year.
+    target_vci defaults to proposal_data.target_vci.
+    """
+    target_vci: Optional[float] = Field(None, alias="targetVci", ge=0, le=100)
+    start_year_override: Optional[int] = Field(None, alias="startYearOverride")
+    include_paved: bool = Field(True, alias="includePaved")
+    include_gravel: bool = Field(True, alias="includeGravel")
+    tolerance: float = Field(0.001, gt=0, le=0.1)  # relative precision on the budget
+
+    class Config:
+        populate_by_name = True
+
+
+class SensitivityRequest(BaseModel):
+    """
+    Tornado analysis: every assumption is moved down and up by `perturbation`
+    (relative, 0.2 = +/-20%) while the others stay at their saved values.
+    Assumptions that cannot move `rank_by` (e.g. unit costs for final
+    condition) get no bar.
+    """
+    perturbation: float = Field(0.2, gt=0, le=1)
+    rank_by: Literal["total_cost_npv", "final_network_condition"] = Field("total_cost_npv", alias="rankBy")
+    start_year_override: Optional[int] = Field(None, alias="startYearOverride")
+    include_paved: bool = Field(True, alias="includePaved")
+    include_gravel: bool = Field(True, alias="includeGravel")
+
+    class Config:
+        populate_by_name = True
+
+
+class SimulationJobCreate(BaseModel):
+    """
+    Background job submission. `payload` is the body the matching
+    synchronous endpoint would take (e.g. MonteCarloRequest for monte_carlo).
+    """
+    kind: Literal["run", "batch", "monte_carlo", "goal_seek", "sensitivity", "national"]
+    payload: Dict[str, Any] = {}
+
+
+class NationalRollupRequest(BaseModel):
+    """
+    Simulates every provincial_stats row of the project in one pass.
+    provincial_stats has no surface split, so each province's km are divided by
+    paved_share (defaults to the project's paved/total ratio from the network snapshot).
+    """
+    start_year_override: Optional[int] = Field(None, alias="startYearOverride")
+    include_paved: bool = Field(True, alias="includePaved")
+    include_gravel: bool = Field(True, alias="includeGravel")
+    paved_share: Optional[float] = Field(None, alias="pavedShare", ge=0, le=1)
 
     class Config:
         populate_by_name = True
@@ -51,6 +157,27 @@ class SimulationOutput(BaseModel):
     generated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 
+class ColumnarYearlyData(BaseModel):
+    """yearly_data as parallel arrays, one entry per year."""
+    year: List[int]
+    avg_condition_index: List[float]
+    pct_good: List[float]
+    pct_fair: List[float]
+    pct_poor: List[float]
+    total_maintenance_cost: List[float]
+    asset_value: List[float]
+
+
+class SimulationOutputColumnar(BaseModel):
+    format: Literal["columnar"] = "columnar"
+    project_id: str
+    year_count: int
+    yearly_data: ColumnarYearlyData
+    total_cost_npv: float
+    final_network_condition: float
+    generated_at: datetime
+
+
 # ============================================================
 # OUTPUT: DB row wrapper (History & Audit)
 # ============================================================
@@ -74,4 +201,190 @@ class SimulationRunOut(BaseModel):
     notes: Optional[str] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class SimulationRunColumnarOut(SimulationRunOut):
+    """Same row, results_payload in columnar form (?payloadFormat=columnar)."""
+    results_payload: SimulationOutputColumnar
+
+
+class SimulationRunSummary(BaseModel):
+    """History list row: scalar columns only, no JSONB payloads."""
+    id: UUID
+    run_name: Optional[str] = None
+    run_at: datetime
+    total_cost_npv: Optional[float] = None
+    final_network_condition: Optional[float] = None
+    year_count: Optional[int] = None
+
+
+class SimulationHistoryPage(BaseModel):
+    items: List[SimulationRunSummary]
+    next_cursor: Optional[str] = None   # pass back as ?cursor= for the next page
+
+
+# ============================================================
+# OUTPUT: Batch run (columnar)
+# ============================================================
+
+class BatchVariantResult(BaseModel):
+    """
+    Per-variant series, one list entry per year (aligned with SimulationBatchOut.years).
+    """
+    label: Optional[str] = None
+    avg_condition_index: List[float]
+    pct_good: List[float]
+    pct_fair: List[float]
+    pct_poor: List[float]
+    total_maintenance_cost: List[float]
+    asset_value: List[float]
+    total_cost_npv: float
+    final_network_condition: float
+
+
+class SimulationBatchOut(BaseModel):
+    project_id: str
+    year_count: int
+    years: List[int]
+    variants: List[BatchVariantResult]
+    generated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+# ============================================================
+# OUTPUT: Monte Carlo bands
+# ============================================================
+
+class PercentileBand(BaseModel):
+    p10: List[float]
+    p50: List[float]
+    p90: List[float]
+
+
+class MonteCarloOut(BaseModel):
+    project_id: str
+    seed: int
+    draws: int
+    year_count: int
+    years: List[int]
+    avg_condition_index: PercentileBand
+    asset_value: PercentileBand
+    cost_npv: PercentileBand   # cumulative NPV of spend up to each year
+    generated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+# ============================================================
+# OUTPUT: Goal-seek (minimum budget for target VCI)
+# ============================================================
+
+class GoalSeekOut(BaseModel):
+    project_id: str
+    target_vci: float
+    feasible: bool
+    annual_budget: float            # start-year Rand, escalated by CPI each year
+    budget_profile: List[float]     # nominal cap per year
+    year_count: int
+    yearly_data: List[YearlyResult]
+    total_cost_npv: float
+    min_condition_index: float
+    evaluations: int                # scenarios evaluated by the solver
+    generated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+# ============================================================
+# OUTPUT: Sensitivity / tornado
+# ============================================================
+
+class TornadoBar(BaseModel):
+    assumption: str
+    low_input: float
+    high_input: float
+    low_total_cost_npv: float
+    high_total_cost_npv: float
+    low_final_network_condition: float
+    high_final_network_condition: float
+    swing: float                    # |high - low| of the ranking metric
+
+
+class SensitivityOut(BaseModel):
+    project_id: str
+    rank_by: str
+    perturbation: float
+    base_total_cost_npv: float
+    base_final_network_condition: float
+    bars: List[TornadoBar]          # largest swing first
+    generated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+# ============================================================
+# OUTPUT: Background job status
+# ============================================================
+
+class SimulationJobOut(BaseModel):
+    id: UUID
+    project_id: UUID
+    kind: str
+    status: str                     # queued | running | completed | failed
+    progress: float = 0
+    request: Dict[str, Any] = {}
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+# ============================================================
+# OUTPUT: National roll-up (per province + national aggregate)
+# ============================================================
+
+class NationalRollupOut(BaseModel):
+    project_id: str
+    year_count: int
+    years: List[int]
+    paved_share: float
+    provinces: List[BatchVariantResult]     # label = province_name
+    national: BatchVariantResult            # sums; VCI and % bands length-weighted
+    generated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+# ============================================================
+# OUTPUT: Cross-run analytics (simulation_yearly)
+# ============================================================
+
+YearlyMetric = Literal[
+    "avg_condition_index", "pct_good", "pct_fair", "pct_poor", "total_maintenance_cost", "asset_value"
+]
+
+
+class RunMetricValue(BaseModel):
+    run_id: UUID
+    run_name: Optional[str] = None
+    run_at: datetime
+    value: float
+
+
+class YearAcrossRunsOut(BaseModel):
+    project_id: UUID
+    year: int
+    metric: str
+    run_count: int
+    min: Optional[float] = None
+    avg: Optional[float] = None
+    max: Optional[float] = None
+    runs: List[RunMetricValue]
+
+
+class TrajectoryPoint(BaseModel):
+    year: int
+    run_count: int
+    min: float
+    avg: float
+    max: float
+
+
+class TrajectoryOut(BaseModel):
+    project_id: UUID
+    metric: str
+    tag: Optional[str] = None
+    points: List[TrajectoryPoint]
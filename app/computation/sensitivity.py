@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from typing import List, Tuple
+from uuid import UUID
+
+import numpy as np
+
+from app.scenarios.schemas import ForecastParametersOut
+from . import engine
+from .schemas import SensitivityOut, SensitivityRequest, SimulationVariant, TornadoBar
+
+# (label, ScenarioBatch field, upper bound for the perturbed value)
+# decay_rate and improvement_rate are reported as multipliers on the engine's
+# do-nothing decay and funded VCI gain (1.0 = base). Sensitivity runs are
+# uncapped, so decay only moves do-nothing runs and improvement only funded ones.
+ASSUMPTIONS: List[Tuple[str, str, float]] = [
+    ("cpi_percentage", "inflation", np.inf),
+    ("discount_rate", "discount_rate", np.inf),
+    ("unit_cost_paved", "unit_cost_paved", np.inf),
+    ("unit_cost_gravel", "unit_cost_gravel", np.inf),
+    ("decay_rate", "decay_scale", np.inf),
+    ("improvement_rate", "improvement_scale", np.inf),
+    ("avg_vci", "start_vci", 100.0),
+]
+
+# Fields reported as percentages rather than the engine's fractions
+PERCENT_FIELDS = {"inflation", "discount_rate"}
+
+
+def run_sensitivity(
+    project_id: UUID,
+    params: ForecastParametersOut,
+    network_profile: dict,
+    spec: SensitivityRequest,
+) -> SensitivityOut:
+    """
+    Builds 1 + 2K scenarios (base, then low/high per assumption) and runs
+    them in a single batch engine call. Assumptions whose low and high runs
+    give the same ranking metric are left out of the bars.
+    """
+    variant = SimulationVariant(include_paved=spec.include_paved, include_gravel=spec.include_gravel)
+    base = engine.build_scenario_batch(params, network_profile, [variant])
+
+    k = len(ASSUMPTIONS)
+    batch = base.repeat(1 + 2 * k)
+    inputs = []
+    for j, (_, field, upper) in enumerate(ASSUMPTIONS):
+        column = getattr(batch, field).copy()
+        low = max(0.0, column[0] * (1 - spec.perturbation))
+        high = min(upper, column[0] * (1 + spec.perturbation))
+        column[1 + 2 * j] = low
+        column[2 + 2 * j] = high
+        setattr(batch, field, column)
+        scale = 100.0 if field in PERCENT_FIELDS else 1.0
+        inputs.append((low * scale, high * scale))
+
+    duration = engine.duration_for(params)
+    result = engine.run_ronet_batch(batch, duration, engine.start_year_for(spec.start_year_override))
+
+    npv = result.total_cost_npv
+    final_vci = np.round(result.avg_condition_index[:, -1], 2)
+    metric = npv if spec.rank_by == "total_cost_npv" else final_vci
+
+    bars = [
+        TornadoBar(
+            assumption=label,
+            low_input=round(inputs[j][0], 4),
+            high_input=round(inputs[j][1], 4),
+            low_total_cost_npv=float(npv[1 + 2 * j]),
+            high_total_cost_npv=float(npv[2 + 2 * j]),
+            low_final_network_condition=float(final_vci[1 + 2 * j]),
+            high_final_network_condition=float(final_vci[2 + 2 * j]),
+            swing=float(abs(metric[2 + 2 * j] - metric[1 + 2 * j])),
+        )
+        for j, (label, _, _) in enumerate(ASSUMPTIONS)
+        if metric[2 + 2 * j] != metric[1 + 2 * j]
+    ]
+    bars.sort(key=lambda b: b.swing, reverse=True)
+
+    return SensitivityOut(
+        project_id=str(project_id),
+        rank_by=spec.rank_by,
+        perturbation=spec.perturbation,
+        base_total_cost_npv=float(npv[0]),
+        base_final_network_condition=float(final_vci[0]),
+        bars=bars,
+    )
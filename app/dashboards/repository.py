@@ -4,12 +4,13 @@ from uuid import UUID
 
 from psycopg2.extras import Json
 
-from app.routers.projects import get_db_connection
+from app.routers.projects import use_db_connection
 
 
 def list_dashboards_for_project(
     project_id: UUID,
     user_id: str,
+    conn=None,
 ) -> List[Dict[str, Any]]:
     sql = """
         SELECT
@@ -21,7 +22,7 @@ def list_dashboards_for_project(
         WHERE project_id = %s AND user_id = %s
         ORDER BY is_favorite DESC, created_at DESC;
     """
-    with get_db_connection() as conn, conn.cursor() as cur:
+    with use_db_connection(conn) as db, db.cursor() as cur:
         cur.execute(sql, (str(project_id), user_id))
         rows = cur.fetchall()
         if not rows:
@@ -34,6 +35,7 @@ def fetch_dashboard(
     project_id: UUID,
     dashboard_id: UUID,
     user_id: str,
+    conn=None,
 ) -> Optional[Dict[str, Any]]:
     sql = """
         SELECT
@@ -45,7 +47,7 @@ def fetch_dashboard(
         WHERE id = %s AND project_id = %s AND user_id = %s
         LIMIT 1;
     """
-    with get_db_connection() as conn, conn.cursor() as cur:
+    with use_db_connection(conn) as db, db.cursor() as cur:
         cur.execute(sql, (str(dashboard_id), str(project_id), user_id))
         row = cur.fetchone()
         if not row:
@@ -58,6 +60,7 @@ def insert_dashboard(
     project_id: UUID,
     user_id: str,
     payload: Dict[str, Any],
+    conn=None,
 ) -> Dict[str, Any]:
     sql = """
         INSERT INTO public.project_dashboards (
@@ -72,7 +75,7 @@ def insert_dashboard(
             layout, overrides,
             created_at, updated_at;
     """
-    with get_db_connection() as conn, conn.cursor() as cur:
+    with use_db_connection(conn) as db, db.cursor() as cur:
         cur.execute(
             sql,
             (
@@ -87,7 +90,8 @@ def insert_dashboard(
         )
         row = cur.fetchone()
         cols = [d[0] for d in cur.description]
-        conn.commit()
+        if conn is None:
+            db.commit()
         return dict(zip(cols, row))
 
 
@@ -96,6 +100,7 @@ def update_dashboard(
     dashboard_id: UUID,
     user_id: str,
     payload: Dict[str, Any],
+    conn=None,
 ) -> Optional[Dict[str, Any]]:
     sql = """
         UPDATE public.project_dashboards
@@ -113,7 +118,7 @@ def update_dashboard(
             layout, overrides,
             created_at, updated_at;
     """
-    with get_db_connection() as conn, conn.cursor() as cur:
+    with use_db_connection(conn) as db, db.cursor() as cur:
         cur.execute(
             sql,
             (
@@ -131,5 +136,6 @@ def update_dashboard(
         if not row:
             return None
         cols = [d[0] for d in cur.description]
-        conn.commit()
+        if conn is None:
+            db.commit()
         return dict(zip(cols, row))
\ No newline at end of file
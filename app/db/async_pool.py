@@ -0,0 +1,88 @@
+# app/db/async_pool.py
+"""
+asyncpg pool for `async def` endpoints, so they never block the event loop
+on psycopg2. Sized by the same DB_POOL_MIN / DB_POOL_MAX / DB_POOL_TIMEOUT
+settings as app/db/pool.py.
+
+Queries use $1-style placeholders. The prepared-statement cache is off
+because Supabase's PgBouncer (transaction mode) cannot keep named statements
+across transactions.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import Optional
+
+import asyncpg
+
+from app.db.pool import _env_int
+from app.db.rls import SET_SUB_SQL_ASYNC, rls_enabled
+
+_pool: Optional[asyncpg.Pool] = None
+_pool_loop: Optional[asyncio.AbstractEventLoop] = None
+_pool_lock: Optional[asyncio.Lock] = None
+
+
+async def get_async_pool() -> asyncpg.Pool:
+    """Lazily creates the pool on the running loop (after .env is loaded)."""
+    global _pool, _pool_loop, _pool_lock
+    loop = asyncio.get_running_loop()
+    if _pool is not None and _pool_loop is loop:
+        return _pool
+
+    if _pool_lock is None or _pool_loop is not loop:
+        _pool_lock = asyncio.Lock()
+        _pool_loop = loop
+        _pool = None
+
+    async with _pool_lock:
+        if _pool is None:
+            dsn = os.getenv("DATABASE_URL")
+            if not dsn:
+                raise ValueError("DATABASE_URL missing")
+            _pool = await asyncpg.create_pool(
+                dsn,
+                min_size=max(0, _env_int("DB_POOL_MIN", 1)),
+                max_size=max(1, _env_int("DB_POOL_MAX", 10)),
+                max_inactive_connection_lifetime=_env_int("DB_POOL_RECYCLE_SECONDS", 1800),
+                statement_cache_size=0,
+            )
+    return _pool
+
+
+@asynccontextmanager
+async def get_async_connection(user_id: Optional[str] = None):
+    """
+    Async counterpart of get_db_connection: borrows a pooled asyncpg connection.
+    In RLS mode with a user_id, the block runs in a transaction scoped to that user.
+    """
+    pool = await get_async_pool()
+    async with pool.acquire(timeout=_env_int("DB_POOL_TIMEOUT", 10)) as conn:
+        if user_id and rls_enabled():
+            async with conn.transaction():
+                await conn.execute(SET_SUB_SQL_ASYNC, str(user_id))
+                yield conn
+        else:
+            yield conn
+
+
+@asynccontextmanager
+async def use_async_connection(conn=None, user_id: Optional[str] = None):
+    """
+    Yields `conn` when the caller already holds one (several reads on one
+    connection), otherwise borrows one like get_async_connection.
+    """
+    if conn is not None:
+        yield conn
+        return
+    async with get_async_connection(user_id) as own:
+        yield own
+
+
+async def close_async_pool() -> None:
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
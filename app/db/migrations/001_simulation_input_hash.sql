@@ -0,0 +1,10 @@
+-- Content-addressed memoization for simulation runs.
+-- input_hash = sha256 of (assumptions, network profile, run options minus
+-- run_name/notes, resolved start year, engine version); see app/computation/memo.py.
+
+ALTER TABLE public.simulation_results
+    ADD COLUMN IF NOT EXISTS input_hash text;
+
+CREATE INDEX IF NOT EXISTS simulation_results_project_input_hash_idx
+    ON public.simulation_results (project_id, input_hash)
+    WHERE status = 'completed';
@@ -0,0 +1,20 @@
+-- Background simulation jobs (see app/computation/jobs.py).
+-- State lives here so any API instance can answer the status poll.
+
+CREATE TABLE IF NOT EXISTS public.simulation_jobs (
+    id          uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    project_id  uuid NOT NULL REFERENCES public.projects (id) ON DELETE CASCADE,
+    user_id     uuid NOT NULL,
+    kind        text NOT NULL,
+    status      text NOT NULL DEFAULT 'queued',   -- queued | running | completed | failed
+    progress    real NOT NULL DEFAULT 0,
+    request     jsonb NOT NULL DEFAULT '{}'::jsonb,
+    result      jsonb,
+    error       text,
+    created_at  timestamptz NOT NULL DEFAULT now(),
+    started_at  timestamptz,
+    finished_at timestamptz
+);
+
+CREATE INDEX IF NOT EXISTS simulation_jobs_project_created_idx
+    ON public.simulation_jobs (project_id, created_at DESC);
@@ -0,0 +1,123 @@
+-- Row-level security for tenant tables (used with DB_RLS_MODE=1, see app/db/rls.py).
+--
+-- The API sets the caller's id per transaction:
+--     SELECT set_config('request.jwt.claim.sub', '<user uuid>', true);
+-- and the policies below only expose that user's rows (plus what a public
+-- report link shares). The API must connect as a role that neither owns these
+-- tables nor has BYPASSRLS, e.g.:
+--     CREATE ROLE mosianedi_api LOGIN PASSWORD '...' NOBYPASSRLS;
+--     GRANT USAGE ON SCHEMA public TO mosianedi_api;
+--     GRANT SELECT, INSERT, UPDATE, DELETE ON ALL TABLES IN SCHEMA public TO mosianedi_api;
+-- The helper functions are SECURITY DEFINER (owned by the table owner) so
+-- policies can look at other tables without recursing into their policies.
+
+CREATE OR REPLACE FUNCTION public.rls_sub() RETURNS uuid
+    LANGUAGE sql STABLE
+AS $$
+    SELECT nullif(current_setting('request.jwt.claim.sub', true), '')::uuid
+$$;
+
+CREATE OR REPLACE FUNCTION public.rls_owns_project(p_project_id uuid) RETURNS boolean
+    LANGUAGE sql STABLE SECURITY DEFINER SET search_path = public
+AS $$
+    SELECT EXISTS (
+        SELECT 1 FROM public.projects
+        WHERE id = p_project_id AND user_id = public.rls_sub()
+    )
+$$;
+
+CREATE OR REPLACE FUNCTION public.rls_project_is_shared(p_project_id uuid) RETURNS boolean
+    LANGUAGE sql STABLE SECURITY DEFINER SET search_path = public
+AS $$
+    SELECT EXISTS (
+        SELECT 1 FROM public.reports
+        WHERE project_id = p_project_id AND public_share_slug IS NOT NULL
+    )
+$$;
+
+CREATE OR REPLACE FUNCTION public.rls_run_is_shared(p_run_id uuid) RETURNS boolean
+    LANGUAGE sql STABLE SECURITY DEFINER SET search_path = public
+AS $$
+    SELECT EXISTS (
+        SELECT 1 FROM public.reports
+        WHERE simulation_run_id = p_run_id AND public_share_slug IS NOT NULL
+    )
+$$;
+
+CREATE OR REPLACE FUNCTION public.rls_insight_is_shared(p_insight_id uuid) RETURNS boolean
+    LANGUAGE sql STABLE SECURITY DEFINER SET search_path = public
+AS $$
+    SELECT EXISTS (
+        SELECT 1 FROM public.reports
+        WHERE ai_insight_id = p_insight_id AND public_share_slug IS NOT NULL
+    )
+$$;
+
+-- projects ------------------------------------------------------------------
+ALTER TABLE public.projects ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS projects_owner ON public.projects;
+CREATE POLICY projects_owner ON public.projects
+    USING (user_id = public.rls_sub())
+    WITH CHECK (user_id = public.rls_sub());
+
+DROP POLICY IF EXISTS projects_public_report ON public.projects;
+CREATE POLICY projects_public_report ON public.projects
+    FOR SELECT USING (public.rls_project_is_shared(id));
+
+-- proposal_data / scenario_assumptions (carry user_id) ----------------------
+ALTER TABLE public.proposal_data ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS proposal_data_owner ON public.proposal_data;
+CREATE POLICY proposal_data_owner ON public.proposal_data
+    USING (user_id = public.rls_sub())
+    WITH CHECK (user_id = public.rls_sub() AND public.rls_owns_project(project_id));
+
+ALTER TABLE public.scenario_assumptions ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS scenario_assumptions_owner ON public.scenario_assumptions;
+CREATE POLICY scenario_assumptions_owner ON public.scenario_assumptions
+    USING (user_id = public.rls_sub())
+    WITH CHECK (user_id = public.rls_sub() AND public.rls_owns_project(project_id));
+
+-- simulation_jobs (carries user_id; a job can only be queued on an own project)
+ALTER TABLE public.simulation_jobs ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS simulation_jobs_owner ON public.simulation_jobs;
+CREATE POLICY simulation_jobs_owner ON public.simulation_jobs
+    USING (user_id = public.rls_sub())
+    WITH CHECK (user_id = public.rls_sub() AND public.rls_owns_project(project_id));
+
+-- simulation_results / reports / ai_insights (scoped through the project) ---
+ALTER TABLE public.simulation_results ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS simulation_results_owner ON public.simulation_results;
+CREATE POLICY simulation_results_owner ON public.simulation_results
+    USING (public.rls_owns_project(project_id))
+    WITH CHECK (public.rls_owns_project(project_id));
+
+DROP POLICY IF EXISTS simulation_results_public_report ON public.simulation_results;
+CREATE POLICY simulation_results_public_report ON public.simulation_results
+    FOR SELECT USING (public.rls_run_is_shared(id));
+
+ALTER TABLE public.reports ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS reports_owner ON public.reports;
+CREATE POLICY reports_owner ON public.reports
+    USING (public.rls_owns_project(project_id))
+    WITH CHECK (public.rls_owns_project(project_id));
+
+DROP POLICY IF EXISTS reports_public ON public.reports;
+CREATE POLICY reports_public ON public.reports
+    FOR SELECT USING (public_share_slug IS NOT NULL);
+
+ALTER TABLE public.ai_insights ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS ai_insights_owner ON public.ai_insights;
+CREATE POLICY ai_insights_owner ON public.ai_insights
+    USING (public.rls_owns_project(project_id))
+    WITH CHECK (public.rls_owns_project(project_id));
+
+DROP POLICY IF EXISTS ai_insights_public_report ON public.ai_insights;
+CREATE POLICY ai_insights_public_report ON public.ai_insights
+    FOR SELECT USING (public.rls_insight_is_shared(id));
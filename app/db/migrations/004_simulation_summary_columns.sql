@@ -0,0 +1,19 @@
+-- Scalar summary columns for simulation history (GET .../simulation/history/summary).
+-- Written at insert time so listing runs never has to read results_payload.
+
+ALTER TABLE public.simulation_results
+    ADD COLUMN IF NOT EXISTS total_cost_npv double precision,
+    ADD COLUMN IF NOT EXISTS final_network_condition double precision,
+    ADD COLUMN IF NOT EXISTS year_count integer;
+
+-- Backfill existing runs (rows and columnar payloads keep these at the top level).
+UPDATE public.simulation_results
+SET
+    total_cost_npv = (results_payload ->> 'total_cost_npv')::double precision,
+    final_network_condition = (results_payload ->> 'final_network_condition')::double precision,
+    year_count = (results_payload ->> 'year_count')::integer
+WHERE year_count IS NULL AND results_payload IS NOT NULL;
+
+-- Keyset pagination: WHERE project_id = $1 AND (run_at, id) < ($2, $3) ORDER BY run_at DESC, id DESC
+CREATE INDEX IF NOT EXISTS simulation_results_project_run_at_id_idx
+    ON public.simulation_results (project_id, run_at DESC, id DESC);
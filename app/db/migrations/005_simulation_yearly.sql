@@ -0,0 +1,74 @@
+-- Normalized per-year results, one row per (run, year), written in the same
+-- transaction as the simulation_results insert (see app/computation/router.py).
+-- Lets cross-run questions ("VCI in 2030 across runs") be plain SQL aggregates
+-- instead of parsing every results_payload.
+
+CREATE TABLE IF NOT EXISTS public.simulation_yearly (
+    run_id                 uuid NOT NULL REFERENCES public.simulation_results (id) ON DELETE CASCADE,
+    project_id             uuid NOT NULL,
+    year                   integer NOT NULL,
+    avg_condition_index    double precision NOT NULL,
+    pct_good               double precision NOT NULL,
+    pct_fair               double precision NOT NULL,
+    pct_poor               double precision NOT NULL,
+    total_maintenance_cost double precision NOT NULL,
+    asset_value            double precision NOT NULL,
+    PRIMARY KEY (run_id, year)
+);
+
+CREATE INDEX IF NOT EXISTS simulation_yearly_project_year_idx
+    ON public.simulation_yearly (project_id, year);
+
+-- Free-form labels for grouping runs (SimulationRunOptions.tags).
+ALTER TABLE public.simulation_results
+    ADD COLUMN IF NOT EXISTS tags text[] NOT NULL DEFAULT '{}';
+
+CREATE INDEX IF NOT EXISTS simulation_results_tags_idx
+    ON public.simulation_results USING gin (tags);
+
+-- Backfill: row-shaped payloads ...
+INSERT INTO public.simulation_yearly
+    (run_id, project_id, year, avg_condition_index, pct_good, pct_fair, pct_poor,
+     total_maintenance_cost, asset_value)
+SELECT
+    sr.id, sr.project_id, (y ->> 'year')::integer,
+    (y ->> 'avg_condition_index')::double precision,
+    (y ->> 'pct_good')::double precision,
+    (y ->> 'pct_fair')::double precision,
+    (y ->> 'pct_poor')::double precision,
+    (y ->> 'total_maintenance_cost')::double precision,
+    (y ->> 'asset_value')::double precision
+FROM public.simulation_results sr
+CROSS JOIN LATERAL jsonb_array_elements(sr.results_payload -> 'yearly_data') AS y
+WHERE jsonb_typeof(sr.results_payload -> 'yearly_data') = 'array'
+ON CONFLICT (run_id, year) DO NOTHING;
+
+-- ... and columnar ones (parallel arrays, see app/computation/results_codec.py)
+INSERT INTO public.simulation_yearly
+    (run_id, project_id, year, avg_condition_index, pct_good, pct_fair, pct_poor,
+     total_maintenance_cost, asset_value)
+SELECT
+    sr.id, sr.project_id, (c -> 'year' ->> i)::integer,
+    (c -> 'avg_condition_index' ->> i)::double precision,
+    (c -> 'pct_good' ->> i)::double precision,
+    (c -> 'pct_fair' ->> i)::double precision,
+    (c -> 'pct_poor' ->> i)::double precision,
+    (c -> 'total_maintenance_cost' ->> i)::double precision,
+    (c -> 'asset_value' ->> i)::double precision
+FROM public.simulation_results sr
+CROSS JOIN LATERAL (SELECT sr.results_payload -> 'yearly_data' AS c) cols
+CROSS JOIN LATERAL generate_series(0, jsonb_array_length(cols.c -> 'year') - 1) AS i
+WHERE jsonb_typeof(sr.results_payload -> 'yearly_data') = 'object'
+ON CONFLICT (run_id, year) DO NOTHING;
+
+-- Same isolation as simulation_results when 003_row_level_security.sql is applied.
+DO $$
+BEGIN
+    IF to_regprocedure('public.rls_owns_project(uuid)') IS NOT NULL THEN
+        ALTER TABLE public.simulation_yearly ENABLE ROW LEVEL SECURITY;
+        DROP POLICY IF EXISTS simulation_yearly_owner ON public.simulation_yearly;
+        CREATE POLICY simulation_yearly_owner ON public.simulation_yearly
+            USING (public.rls_owns_project(project_id))
+            WITH CHECK (public.rls_owns_project(project_id));
+    END IF;
+END $$;
@@ -0,0 +1,66 @@
+-- Per-project KPI card data for the project list (see app/project_summary.py).
+-- Refreshed in the same transaction as run_simulation, set_active_simulation
+-- and the proposal-data PATCH, so GET /projects is a single indexed query.
+
+CREATE TABLE IF NOT EXISTS public.project_summary (
+    project_id              uuid PRIMARY KEY REFERENCES public.projects (id) ON DELETE CASCADE,
+    user_id                 uuid NOT NULL,
+
+    -- active simulation run
+    active_run_id           uuid,
+    active_run_at           timestamptz,
+    total_cost_npv          double precision,
+    final_network_condition double precision,
+    final_asset_value       double precision,
+
+    -- network snapshot (proposal_data)
+    total_length_km         double precision NOT NULL DEFAULT 0,
+    paved_length_km         double precision NOT NULL DEFAULT 0,
+    gravel_length_km        double precision NOT NULL DEFAULT 0,
+    network_asset_value     double precision NOT NULL DEFAULT 0,
+    avg_vci                 double precision NOT NULL DEFAULT 0,
+
+    updated_at              timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS project_summary_user_idx
+    ON public.project_summary (user_id);
+
+-- Same isolation as projects when 003_row_level_security.sql is applied.
+DO $$
+BEGIN
+    IF to_regprocedure('public.rls_owns_project(uuid)') IS NOT NULL THEN
+        ALTER TABLE public.project_summary ENABLE ROW LEVEL SECURITY;
+        DROP POLICY IF EXISTS project_summary_owner ON public.project_summary;
+        CREATE POLICY project_summary_owner ON public.project_summary
+            USING (user_id = public.rls_sub())
+            WITH CHECK (public.rls_owns_project(project_id));
+    END IF;
+END $$;
+
+-- Backfill (same computation as app.project_summary.REFRESH_SQL; CRC rates
+-- R3.5m / R250k per km as in app/computation/engine.py).
+INSERT INTO public.project_summary (
+    project_id, user_id,
+    active_run_id, active_run_at, total_cost_npv, final_network_condition, final_asset_value,
+    total_length_km, paved_length_km, gravel_length_km, network_asset_value, avg_vci
+)
+SELECT
+    p.id, p.user_id,
+    sr.id, sr.run_at, sr.total_cost_npv, sr.final_network_condition,
+    (SELECT y.asset_value FROM public.simulation_yearly y
+     WHERE y.run_id = sr.id ORDER BY y.year DESC LIMIT 1),
+    net.paved + net.gravel, net.paved, net.gravel,
+    net.paved * 3500000 + net.gravel * 250000,
+    coalesce(pd.avg_vci_used, 0)
+FROM public.projects p
+LEFT JOIN public.simulation_results sr ON sr.id = p.active_simulation_run_id
+LEFT JOIN public.proposal_data pd ON pd.project_id = p.id
+CROSS JOIN LATERAL (
+    SELECT
+        coalesce(pd.paved_arid, 0) + coalesce(pd.paved_semi_arid, 0) + coalesce(pd.paved_dry_sub_humid, 0)
+            + coalesce(pd.paved_moist_sub_humid, 0) + coalesce(pd.paved_humid, 0) AS paved,
+        coalesce(pd.gravel_arid, 0) + coalesce(pd.gravel_semi_arid, 0) + coalesce(pd.gravel_dry_sub_humid, 0)
+            + coalesce(pd.gravel_moist_sub_humid, 0) + coalesce(pd.gravel_humid, 0) AS gravel
+) net
+ON CONFLICT (project_id) DO NOTHING;
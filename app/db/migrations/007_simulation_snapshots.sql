@@ -0,0 +1,59 @@
+-- Content-addressed snapshot storage for simulation runs.
+-- assumptions_snapshot / network_snapshot / run_options repeat byte for byte
+-- across most runs; each distinct body is stored once in simulation_snapshots
+-- and the run row keeps only its hash. Reads join the bodies back.
+--
+-- hash = sha256 of the jsonb's canonical text form, computed in SQL both here
+-- and at insert time (app/computation/router.py), so equal bodies always
+-- share a row. Snapshots are scoped per project (that is where the repeats
+-- are) so tenant isolation stays a plain project_id check. Bodies are
+-- immutable; they go away with the project.
+
+CREATE TABLE IF NOT EXISTS public.simulation_snapshots (
+    project_id uuid NOT NULL REFERENCES public.projects (id) ON DELETE CASCADE,
+    hash       text NOT NULL,
+    body       jsonb NOT NULL,
+    created_at timestamptz NOT NULL DEFAULT now(),
+    PRIMARY KEY (project_id, hash)
+);
+
+ALTER TABLE public.simulation_results
+    ADD COLUMN IF NOT EXISTS run_options_hash text,
+    ADD COLUMN IF NOT EXISTS assumptions_hash text,
+    ADD COLUMN IF NOT EXISTS network_hash text;
+
+-- Backfill: move existing bodies into the snapshot table ...
+INSERT INTO public.simulation_snapshots (project_id, hash, body)
+SELECT DISTINCT ON (sr.project_id, h.hash) sr.project_id, h.hash, v.b
+FROM public.simulation_results sr
+CROSS JOIN LATERAL (VALUES (sr.run_options), (sr.assumptions_snapshot), (sr.network_snapshot)) v(b)
+CROSS JOIN LATERAL (SELECT encode(sha256(convert_to(v.b::text, 'UTF8')), 'hex') AS hash) h
+WHERE v.b IS NOT NULL
+ON CONFLICT (project_id, hash) DO NOTHING;
+
+-- ... and point the runs at them. The inline copies stay until
+-- 010_drop_inline_run_snapshots.sql has checked each one against its snapshot;
+-- until then reads fall back to them.
+UPDATE public.simulation_results
+SET
+    run_options_hash = encode(sha256(convert_to(run_options::text, 'UTF8')), 'hex'),
+    assumptions_hash = encode(sha256(convert_to(assumptions_snapshot::text, 'UTF8')), 'hex'),
+    network_hash = encode(sha256(convert_to(network_snapshot::text, 'UTF8')), 'hex')
+WHERE run_options_hash IS NULL;
+
+ALTER TABLE public.simulation_results
+    ALTER COLUMN run_options DROP NOT NULL,
+    ALTER COLUMN assumptions_snapshot DROP NOT NULL,
+    ALTER COLUMN network_snapshot DROP NOT NULL;
+
+-- Same isolation as simulation_results when 003_row_level_security.sql is applied.
+DO $$
+BEGIN
+    IF to_regprocedure('public.rls_owns_project(uuid)') IS NOT NULL THEN
+        ALTER TABLE public.simulation_snapshots ENABLE ROW LEVEL SECURITY;
+        DROP POLICY IF EXISTS simulation_snapshots_owner ON public.simulation_snapshots;
+        CREATE POLICY simulation_snapshots_owner ON public.simulation_snapshots
+            USING (public.rls_owns_project(project_id))
+            WITH CHECK (public.rls_owns_project(project_id));
+    END IF;
+END $$;
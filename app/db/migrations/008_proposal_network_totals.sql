@@ -0,0 +1,17 @@
+-- Paved / gravel network totals kept on proposal_data by Postgres itself, so the
+-- network snapshot and project_summary read two columns instead of summing the
+-- ten climate-zone columns on every call. STORED generated columns are
+-- recomputed on every write, including the proposal-data PATCH upsert.
+--
+-- Optional: the API only reads these columns with DB_PROPOSAL_TOTAL_COLUMNS=1
+-- (app/db/proposal_totals.py); without it the zone columns are summed per query.
+
+ALTER TABLE public.proposal_data
+    ADD COLUMN IF NOT EXISTS paved_total_km double precision GENERATED ALWAYS AS (
+        coalesce(paved_arid, 0) + coalesce(paved_semi_arid, 0) + coalesce(paved_dry_sub_humid, 0)
+        + coalesce(paved_moist_sub_humid, 0) + coalesce(paved_humid, 0)
+    ) STORED,
+    ADD COLUMN IF NOT EXISTS gravel_total_km double precision GENERATED ALWAYS AS (
+        coalesce(gravel_arid, 0) + coalesce(gravel_semi_arid, 0) + coalesce(gravel_dry_sub_humid, 0)
+        + coalesce(gravel_moist_sub_humid, 0) + coalesce(gravel_humid, 0)
+    ) STORED;
@@ -0,0 +1,7 @@
+-- Liveness for background simulation jobs (see app/computation/jobs.py).
+-- Workers touch heartbeat_at whenever they report progress; a queued/running
+-- job whose last sign of life is older than SIMULATION_JOB_STALE_AFTER is
+-- marked failed when it is polled (e.g. the serverless instance was frozen).
+
+ALTER TABLE public.simulation_jobs
+    ADD COLUMN IF NOT EXISTS heartbeat_at timestamptz;
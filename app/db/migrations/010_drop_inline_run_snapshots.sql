@@ -0,0 +1,25 @@
+-- Second half of 007_simulation_snapshots.sql: clear the inline
+-- run_options / assumptions_snapshot / network_snapshot copies of runs that
+-- now point at simulation_snapshots. Each copy is only dropped when its
+-- snapshot row exists and holds the same body; anything else stays inline
+-- (reads coalesce the two).
+--
+-- Run it once 007 is applied and the API reading the snapshot table is live.
+
+UPDATE public.simulation_results sr
+SET
+    run_options = CASE WHEN EXISTS (
+        SELECT 1 FROM public.simulation_snapshots s
+        WHERE s.project_id = sr.project_id AND s.hash = sr.run_options_hash AND s.body = sr.run_options
+    ) THEN NULL ELSE sr.run_options END,
+    assumptions_snapshot = CASE WHEN EXISTS (
+        SELECT 1 FROM public.simulation_snapshots s
+        WHERE s.project_id = sr.project_id AND s.hash = sr.assumptions_hash AND s.body = sr.assumptions_snapshot
+    ) THEN NULL ELSE sr.assumptions_snapshot END,
+    network_snapshot = CASE WHEN EXISTS (
+        SELECT 1 FROM public.simulation_snapshots s
+        WHERE s.project_id = sr.project_id AND s.hash = sr.network_hash AND s.body = sr.network_snapshot
+    ) THEN NULL ELSE sr.network_snapshot END
+WHERE sr.run_options IS NOT NULL
+   OR sr.assumptions_snapshot IS NOT NULL
+   OR sr.network_snapshot IS NOT NULL;
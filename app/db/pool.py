@@ -0,0 +1,133 @@
+# app/db/pool.py
+"""
+Process-wide Postgres connection pool used by get_db_connection.
+
+Env:
+  DB_POOL_ENABLED          "0" falls back to one connection per use (default "1")
+  DB_POOL_MIN / DB_POOL_MAX       pool size (default 1 / 10)
+  DB_POOL_TIMEOUT          seconds to wait for a free connection (default 10)
+  DB_POOL_RECYCLE_SECONDS  close connections older than this (default 1800)
+  DB_POOL_PING_AFTER       idle seconds after which a connection is pinged
+                           with SELECT 1 before reuse (default 30)
+
+Connections are always handed back with no open transaction and no session
+state is set, so the pool is safe behind PgBouncer in transaction mode.
+In RLS mode (app/db/rls.py) the per-connection user binding is cleared too.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+import psycopg2
+from psycopg2 import extensions, pool as pg_pool
+
+from app.db.rls import connection_factory
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+class ConnectionPool:
+    def __init__(self, dsn: str):
+        self.minconn = max(0, _env_int("DB_POOL_MIN", 1))
+        self.maxconn = max(1, _env_int("DB_POOL_MAX", 10))
+        self.timeout = _env_int("DB_POOL_TIMEOUT", 10)
+        self.recycle_seconds = _env_int("DB_POOL_RECYCLE_SECONDS", 1800)
+        self.ping_after = _env_int("DB_POOL_PING_AFTER", 30)
+
+        self._pool = pg_pool.ThreadedConnectionPool(
+            self.minconn, self.maxconn, dsn, connection_factory=connection_factory()
+        )
+        self._slots = threading.BoundedSemaphore(self.maxconn)
+        self._born: Dict[int, float] = {}
+        self._last_used: Dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def _is_stale(self, conn) -> bool:
+        key = id(conn)
+        now = time.monotonic()
+        with self._lock:
+            born = self._born.setdefault(key, now)
+            last_used = self._last_used.get(key, now)
+
+        if conn.closed:
+            return True
+        if self.recycle_seconds and now - born > self.recycle_seconds:
+            return True
+        if self.ping_after and now - last_used > self.ping_after:
+            try:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT 1")
+                conn.rollback()
+            except psycopg2.Error:
+                return True
+        return False
+
+    def _discard(self, conn) -> None:
+        with self._lock:
+            self._born.pop(id(conn), None)
+            self._last_used.pop(id(conn), None)
+        self._pool.putconn(conn, close=True)
+
+    def getconn(self):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise pg_pool.PoolError(f"No database connection available after {self.timeout}s")
+        try:
+            # A stale connection is replaced once; a second failure surfaces to the caller.
+            for _ in range(2):
+                conn = self._pool.getconn()
+                if not self._is_stale(conn):
+                    return conn
+                self._discard(conn)
+            return self._pool.getconn()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def putconn(self, conn) -> None:
+        try:
+            if conn.closed:
+                self._discard(conn)
+                return
+            if conn.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+            if getattr(conn, "rls_sub", None) is not None:
+                conn.rls_sub = None
+            with self._lock:
+                self._last_used[id(conn)] = time.monotonic()
+            self._pool.putconn(conn)
+        except psycopg2.Error:
+            self._discard(conn)
+        finally:
+            self._slots.release()
+
+    def closeall(self) -> None:
+        self._pool.closeall()
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_pid: Optional[int] = None
+_pool_lock = threading.Lock()
+
+
+def pool_enabled() -> bool:
+    return os.getenv("DB_POOL_ENABLED", "1") != "0"
+
+
+def get_pool(dsn: str) -> ConnectionPool:
+    """Lazily builds the pool (after .env is loaded); rebuilt in forked children."""
+    global _pool, _pool_pid
+    if _pool is not None and _pool_pid == os.getpid():
+        return _pool
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ConnectionPool(dsn)
+            _pool_pid = os.getpid()
+    return _pool
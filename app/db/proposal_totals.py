@@ -0,0 +1,69 @@
+# app/db/proposal_totals.py
+"""
+Paved / gravel network totals of a proposal_data row, as SQL expressions, and
+the network profile (lengths, VCI, CRC asset value) shaped from them.
+
+With DB_PROPOSAL_TOTAL_COLUMNS=1 (once 008_proposal_network_totals.sql is
+applied) they read the generated paved_total_km / gravel_total_km columns;
+otherwise the five climate-zone columns are summed in the query, so the API
+also runs against a database without 008.
+"""
+from __future__ import annotations
+
+import os
+from typing import Any, Dict
+
+_ZONES = ("arid", "semi_arid", "dry_sub_humid", "moist_sub_humid", "humid")
+
+
+def total_columns_enabled() -> bool:
+    return os.getenv("DB_PROPOSAL_TOTAL_COLUMNS", "0") == "1"
+
+
+def _total_sql(surface: str, table: str) -> str:
+    if total_columns_enabled():
+        return f"coalesce({table}.{surface}_total_km, 0)"
+    return " + ".join(f"coalesce({table}.{surface}_{zone}, 0)" for zone in _ZONES)
+
+
+def paved_km_sql(table: str = "pd") -> str:
+    return _total_sql("paved", table)
+
+
+def gravel_km_sql(table: str = "pd") -> str:
+    return _total_sql("gravel", table)
+
+
+def _n(x) -> float:
+    """Helper to convert None to 0.0"""
+    return float(x or 0)
+
+
+def network_profile(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    NetworkProfileOut fields from a row selecting the totals AS paved_total_km /
+    gravel_total_km plus avg_vci_used, vehicle_km and fuel_sales.
+    """
+    # 2. Lengths (summed by Postgres)
+    paved_total = _n(data.get("paved_total_km"))
+    gravel_total = _n(data.get("gravel_total_km"))
+
+    total_km = paved_total + gravel_total
+
+    # 3. Calculate Asset Value (CRC)
+    # Using standard engineering estimates (adjust as needed)
+    RATE_PAVED = 3_500_000   # R3.5m per km
+    RATE_GRAVEL = 250_000    # R250k per km
+
+    asset_value = (paved_total * RATE_PAVED) + (gravel_total * RATE_GRAVEL)
+
+    # 4. Return Flat Structure (matching React state)
+    return {
+        "totalLengthKm": round(total_km, 2),
+        "pavedLengthKm": round(paved_total, 2),
+        "gravelLengthKm": round(gravel_total, 2),
+        "avgVci": _n(data.get("avg_vci_used")),
+        "assetValue": round(asset_value, 2),
+        "totalVehicleKm": _n(data.get("vehicle_km")),
+        "fuelSales": _n(data.get("fuel_sales"))
+    }
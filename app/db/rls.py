@@ -0,0 +1,85 @@
+# app/db/rls.py
+"""
+Row-level-security mode (DB_RLS_MODE=1).
+
+The authenticated user's id is passed to Postgres as the transaction-local
+setting `request.jwt.claim.sub` (the same one Supabase's auth.uid() reads),
+and the policies in app/db/migrations/003_row_level_security.sql restrict
+every tenant table to that user. Because the setting is local to the
+transaction, nothing leaks across PgBouncer (transaction mode) clients or
+pooled connections.
+
+psycopg2 opens transactions implicitly, so RLSCursor prepends the
+set_config() call to the first statement of every transaction on a bound
+connection. Both go out in one round trip. With the policies in place the
+per-endpoint ownership pre-query becomes redundant and is skipped (see
+app/ownership.py).
+
+The API must connect as a role without BYPASSRLS for the policies to apply.
+"""
+from __future__ import annotations
+
+import os
+from typing import Optional
+
+from asyncpg.exceptions import InsufficientPrivilegeError
+from psycopg2 import extensions
+from psycopg2.errors import InsufficientPrivilege
+
+SET_SUB_SQL = "SELECT set_config('request.jwt.claim.sub', %s, true);"
+SET_SUB_SQL_ASYNC = "SELECT set_config('request.jwt.claim.sub', $1, true)"
+
+# What a policy raises when it refuses a write on someone else's row, from
+# psycopg2 and asyncpg. app/main.py answers both with a 404; catch-all
+# handlers re-raise them instead of turning them into a 500.
+PERMISSION_ERRORS = (InsufficientPrivilege, InsufficientPrivilegeError)
+
+
+def rls_enabled() -> bool:
+    return os.getenv("DB_RLS_MODE", "0") == "1"
+
+
+class RLSCursor(extensions.cursor):
+    def _needs_sub(self) -> bool:
+        conn = self.connection
+        return (
+            getattr(conn, "rls_sub", None) is not None
+            and conn.info.transaction_status == extensions.TRANSACTION_STATUS_IDLE
+        )
+
+    def execute(self, query, vars=None):
+        if self._needs_sub():
+            prefix = self.mogrify(SET_SUB_SQL, (self.connection.rls_sub,))
+            query = prefix + b" " + self.mogrify(query, vars)
+            vars = None
+        return super().execute(query, vars)
+
+    def executemany(self, query, vars_list):
+        if self._needs_sub():
+            super().execute(SET_SUB_SQL, (self.connection.rls_sub,))
+        return super().executemany(query, vars_list)
+
+
+class RLSConnection(extensions.connection):
+    """Connection whose cursors carry `rls_sub` into every transaction."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.rls_sub: Optional[str] = None
+        self.cursor_factory = RLSCursor
+
+
+def connection_factory():
+    """connection_factory for psycopg2.connect / the pool (None outside RLS mode)."""
+    return RLSConnection if rls_enabled() else None
+
+
+def bind_user(conn, user_id: Optional[str]) -> None:
+    """Scopes every following transaction on `conn` to user_id (no-op outside RLS mode)."""
+    if isinstance(conn, RLSConnection):
+        conn.rls_sub = str(user_id) if user_id else None
+
+
+def is_bound_to(conn, user_id: str) -> bool:
+    """True when RLS policies already restrict `conn` to user_id."""
+    return isinstance(conn, RLSConnection) and conn.rls_sub == str(user_id)
@@ -28,4 +28,58 @@ class ProjectDB(BaseModel):
     updated_at: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class ProjectSummary(BaseModel):
+    """Card KPIs from public.project_summary (active run + network totals)."""
+    active_run_id: Optional[UUID] = None
+    active_run_at: Optional[datetime] = None
+    total_cost_npv: Optional[float] = None
+    final_network_condition: Optional[float] = None
+    final_asset_value: Optional[float] = None
+
+    total_length_km: float = 0
+    paved_length_km: float = 0
+    gravel_length_km: float = 0
+    network_asset_value: float = 0
+    avg_vci: float = 0
+
+
+class ProjectListItem(ProjectDB):
+    summary: Optional[ProjectSummary] = None   # None until the project is first refreshed
+
+
+class NetworkProfileOut(BaseModel):
+    # The essential stats for the card
+    totalLengthKm: float
+    pavedLengthKm: float
+    gravelLengthKm: float
+    
+    avgVci: float
+    assetValue: float      # The big money number (CRC)
+    
+    totalVehicleKm: float
+    fuelSales: float
+    
+    # Optional metadata if needed later
+    generated_at: Optional[str] = None
+
+
+class PortfolioActiveRun(BaseModel):
+    # KPIs of the project's active simulation run
+    id: UUID
+    run_name: Optional[str] = None
+    run_at: datetime
+    total_cost_npv: Optional[float] = None
+    final_network_condition: Optional[float] = None
+    final_asset_value: Optional[float] = None
+
+
+class PortfolioProjectOut(BaseModel):
+    project_id: UUID
+    project_name: str
+    province: str
+    start_year: int
+
+    network: NetworkProfileOut
+    active_run: Optional[PortfolioActiveRun] = None    # None until a run is made active
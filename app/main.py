@@ -1,10 +1,12 @@
 # app/main.py
 
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 from dotenv import load_dotenv
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 # -------------------------------------------------------------------
 # 1. Load .env
@@ -16,7 +18,7 @@ load_dotenv(BASE_DIR / ".env")
 # 2. Router Imports
 # -------------------------------------------------------------------
 # Core Project & User context
-from app.routers.projects import router as projects_router
+from app.routers.projects import get_current_user_id, router as projects_router
 from app.proposal_data.router import router as proposal_data_router
 
 # Provincial data inputs (province-by-province)
@@ -32,15 +34,35 @@ from app.computation.router import router as computation_router
 from app.ai_advisor.router import router as ai_router
 from app.reports.router import router as reports_router
 
+from app.auth import token_cache_stats
+from app.db.async_pool import close_async_pool
+from app.db.rls import PERMISSION_ERRORS
+
 # -------------------------------------------------------------------
 # 3. App Config
 # -------------------------------------------------------------------
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await close_async_pool()  # asyncpg pool is created lazily on first use
+
+
 app = FastAPI(
+    lifespan=lifespan,
     title="Mosianedi Investment API",
     description="API Gateway for Provincial Road Budget Proposals & Forecasting.",
     version="1.0.0",
 )
 
+# RLS mode: a policy refusing a write on someone else's project reads as a
+# missing project, never a 500 carrying the policy message.
+async def permission_denied_handler(request: Request, exc: Exception):
+    return JSONResponse(status_code=404, content={"detail": "Project not found."})
+
+
+for _exc in PERMISSION_ERRORS:
+    app.add_exception_handler(_exc, permission_denied_handler)
+
 # -------------------------------------------------------------------
 # 4. CORS Middleware
 # -------------------------------------------------------------------
@@ -57,6 +79,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],   # history paging, proposal_data If-Match
 )
 
 # -------------------------------------------------------------------
@@ -89,6 +112,12 @@ def health_check():
     return {"status": "online", "version": "1.0.0"}
 
 
+# Auth cache counters are operational detail: signed-in callers only.
+@app.get("/api/health/token-cache")
+def token_cache_health(user_id: str = Depends(get_current_user_id)):
+    return token_cache_stats()
+
+
 @app.get("/")
 def read_root():
     return {
@@ -1,7 +1,7 @@
 from uuid import UUID
 from fastapi import APIRouter, Depends
 
-from app.routers.projects import get_current_user_id
+from app.routers.projects import get_current_user_id, get_db
 from .service import get_network_snapshot
 from .schemas import NetworkProfileOut
 
@@ -15,5 +15,6 @@ router = APIRouter()
 def read_network_snapshot(
     project_id: UUID,
     user_id: str = Depends(get_current_user_id),
+    conn=Depends(get_db),
 ):
-    return get_network_snapshot(project_id=project_id, user_id=user_id)
\ No newline at end of file
+    return get_network_snapshot(project_id=project_id, user_id=user_id, conn=conn)
\ No newline at end of file
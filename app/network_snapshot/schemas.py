@@ -1,17 +1,4 @@
-from pydantic import BaseModel
-from typing import Optional
+# NetworkProfileOut is shared with the project portfolio (app/db/schemas.py)
+from app.db.schemas import NetworkProfileOut
 
-class NetworkProfileOut(BaseModel):
-    # The essential stats for the card
-    totalLengthKm: float
-    pavedLengthKm: float
-    gravelLengthKm: float
-    
-    avgVci: float
-    assetValue: float      # The big money number (CRC)
-    
-    totalVehicleKm: float
-    fuelSales: float
-    
-    # Optional metadata if needed later
-    generated_at: Optional[str] = None
\ No newline at end of file
+__all__ = ["NetworkProfileOut"]
@@ -1,63 +1,57 @@
+"""
+Network snapshot (lengths, VCI, CRC asset value) from a project's proposal_data.
+
+The paved / gravel totals are summed by Postgres (app/db/proposal_totals.py),
+so each call is one indexed lookup returning a single narrow row. Nothing is
+cached in-process: a version probe would cost the same round trip as the read.
+"""
 from uuid import UUID
 from typing import Dict, Any
-from app.routers.projects import get_db_connection
+from app.routers.projects import use_db_connection
+from app.db.async_pool import use_async_connection
+from app.db.proposal_totals import gravel_km_sql, network_profile, paved_km_sql
+
+_SNAPSHOT_COLUMNS = f"""
+    {paved_km_sql("proposal_data")} AS paved_total_km,
+    {gravel_km_sql("proposal_data")} AS gravel_total_km,
+    avg_vci_used, vehicle_km, fuel_sales
+"""
 
-def _n(x) -> float:
-    """Helper to convert None to 0.0"""
-    return float(x or 0)
+_EMPTY_SNAPSHOT = {
+    "totalLengthKm": 0, "pavedLengthKm": 0, "gravelLengthKm": 0,
+    "avgVci": 0, "assetValue": 0, "totalVehicleKm": 0, "fuelSales": 0
+}
 
-def get_network_snapshot(project_id: UUID, user_id: str) -> Dict[str, Any]:
+def get_network_snapshot(project_id: UUID, user_id: str, conn=None) -> Dict[str, Any]:
     # 1. Fetch Proposal Inputs
-    sql = """
-        SELECT 
-            paved_arid, paved_semi_arid, paved_dry_sub_humid, paved_moist_sub_humid, paved_humid,
-            gravel_arid, gravel_semi_arid, gravel_dry_sub_humid, gravel_moist_sub_humid, gravel_humid,
-            avg_vci_used, vehicle_km, fuel_sales
+    sql = f"""
+        SELECT {_SNAPSHOT_COLUMNS}
         FROM public.proposal_data
         WHERE project_id = %s AND user_id = %s
     """
-    
-    with get_db_connection() as conn:
-        with conn.cursor() as cur:
+
+    with use_db_connection(conn) as db:
+        with db.cursor() as cur:
             cur.execute(sql, (str(project_id), user_id))
             row = cur.fetchone()
-            
+
             # If no data found, return zeros
             if not row:
-                return {
-                    "totalLengthKm": 0, "pavedLengthKm": 0, "gravelLengthKm": 0,
-                    "avgVci": 0, "assetValue": 0, "totalVehicleKm": 0, "fuelSales": 0
-                }
-                
+                return dict(_EMPTY_SNAPSHOT)
+
             data = dict(zip([d[0] for d in cur.description], row))
 
-    # 2. Sum up lengths
-    paved_total = (
-        _n(data.get("paved_arid")) + _n(data.get("paved_semi_arid")) + 
-        _n(data.get("paved_dry_sub_humid")) + _n(data.get("paved_moist_sub_humid")) + _n(data.get("paved_humid"))
-    )
-    
-    gravel_total = (
-        _n(data.get("gravel_arid")) + _n(data.get("gravel_semi_arid")) + 
-        _n(data.get("gravel_dry_sub_humid")) + _n(data.get("gravel_moist_sub_humid")) + _n(data.get("gravel_humid"))
-    )
-    
-    total_km = paved_total + gravel_total
-
-    # 3. Calculate Asset Value (CRC)
-    # Using standard engineering estimates (adjust as needed)
-    RATE_PAVED = 3_500_000   # R3.5m per km
-    RATE_GRAVEL = 250_000    # R250k per km
-    
-    asset_value = (paved_total * RATE_PAVED) + (gravel_total * RATE_GRAVEL)
-
-    # 4. Return Flat Structure (matching React state)
-    return {
-        "totalLengthKm": round(total_km, 2),
-        "pavedLengthKm": round(paved_total, 2),
-        "gravelLengthKm": round(gravel_total, 2),
-        "avgVci": _n(data.get("avg_vci_used")),
-        "assetValue": round(asset_value, 2),
-        "totalVehicleKm": _n(data.get("vehicle_km")),
-        "fuelSales": _n(data.get("fuel_sales"))
-    }
\ No newline at end of file
+    return network_profile(data)
+
+async def get_network_snapshot_async(project_id: UUID, user_id: str, conn=None) -> Dict[str, Any]:
+    """Same as get_network_snapshot, on a pooled asyncpg connection."""
+    sql = f"""
+        SELECT {_SNAPSHOT_COLUMNS}
+        FROM public.proposal_data
+        WHERE project_id = $1 AND user_id = $2
+    """
+    async with use_async_connection(conn, user_id) as db:
+        row = await db.fetchrow(sql, project_id, user_id)
+    if not row:
+        return dict(_EMPTY_SNAPSHOT)
+    return network_profile(dict(row))
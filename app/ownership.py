@@ -0,0 +1,73 @@
+# app/ownership.py
+"""
+Shared project-ownership check.
+
+Positive answers are cached per (project_id, user_id) for a short TTL, so
+most requests skip the `SELECT 1 FROM projects` round trip. Misses are never
+cached (a just-created project is visible immediately). The API has no
+endpoint that deletes a project or changes its owner; when either happens
+elsewhere, a cached answer is trusted until its TTL runs out.
+
+Env:
+  OWNERSHIP_CACHE_SIZE  entries kept (default 4096; 0 disables the cache)
+  OWNERSHIP_CACHE_TTL   seconds an answer is trusted (default 60)
+"""
+from __future__ import annotations
+
+import os
+from uuid import UUID
+
+from app.cache import LRUCache
+from app.db.async_pool import use_async_connection
+from app.db.rls import is_bound_to, rls_enabled
+from app.routers.projects import use_db_connection
+
+ownership_cache = LRUCache(
+    maxsize=int(os.getenv("OWNERSHIP_CACHE_SIZE", "4096")),
+    ttl=float(os.getenv("OWNERSHIP_CACHE_TTL", "60")),
+)
+
+_SQL = "SELECT 1 FROM public.projects WHERE id = %s AND user_id = %s"
+_SQL_ASYNC = "SELECT 1 FROM public.projects WHERE id = $1 AND user_id = $2"
+
+
+def _key(project_id, user_id: str):
+    return (str(project_id), str(user_id))
+
+
+def is_project_owned(project_id: UUID, user_id: str, conn=None) -> bool:
+    # RLS mode: the connection only sees this user's rows, so the queries that
+    # follow come back empty (-> 404) for anyone else's project.
+    if conn is not None and is_bound_to(conn, user_id):
+        return True
+
+    key = _key(project_id, user_id)
+    if ownership_cache.get(key):
+        return True
+
+    with use_db_connection(conn) as db:
+        with db.cursor() as cur:
+            cur.execute(_SQL, key)
+            owned = cur.fetchone() is not None
+
+    if owned:
+        ownership_cache.put(key, True)
+    return owned
+
+
+async def is_project_owned_async(project_id: UUID, user_id: str, conn=None) -> bool:
+    # RLS mode: get_async_connection(user_id) scopes every query that follows
+    # to this user, same as a bound psycopg2 connection above.
+    if rls_enabled():
+        return True
+
+    key = _key(project_id, user_id)
+    if ownership_cache.get(key):
+        return True
+
+    async with use_async_connection(conn, user_id) as db:
+        owned = await db.fetchval(_SQL_ASYNC, *key) is not None
+
+    if owned:
+        ownership_cache.put(key, True)
+    return owned
@@ -0,0 +1,65 @@
+# app/project_summary.py
+"""
+Maintains public.project_summary: one row per project holding the active
+run's KPIs and the network totals, so the project list needs no per-card
+calls to /simulation/latest and /network/snapshot.
+
+refresh() recomputes the row from projects, the active run and proposal_data
+in a single upsert. It runs on the caller's connection and never commits:
+callers invoke it inside the transaction that changed the inputs.
+"""
+from __future__ import annotations
+
+from uuid import UUID
+
+from app.computation.engine import CRC_RATE_GRAVEL, CRC_RATE_PAVED
+from app.db.proposal_totals import gravel_km_sql, paved_km_sql
+
+_PAVED = paved_km_sql("pd")
+_GRAVEL = gravel_km_sql("pd")
+
+REFRESH_SQL = f"""
+    INSERT INTO public.project_summary (
+        project_id, user_id,
+        active_run_id, active_run_at, total_cost_npv, final_network_condition, final_asset_value,
+        total_length_km, paved_length_km, gravel_length_km, network_asset_value, avg_vci,
+        updated_at
+    )
+    SELECT
+        p.id, p.user_id,
+        sr.id, sr.run_at, sr.total_cost_npv, sr.final_network_condition,
+        (SELECT y.asset_value FROM public.simulation_yearly y
+         WHERE y.run_id = sr.id ORDER BY y.year DESC LIMIT 1),
+        net.paved + net.gravel, net.paved, net.gravel,
+        net.paved * %(rate_paved)s + net.gravel * %(rate_gravel)s,
+        coalesce(pd.avg_vci_used, 0),
+        now()
+    FROM public.projects p
+    LEFT JOIN public.simulation_results sr ON sr.id = p.active_simulation_run_id
+    LEFT JOIN public.proposal_data pd ON pd.project_id = p.id
+    CROSS JOIN LATERAL (SELECT {_PAVED} AS paved, {_GRAVEL} AS gravel) net
+    WHERE p.id = %(project_id)s
+    ON CONFLICT (project_id) DO UPDATE SET
+        user_id = EXCLUDED.user_id,
+        active_run_id = EXCLUDED.active_run_id,
+        active_run_at = EXCLUDED.active_run_at,
+        total_cost_npv = EXCLUDED.total_cost_npv,
+        final_network_condition = EXCLUDED.final_network_condition,
+        final_asset_value = EXCLUDED.final_asset_value,
+        total_length_km = EXCLUDED.total_length_km,
+        paved_length_km = EXCLUDED.paved_length_km,
+        gravel_length_km = EXCLUDED.gravel_length_km,
+        network_asset_value = EXCLUDED.network_asset_value,
+        avg_vci = EXCLUDED.avg_vci,
+        updated_at = now();
+"""
+
+
+def refresh(conn, project_id: UUID) -> None:
+    """Recomputes one project's summary row (caller commits)."""
+    with conn.cursor() as cur:
+        cur.execute(
+            REFRESH_SQL,
+            {"project_id": str(project_id), "rate_paved": CRC_RATE_PAVED, "rate_gravel": CRC_RATE_GRAVEL},
+        )
+
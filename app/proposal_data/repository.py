@@ -1,15 +1,10 @@
 from typing import Optional, Dict, Any
 from datetime import datetime
 
+from app.ownership import is_project_owned
+
 def assert_project_owned(conn, project_id: str, user_id: str) -> None:
-    cur = conn.cursor()
-    cur.execute(
-        "SELECT 1 FROM public.projects WHERE id = %s AND user_id = %s",
-        (project_id, user_id),
-    )
-    ok = cur.fetchone()
-    cur.close()
-    if not ok:
+    if not is_project_owned(project_id, user_id, conn):
         raise ValueError("Project not found or not owned by user")
 
 def get_proposal_data(conn, project_id: str, user_id: str) -> Optional[Dict[str, Any]]:
@@ -1,8 +1,13 @@
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException
-from typing import Dict, Any
+from datetime import datetime
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from psycopg2.extras import Json
+from functools import lru_cache
+from typing import Dict, Any, Optional, Tuple
 
-from app.routers.projects import get_current_user_id, get_db_connection
+from app import project_summary
+from app.db.rls import PERMISSION_ERRORS
+from app.routers.projects import get_current_user_id, get_db
 from .schemas import ProposalDataOut, ProposalDataPatch
 
 router = APIRouter()
@@ -11,39 +16,103 @@ def _row_to_dict(cur, row) -> Dict[str, Any]:
     cols = [desc[0] for desc in cur.description]
     return dict(zip(cols, row))
 
-def _ensure_row(project_id: UUID, user_id: str) -> None:
-    sql = """
+# GET: create-if-missing and read in one statement. DO NOTHING keeps reads from
+# writing a new row version; the CTE's row is returned when it was just created,
+# otherwise the existing one (the outer SELECT cannot see the CTE's insert).
+_SQL_GET_OR_CREATE = """
+    WITH created AS (
         INSERT INTO public.proposal_data (project_id, user_id, data_source)
-        VALUES (%s, %s, 'manual')
-        ON CONFLICT (project_id) DO NOTHING;
+        VALUES (%(project_id)s, %(user_id)s, 'manual')
+        ON CONFLICT (project_id) DO NOTHING
+        RETURNING *
+    )
+    SELECT * FROM created
+    UNION ALL
+    SELECT * FROM public.proposal_data
+    WHERE project_id = %(project_id)s AND user_id = %(user_id)s;
+"""
+
+# Fields that feed the network totals in project_summary
+_NETWORK_FIELDS = frozenset({
+    "paved_arid", "paved_semi_arid", "paved_dry_sub_humid", "paved_moist_sub_humid", "paved_humid",
+    "gravel_arid", "gravel_semi_arid", "gravel_dry_sub_humid", "gravel_moist_sub_humid", "gravel_humid",
+    "avg_vci_used",
+})
+
+# PATCH that wrote nothing: the stored row, and whether If-Match names it
+_SQL_CURRENT = """
+    SELECT *, (%(if_match)s::timestamptz IS NULL OR updated_at = %(if_match)s::timestamptz) AS if_match_ok
+    FROM public.proposal_data
+    WHERE project_id = %(project_id)s AND user_id = %(user_id)s;
+"""
+
+
+@lru_cache(maxsize=256)
+def _patch_sql(fields: Tuple[str, ...]) -> str:
     """
-    with get_db_connection() as conn:
-        with conn.cursor() as cur:
-            cur.execute(sql, (str(project_id), user_id))
-        conn.commit()
+    Upsert-returning statement for one set of patched fields (cached per set;
+    the autosave grid sends the same few combinations over and over).
+    Field names come from ProposalDataPatch, never from the client.
+
+    The update is skipped (no row returned) when If-Match does not match or
+    when every field already holds the sent value, so autosaves that repeat
+    the stored inputs write nothing.
+    """
+    columns = ", ".join(fields)
+    placeholders = ", ".join(f"%({f})s" for f in fields)
+    updates = ", ".join(f"{f} = EXCLUDED.{f}" for f in fields)
+    current = ", ".join(f"proposal_data.{f}" for f in fields)
+    sent = ", ".join(f"EXCLUDED.{f}" for f in fields)
+    return f"""
+        INSERT INTO public.proposal_data (project_id, user_id, data_source, {columns})
+        VALUES (%(project_id)s, %(user_id)s, 'manual', {placeholders})
+        ON CONFLICT (project_id) DO UPDATE
+        SET {updates}, updated_at = now()
+        WHERE proposal_data.user_id = EXCLUDED.user_id
+          AND (%(if_match)s::timestamptz IS NULL OR proposal_data.updated_at = %(if_match)s::timestamptz)
+          AND ({current}) IS DISTINCT FROM ({sent})
+        RETURNING *;
+    """
+
+
+def _etag(row: Dict[str, Any]) -> str:
+    return f'"{row["updated_at"].isoformat()}"'
+
+
+def _parse_if_match(value: Optional[str]) -> Optional[datetime]:
+    """If-Match carries the updated_at from a previous response ("*" = any)."""
+    if value is None or value.strip() == "*":
+        return None
+    tag = value.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    try:
+        return datetime.fromisoformat(tag.strip('"'))
+    except ValueError:
+        raise HTTPException(400, "If-Match must be the updated_at of the proposal data")
+
 
 @router.get(
     "/{project_id}/proposal-data",
     response_model=ProposalDataOut,
     summary="Get proposal inputs for a project",
 )
-def get_proposal_data(project_id: UUID, user_id: str = Depends(get_current_user_id)):
-    # ensure row exists (covers old projects)
-    _ensure_row(project_id, user_id)
-
-    sql = """
-        SELECT *
-        FROM public.proposal_data
-        WHERE project_id = %s AND user_id = %s
-        LIMIT 1;
-    """
-    with get_db_connection() as conn:
-        with conn.cursor() as cur:
-            cur.execute(sql, (str(project_id), user_id))
-            row = cur.fetchone()
-            if not row:
-                raise HTTPException(404, "proposal_data row not found after ensure (unexpected).")
-            return _row_to_dict(cur, row)
+def get_proposal_data(
+    project_id: UUID,
+    response: Response,
+    user_id: str = Depends(get_current_user_id),
+    conn=Depends(get_db),
+):
+    # one round trip: creates the row for old projects, then reads it
+    with conn.cursor() as cur:
+        cur.execute(_SQL_GET_OR_CREATE, {"project_id": str(project_id), "user_id": user_id})
+        row = cur.fetchone()
+        if not row:
+            raise HTTPException(404, "proposal_data row not found for this project/user")
+        data = _row_to_dict(cur, row)
+    conn.commit()
+    response.headers["ETag"] = _etag(data)
+    return data
 
 @router.patch(
     "/{project_id}/proposal-data",
@@ -53,43 +122,48 @@ def get_proposal_data(project_id: UUID, user_id: str = Depends(get_current_user_
 def patch_proposal_data(
     project_id: UUID,
     payload: ProposalDataPatch,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     user_id: str = Depends(get_current_user_id),
+    conn=Depends(get_db),
 ):
-    # ensure row exists (covers old projects)
-    _ensure_row(project_id, user_id)
-
+    """
+    Partial update. Send the last updated_at (or ETag) as If-Match to get a
+    412 instead of overwriting a newer save. A PATCH that changes nothing is
+    not written and returns the stored row.
+    """
     data = payload.model_dump(exclude_unset=True)
     if not data:
         raise HTTPException(400, "No fields provided")
+    expected = _parse_if_match(if_match)
 
-    set_parts = []
-    values = []
-    for k, v in data.items():
-        set_parts.append(f"{k} = %s")
-        values.append(v)
+    params = {k: Json(v) if isinstance(v, dict) else v for k, v in data.items()}
+    params.update(project_id=str(project_id), user_id=user_id, if_match=expected)
 
-    set_clause = ", ".join(set_parts)
-
-    sql = f"""
-        UPDATE public.proposal_data
-        SET {set_clause}, updated_at = now()
-        WHERE project_id = %s AND user_id = %s
-        RETURNING *;
-    """
-
-    with get_db_connection() as conn:
-        try:
-            with conn.cursor() as cur:
-                cur.execute(sql, (*values, str(project_id), user_id))
+    try:
+        with conn.cursor() as cur:
+            cur.execute(_patch_sql(tuple(data)), params)
+            row = cur.fetchone()
+            changed = row is not None
+            if not changed:
+                # not written: someone else's row, a stale If-Match, or no change
+                cur.execute(_SQL_CURRENT, params)
                 row = cur.fetchone()
                 if not row:
                     raise HTTPException(404, "proposal_data row not found for this project/user")
-                conn.commit()
-                return _row_to_dict(cur, row)
-        except HTTPException:
-            conn.rollback()
-            raise
-        except Exception as e:
-            conn.rollback()
-            raise HTTPException(500, f"Failed to update proposal_data: {str(e)}")
-        
\ No newline at end of file
+            data_out = _row_to_dict(cur, row)
+        if not data_out.pop("if_match_ok", True):
+            raise HTTPException(
+                412, f"proposal_data changed at {data_out['updated_at'].isoformat()}; reload and retry"
+            )
+        if changed and _NETWORK_FIELDS.intersection(data):
+            project_summary.refresh(conn, project_id)
+        conn.commit()
+    except (HTTPException, *PERMISSION_ERRORS):
+        conn.rollback()
+        raise
+    except Exception as e:
+        conn.rollback()
+        raise HTTPException(500, f"Failed to update proposal_data: {str(e)}")
+    response.headers["ETag"] = _etag(data_out)
+    return data_out
@@ -5,18 +5,16 @@ from uuid import UUID
 from typing import List, Dict, Any, Optional
 
 from psycopg2.extras import Json
-from app.routers.projects import get_db_connection
+from app.routers.projects import use_db_connection
+from app.computation.results_codec import to_rows
+from app.ownership import is_project_owned
 
 
 # -----------------------------------------------------------------------------
 # HELPERS
 # -----------------------------------------------------------------------------
-def _assert_project_owned(cur, project_id: UUID, user_id: str) -> None:
-    cur.execute(
-        "SELECT 1 FROM public.projects WHERE id = %s AND user_id = %s",
-        (str(project_id), user_id),
-    )
-    if not cur.fetchone():
+def _assert_project_owned(conn, project_id: UUID, user_id: str) -> None:
+    if not is_project_owned(project_id, user_id, conn):
         raise ValueError("Project not found or not owned by user")
 
 
@@ -28,10 +26,11 @@ def _generate_slug_short(length: int = 12) -> str:
     return secrets.token_urlsafe(16).replace("-", "").replace("_", "")[:length]
 
 
-def create_report(project_id: UUID, user_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+def create_report(project_id: UUID, user_id: str, payload: Dict[str, Any], conn=None) -> Dict[str, Any]:
     """
     Creates a report bundle that references a simulation run (and optionally an AI insight).
     Returns basic metadata + slug.
+    Commits even on a shared connection: the slug retry loop needs its own rollbacks.
     """
     sql = """
         INSERT INTO public.reports
@@ -42,9 +41,9 @@ def create_report(project_id: UUID, user_id: str, payload: Dict[str, Any]) -> Di
             id, project_id, title, report_type, status, public_share_slug, created_at;
     """
 
-    with get_db_connection() as conn:
-        with conn.cursor() as cur:
-            _assert_project_owned(cur, project_id, user_id)
+    with use_db_connection(conn) as db:
+        with db.cursor() as cur:
+            _assert_project_owned(db, project_id, user_id)
 
             # slug retry loop (handles rare collision)
             for _ in range(5):
@@ -65,11 +64,11 @@ def create_report(project_id: UUID, user_id: str, payload: Dict[str, Any]) -> Di
                     )
                     row = cur.fetchone()
                     cols = [d[0] for d in cur.description]
-                    conn.commit()
+                    db.commit()
                     return dict(zip(cols, row))
                 except Exception as e:
                     # If unique constraint on slug was hit, retry.
-                    conn.rollback()
+                    db.rollback()
                     msg = str(e).lower()
                     if "public_share_slug" in msg or "duplicate key" in msg:
                         continue
@@ -78,16 +77,16 @@ def create_report(project_id: UUID, user_id: str, payload: Dict[str, Any]) -> Di
             raise RuntimeError("Could not generate a unique public_share_slug after retries.")
 
 
-def list_reports(project_id: UUID, user_id: str) -> List[Dict[str, Any]]:
+def list_reports(project_id: UUID, user_id: str, conn=None) -> List[Dict[str, Any]]:
     sql = """
         SELECT id, project_id, title, report_type, status, public_share_slug, created_at
         FROM public.reports
         WHERE project_id = %s
         ORDER BY created_at DESC;
     """
-    with get_db_connection() as conn:
-        with conn.cursor() as cur:
-            _assert_project_owned(cur, project_id, user_id)
+    with use_db_connection(conn) as db:
+        with db.cursor() as cur:
+            _assert_project_owned(db, project_id, user_id)
 
             cur.execute(sql, (str(project_id),))
             rows = cur.fetchall()
@@ -95,7 +94,7 @@ def list_reports(project_id: UUID, user_id: str) -> List[Dict[str, Any]]:
             return [dict(zip(cols, r)) for r in rows]
 
 
-def get_full_report_data(report_id: UUID) -> Optional[Dict[str, Any]]:
+def get_full_report_data(report_id: UUID, conn=None) -> Optional[Dict[str, Any]]:
     """
     Report view join: Report + Project + Simulation + AI Insight (optional).
     Used by secure view and public view.
@@ -113,8 +112,8 @@ def get_full_report_data(report_id: UUID) -> Optional[Dict[str, Any]]:
         WHERE r.id = %s;
     """
 
-    with get_db_connection() as conn:
-        with conn.cursor() as cur:
+    with use_db_connection(conn) as db:
+        with db.cursor() as cur:
             cur.execute(sql, (str(report_id),))
             row = cur.fetchone()
             if not row:
@@ -134,16 +133,16 @@ def get_full_report_data(report_id: UUID) -> Optional[Dict[str, Any]]:
                 "status": status,
                 "public_share_slug": slug,
                 "created_at": created_at,
-                "simulation_data": sim_data,
+                "simulation_data": to_rows(sim_data),
                 "ai_narrative": ai_content,
                 "project_meta": {"name": project_name, "province": province},
             }
 
 
-def get_report_id_by_slug(slug: str) -> Optional[UUID]:
+def get_report_id_by_slug(slug: str, conn=None) -> Optional[UUID]:
     sql = "SELECT id FROM public.reports WHERE public_share_slug = %s LIMIT 1;"
-    with get_db_connection() as conn:
-        with conn.cursor() as cur:
+    with use_db_connection(conn) as db:
+        with db.cursor() as cur:
             cur.execute(sql, (slug,))
             row = cur.fetchone()
             return row[0] if row else None
\ No newline at end of file
@@ -4,7 +4,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from uuid import UUID
 from typing import List
 
-from app.routers.projects import get_current_user_id
+from app.routers.projects import get_current_user_id, get_db
 from .schemas import ReportCreate, ReportOut
 from . import repository
 
@@ -23,9 +23,10 @@ def create_new_report(
     project_id: UUID,
     payload: ReportCreate,
     user_id: str = Depends(get_current_user_id),
+    conn=Depends(get_db),
 ):
     try:
-        return repository.create_report(project_id, user_id, payload.model_dump())
+        return repository.create_report(project_id, user_id, payload.model_dump(), conn)
     except ValueError as e:
         # ownership / not found
         raise HTTPException(status_code=404, detail=str(e))
@@ -44,9 +45,10 @@ def create_new_report(
 def list_project_reports(
     project_id: UUID,
     user_id: str = Depends(get_current_user_id),
+    conn=Depends(get_db),
 ):
     try:
-        return repository.list_reports(project_id, user_id)
+        return repository.list_reports(project_id, user_id, conn)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
@@ -63,15 +65,16 @@ def get_report_details(
     project_id: UUID,
     report_id: UUID,
     user_id: str = Depends(get_current_user_id),
+    conn=Depends(get_db),
 ):
     # Enforce ownership via list_reports check pattern
     try:
         # ownership check
-        repository.list_reports(project_id, user_id)
+        repository.list_reports(project_id, user_id, conn)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
-    data = repository.get_full_report_data(report_id)
+    data = repository.get_full_report_data(report_id, conn)
     if not data:
         raise HTTPException(status_code=404, detail="Report not found")
 
@@ -91,12 +94,12 @@ def get_report_details(
     tags=["Public Reports"],
     summary="Read-only report view for external stakeholders",
 )
-def get_public_report(slug: str):
-    report_id = repository.get_report_id_by_slug(slug)
+def get_public_report(slug: str, conn=Depends(get_db)):
+    report_id = repository.get_report_id_by_slug(slug, conn)
     if not report_id:
         raise HTTPException(status_code=404, detail="Report link invalid or expired")
 
-    data = repository.get_full_report_data(report_id)
+    data = repository.get_full_report_data(report_id, conn)
     if not data:
         raise HTTPException(status_code=404, detail="Report not found")
 
@@ -2,56 +2,103 @@ from fastapi import APIRouter, HTTPException, Depends, Header
 import os
 import psycopg2
 from contextlib import contextmanager
-from jose import jwt
 from uuid import UUID
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 
-from app.db.schemas import ProjectMetadata, ProjectDB
+from app.db.schemas import ProjectMetadata, ProjectDB, ProjectListItem, ProjectSummary, PortfolioProjectOut
+from app.db.pool import get_pool, pool_enabled
+from app.db.async_pool import get_async_connection
+from app.auth import InvalidToken, verify_token
+from app.db.proposal_totals import gravel_km_sql, network_profile, paved_km_sql
+from app.db.rls import bind_user, connection_factory, rls_enabled
 
 router = APIRouter()
 
-JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET")
-ALGORITHM = "HS256"
+_SUMMARY_FIELDS = tuple(ProjectSummary.model_fields)
 
 
 @contextmanager
 def get_db_connection():
+    """
+    Borrows a connection from the process-wide pool (see app/db/pool.py).
+    Callers still commit explicitly; anything left open is rolled back on return.
+    """
     DB_URL = os.getenv("DATABASE_URL")
     if not DB_URL:
         raise ValueError("DATABASE_URL missing")
 
-    conn = None
+    if not pool_enabled():
+        conn = None
+        try:
+            conn = psycopg2.connect(DB_URL, connection_factory=connection_factory())
+            yield conn
+        finally:
+            if conn:
+                conn.close()
+        return
+
+    pool = get_pool(DB_URL)
+    conn = pool.getconn()
     try:
-        conn = psycopg2.connect(DB_URL)
         yield conn
     finally:
-        if conn:
-            conn.close()
+        pool.putconn(conn)
 
 
-def get_current_user_id(authorization: str = Header(None)) -> str:
+@contextmanager
+def use_db_connection(conn=None):
+    """
+    Yields `conn` when a request-scoped connection was passed in, otherwise
+    borrows one for the duration of the block (standalone / background use).
+    """
+    if conn is not None:
+        yield conn
+        return
+    with get_db_connection() as own:
+        yield own
+
+
+def _authenticate(authorization: str = Header(None)) -> Tuple[Optional[str], Optional[str]]:
+    """
+    (user_id, None) for a valid bearer token, else (None, reason). Shared by
+    get_current_user_id and get_db; FastAPI resolves it once per request, so
+    the token is verified once.
+    """
     if not authorization:
-        raise HTTPException(401, "Authorization header missing")
+        return None, "Authorization header missing"
     try:
         scheme, token = authorization.split()
-        if scheme.lower() != "bearer":
-            raise HTTPException(401, "Invalid auth scheme (expected Bearer)")
-
-        payload = jwt.decode(
-            token,
-            JWT_SECRET,
-            algorithms=[ALGORITHM],
-            options={"verify_aud": False},
-        )
-        sub = payload.get("sub")
-        if not sub:
-            raise HTTPException(401, "Invalid token (sub missing)")
-        return sub
-
-    except HTTPException:
-        raise
-    except Exception:
-        raise HTTPException(401, "Invalid token")
+    except ValueError:
+        return None, "Invalid token"
+    if scheme.lower() != "bearer":
+        return None, "Invalid auth scheme (expected Bearer)"
+
+    # Verified tokens are cached until their exp (see app/auth.py)
+    try:
+        return verify_token(token), None
+    except InvalidToken as e:
+        return None, str(e)
+
+
+def get_db(auth: Tuple[Optional[str], Optional[str]] = Depends(_authenticate)):
+    """
+    FastAPI dependency: one connection per request, shared by every repository
+    call made while handling it. Endpoints commit explicitly; anything left
+    uncommitted is rolled back when the connection goes back to the pool.
+    In RLS mode the connection is bound to the caller's token `sub` (a bad
+    token is left to get_current_user_id to reject).
+    """
+    with get_db_connection() as conn:
+        if rls_enabled():
+            bind_user(conn, auth[0])
+        yield conn
+
+
+def get_current_user_id(auth: Tuple[Optional[str], Optional[str]] = Depends(_authenticate)) -> str:
+    user_id, error = auth
+    if user_id is None:
+        raise HTTPException(401, error)
+    return user_id
 
 
 def _row_to_dict(cur, row) -> Dict[str, Any]:
@@ -73,32 +120,29 @@ async def create_project(
 
     sql_project = """
         INSERT INTO public.projects (user_id, project_name, province, start_year)
-        VALUES (%s, %s, %s, %s)
+        VALUES ($1, $2, $3, $4)
         RETURNING id, created_at;
     """
 
     sql_proposal = """
         INSERT INTO public.proposal_data (project_id, user_id, data_source)
-        VALUES (%s, %s, 'manual')
+        VALUES ($1, $2, 'manual')
         ON CONFLICT (project_id) DO NOTHING;
     """
 
-    with get_db_connection() as conn:
-        try:
-            with conn.cursor() as cur:
-                cur.execute(
+    try:
+        async with get_async_connection(user_id) as conn:
+            async with conn.transaction():
+                row = await conn.fetchrow(
                     sql_project,
-                    (user_id, metadata.project_name, metadata.province, metadata.start_year),
+                    user_id, metadata.project_name, metadata.province, metadata.start_year,
                 )
-                project_id, created_at = cur.fetchone()
+                project_id, created_at = row["id"], row["created_at"]
 
-                cur.execute(sql_proposal, (str(project_id), user_id))
+                await conn.execute(sql_proposal, project_id, user_id)
 
-            conn.commit()
-
-        except Exception as e:
-            conn.rollback()
-            raise HTTPException(status_code=500, detail=f"Failed to create project: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to create project: {str(e)}")
 
     return {
         "project_id": str(project_id),
@@ -107,6 +151,58 @@ async def create_project(
     }
 
 
+# -------------------------------------------------------------------
+# PORTFOLIO (declared before /{project_id}, which would match it)
+# -------------------------------------------------------------------
+@router.get(
+    "/portfolio",
+    response_model=List[PortfolioProjectOut],
+    summary="Network snapshot and active-run KPIs for all of the user's projects",
+)
+async def read_portfolio(user_id: str = Depends(get_current_user_id)):
+    """
+    Network snapshot + active-run KPIs for all of a user's projects, in one
+    query (instead of /network/snapshot per project). proposal_data is matched
+    on user_id too, like the single-project snapshot.
+    """
+    sql = f"""
+        SELECT
+          p.id AS project_id, p.project_name, p.province, p.start_year,
+          {paved_km_sql("pd")} AS paved_total_km, {gravel_km_sql("pd")} AS gravel_total_km,
+          pd.avg_vci_used, pd.vehicle_km, pd.fuel_sales,
+          sr.id AS run_id, sr.run_name, sr.run_at, sr.total_cost_npv, sr.final_network_condition,
+          (SELECT y.asset_value FROM public.simulation_yearly y
+           WHERE y.run_id = sr.id ORDER BY y.year DESC LIMIT 1) AS final_asset_value
+        FROM public.projects p
+        LEFT JOIN public.proposal_data pd ON pd.project_id = p.id AND pd.user_id = p.user_id
+        LEFT JOIN public.simulation_results sr ON sr.id = p.active_simulation_run_id
+        WHERE p.user_id = $1
+        ORDER BY p.created_at DESC;
+    """
+
+    async with get_async_connection(user_id) as conn:
+        rows = await conn.fetch(sql, user_id)
+
+    portfolio = []
+    for r in rows:
+        portfolio.append({
+            "project_id": r["project_id"],
+            "project_name": r["project_name"],
+            "province": r["province"],
+            "start_year": r["start_year"],
+            "network": network_profile(dict(r)),
+            "active_run": None if r["run_id"] is None else {
+                "id": r["run_id"],
+                "run_name": r["run_name"],
+                "run_at": r["run_at"],
+                "total_cost_npv": r["total_cost_npv"],
+                "final_network_condition": r["final_network_condition"],
+                "final_asset_value": r["final_asset_value"],
+            },
+        })
+    return portfolio
+
+
 # -------------------------------------------------------------------
 # GET ONE PROJECT
 # -------------------------------------------------------------------
@@ -141,28 +237,35 @@ def get_project(project_id: UUID, user_id: str = Depends(get_current_user_id)):
 # -------------------------------------------------------------------
 # LIST PROJECTS
 # -------------------------------------------------------------------
-@router.get("/", response_model=List[ProjectDB])
+@router.get("/", response_model=List[ProjectListItem])
 async def list_projects(user_id: str = Depends(get_current_user_id)):
-    sql = """
+    """Projects with their card KPIs (public.project_summary) in one query."""
+    sql = f"""
         SELECT
-          id,
-          user_id,
-          project_name,
-          province,
-          start_year,
-          proposal_title,
-          proposal_status,
-          created_at,
-          updated_at
-        FROM public.projects
-        WHERE user_id = %s
-        ORDER BY created_at DESC;
+          p.id,
+          p.user_id,
+          p.project_name,
+          p.province,
+          p.start_year,
+          p.proposal_title,
+          p.proposal_status,
+          p.created_at,
+          p.updated_at,
+          s.project_id AS summary_project_id,
+          {", ".join(f"s.{c}" for c in _SUMMARY_FIELDS)}
+        FROM public.projects p
+        LEFT JOIN public.project_summary s ON s.project_id = p.id
+        WHERE p.user_id = $1
+        ORDER BY p.created_at DESC;
     """
 
-    with get_db_connection() as conn:
-        with conn.cursor() as cur:
-            cur.execute(sql, (user_id,))
-            rows = cur.fetchall()
-            return [_row_to_dict(cur, r) for r in rows]
-        
-        
\ No newline at end of file
+    async with get_async_connection(user_id) as conn:
+        rows = await conn.fetch(sql, user_id)
+
+    projects = []
+    for r in rows:
+        item = {k: r[k] for k in ProjectDB.model_fields}
+        if r["summary_project_id"] is not None:
+            item["summary"] = {c: r[c] for c in _SUMMARY_FIELDS}
+        projects.append(item)
+    return projects
@@ -1,13 +1,33 @@
 from fastapi import APIRouter, HTTPException, Depends, UploadFile, File
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Iterable, Iterator, List, Optional
 from uuid import UUID
+import os
 import pandas as pd
-import io
+from openpyxl import load_workbook
+from psycopg2.extras import execute_values
 from app.routers.projects import get_db_connection, get_current_user_id
 
 router = APIRouter()
 
+# Spreadsheet layout: 3 header rows, province name in column 0
+_HEADER_ROWS = 3
+_STAT_COLUMNS = {   # sheet column -> provincial_stats column
+    1: "km_arid", 2: "km_semi_arid", 3: "km_dry_sub_humid", 4: "km_moist_sub_humid", 5: "km_humid",
+    7: "avg_vci", 8: "vehicle_km", 10: "fuel_sales",
+}
+_CHUNK_ROWS = int(os.getenv("PROVINCIAL_STATS_CHUNK_ROWS", "10000"))
+
+# One statement per page of provinces (names must be unique within it, see _update_stats).
+_SQL_UPDATE_STATS = f"""
+    UPDATE public.provincial_stats AS ps
+    SET {", ".join(f"{c} = v.{c}" for c in _STAT_COLUMNS.values())}, updated_at = NOW()
+    FROM (VALUES %s) AS v (project_id, province_name, {", ".join(_STAT_COLUMNS.values())})
+    WHERE ps.project_id = v.project_id AND ps.province_name = v.province_name;
+"""
+# typed, so a column that is NULL in every row is not read as text
+_VALUES_TEMPLATE = "(%s::uuid, %s" + ", %s::float8" * len(_STAT_COLUMNS) + ")"
+
 # --- SCHEMAS --------------------------------------------------------
 class ProvincialStatUpdate(BaseModel):
     province_name: str
@@ -24,6 +44,69 @@ class ProvincialStatResponse(ProvincialStatUpdate):
     id: UUID
     project_id: UUID
 
+# --- HELPERS --------------------------------------------------------
+
+def _update_stats(conn, project_id: UUID, rows: Iterable[tuple]) -> None:
+    """
+    rows: (province_name, *_STAT_COLUMNS values) tuples. A name given more than
+    once keeps its last values (an UPDATE ... FROM with two matches for one row
+    would apply either). The caller commits.
+    """
+    latest = {r[0]: r for r in rows}
+    if not latest:
+        return
+    pid = str(project_id)
+    with conn.cursor() as cur:
+        execute_values(
+            cur, _SQL_UPDATE_STATS, [(pid, *r) for r in latest.values()],
+            template=_VALUES_TEMPLATE,
+        )
+
+def _read_chunks(file: UploadFile) -> Iterator[pd.DataFrame]:
+    """Yields the sheet below the header rows in chunks, without loading the whole upload."""
+    columns = [0, *_STAT_COLUMNS]
+    name = (file.filename or "").lower()
+    if name.endswith('.csv'):
+        yield from pd.read_csv(
+            file.file, header=None, skiprows=_HEADER_ROWS, usecols=columns,
+            dtype=str, chunksize=_CHUNK_ROWS,
+        )
+        return
+    if name.endswith('.xls'):
+        # legacy workbook: openpyxl cannot stream it; capped at 65,536 rows anyway
+        yield pd.read_excel(file.file, header=None, skiprows=_HEADER_ROWS, usecols=columns)
+        return
+
+    wb = load_workbook(file.file, read_only=True, data_only=True)
+    try:
+        batch = []
+        for values in wb.active.iter_rows(min_row=_HEADER_ROWS + 1, max_col=max(columns) + 1, values_only=True):
+            batch.append(values)
+            if len(batch) == _CHUNK_ROWS:
+                yield pd.DataFrame(batch)[columns]
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch)[columns]
+    finally:
+        wb.close()
+
+def _clean_chunk(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Province rows only, numbers parsed column-wise: "R", thousands commas,
+    spaces and "%" are stripped; anything else unparseable becomes 0.
+    """
+    df = df[df[0].notna()]
+    names = df[0].astype(str).str.strip()
+    keep = ~names.str.contains("Total|Province")   # skip totals/junk
+
+    out = pd.DataFrame({"province_name": names[keep]})
+    for src, col in _STAT_COLUMNS.items():
+        values = df.loc[keep, src]
+        if values.dtype == object:
+            values = values.astype(str).str.replace(r"[R,\s%]", "", regex=True)
+        out[col] = pd.to_numeric(values, errors="coerce").fillna(0).astype(float)
+    return out
+
 # --- ENDPOINTS ------------------------------------------------------
 
 @router.get("/{project_id}", response_model=List[ProvincialStatResponse])
@@ -53,31 +136,19 @@ def save_manual_input(
     Saves user edits from the grid.
     Uses 'UPDATE' because the rows already exist.
     """
-    sql = """
-        UPDATE public.provincial_stats
-        SET 
-            km_arid = %s, km_semi_arid = %s, km_dry_sub_humid = %s, 
-            km_moist_sub_humid = %s, km_humid = %s,
-            avg_vci = %s, vehicle_km = %s, fuel_sales = %s,
-            updated_at = NOW()
-        WHERE project_id = %s AND province_name = %s;
-    """
-    
-    values = []
-    for s in stats:
-        values.append((
-            s.km_arid, s.km_semi_arid, s.km_dry_sub_humid, 
+    values = [
+        (
+            s.province_name,
+            s.km_arid, s.km_semi_arid, s.km_dry_sub_humid,
             s.km_moist_sub_humid, s.km_humid,
             s.avg_vci, s.vehicle_km, s.fuel_sales,
-            str(project_id), s.province_name
-        ))
-
+        )
+        for s in stats
+    ]
     with get_db_connection() as conn:
-        with conn.cursor() as cur:
-            # Execute batch update
-            cur.executemany(sql, values)
-            conn.commit()
-            
+        _update_stats(conn, project_id, values)
+        conn.commit()
+
     return {"message": "Saved successfully"}
 
 @router.post("/{project_id}/upload")
@@ -87,55 +158,17 @@ def upload_stats_csv(
     user_id: str = Depends(get_current_user_id)
 ):
     """
-    Parses 'Book1.csv' and updates the existing 9 rows.
+    Parses 'Book1.csv' (or the .xlsx / .xls export) and updates the existing 9 rows.
+    Each chunk is written as it is read, in one transaction; a province listed
+    again further down wins.
     """
     try:
-        contents = file.file.read()
-        if file.filename.endswith('.csv'):
-            df = pd.read_csv(io.BytesIO(contents), header=None)
-        else:
-            df = pd.read_excel(io.BytesIO(contents), header=None)
-
-        # Basic Cleanup tailored to your CSV structure
-        df = df.iloc[3:] # Skip headers
-        df = df[df[0].notna()] # Remove empty lines
-        
-        updates = []
-        for _, row in df.iterrows():
-            prov_name = str(row[0]).strip()
-            # Skip totals/junk
-            if "Total" in prov_name or "Province" in prov_name:
-                continue
-
-            def parse(val):
-                if isinstance(val, (int, float)): return val
-                if isinstance(val, str):
-                    clean = val.replace('R','').replace(',','').replace(' ','').replace('%','')
-                    try: return float(clean)
-                    except: return 0
-                return 0
-
-            # Map CSV Columns to DB Columns
-            updates.append((
-                parse(row[1]), parse(row[2]), parse(row[3]), parse(row[4]), parse(row[5]), # Climate Kms
-                parse(row[7]), parse(row[8]), parse(row[10]), # VCI, VehKm, Fuel
-                str(project_id), prov_name # WHERE clause
-            ))
-
-        sql = """
-            UPDATE public.provincial_stats
-            SET 
-                km_arid=%s, km_semi_arid=%s, km_dry_sub_humid=%s, km_moist_sub_humid=%s, km_humid=%s,
-                avg_vci=%s, vehicle_km=%s, fuel_sales=%s, updated_at=NOW()
-            WHERE project_id=%s AND province_name=%s;
-        """
-
         with get_db_connection() as conn:
-            with conn.cursor() as cur:
-                cur.executemany(sql, updates)
-                conn.commit()
+            for df in _read_chunks(file):
+                _update_stats(conn, project_id, _clean_chunk(df).itertuples(index=False, name=None))
+            conn.commit()
 
         return {"message": "Spreadsheet data imported"}
 
     except Exception as e:
-        raise HTTPException(400, f"Upload Error: {str(e)}")
\ No newline at end of file
+        raise HTTPException(400, f"Upload Error: {str(e)}")
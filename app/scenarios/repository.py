@@ -1,8 +1,13 @@
 from uuid import UUID
 from typing import Dict, Any, Optional
-from app.routers.projects import get_db_connection
+from app.routers.projects import use_db_connection
+from app.db.async_pool import use_async_connection
 
-def ensure_assumptions_row(project_id: UUID, user_id: str) -> None:
+# Every function takes an optional request-scoped `conn`. When given, the caller
+# owns the transaction (no commit here); otherwise a connection is borrowed and
+# the write is committed before returning.
+
+def ensure_assumptions_row(project_id: UUID, user_id: str, conn=None) -> None:
     """
     Ensures a row exists for this project in the assumptions table.
     """
@@ -11,12 +16,13 @@ def ensure_assumptions_row(project_id: UUID, user_id: str) -> None:
         VALUES (%s, %s)
         ON CONFLICT (project_id) DO NOTHING;
     """
-    with get_db_connection() as conn:
-        with conn.cursor() as cur:
+    with use_db_connection(conn) as db:
+        with db.cursor() as cur:
             cur.execute(sql, (str(project_id), user_id))
-        conn.commit()
+        if conn is None:
+            db.commit()
 
-def get_forecast_params(project_id: UUID, user_id: str) -> Optional[Dict[str, Any]]:
+def get_forecast_params(project_id: UUID, user_id: str, conn=None) -> Optional[Dict[str, Any]]:
     sql = """
         SELECT 
             id, project_id, updated_at,
@@ -26,8 +32,8 @@ def get_forecast_params(project_id: UUID, user_id: str) -> Optional[Dict[str, An
         FROM public.scenario_assumptions
         WHERE project_id = %s AND user_id = %s
     """
-    with get_db_connection() as conn:
-        with conn.cursor() as cur:
+    with use_db_connection(conn) as db:
+        with db.cursor() as cur:
             cur.execute(sql, (str(project_id), user_id))
             row = cur.fetchone()
             if not row:
@@ -35,7 +41,7 @@ def get_forecast_params(project_id: UUID, user_id: str) -> Optional[Dict[str, An
             cols = [d[0] for d in cur.description]
             return dict(zip(cols, row))
 
-def update_forecast_params(project_id: UUID, user_id: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+def update_forecast_params(project_id: UUID, user_id: str, data: Dict[str, Any], conn=None) -> Optional[Dict[str, Any]]:
     # Dynamic SQL construction
     set_clauses = []
     values = []
@@ -44,7 +50,7 @@ def update_forecast_params(project_id: UUID, user_id: str, data: Dict[str, Any])
         values.append(v)
     
     if not set_clauses:
-        return get_forecast_params(project_id, user_id)
+        return get_forecast_params(project_id, user_id, conn)
 
     sql = f"""
         UPDATE public.scenario_assumptions
@@ -59,12 +65,38 @@ def update_forecast_params(project_id: UUID, user_id: str, data: Dict[str, Any])
     
     values.extend([str(project_id), user_id])
     
-    with get_db_connection() as conn:
-        with conn.cursor() as cur:
+    with use_db_connection(conn) as db:
+        with db.cursor() as cur:
             cur.execute(sql, tuple(values))
             row = cur.fetchone()
-            conn.commit()
+            if conn is None:
+                db.commit()
             if not row:
                 return None
             cols = [d[0] for d in cur.description]
-            return dict(zip(cols, row))
\ No newline at end of file
+            return dict(zip(cols, row))
+
+async def load_forecast_params_async(project_id: UUID, user_id: str, conn=None) -> Optional[Dict[str, Any]]:
+    """
+    asyncpg version of ensure_assumptions_row + get_forecast_params, run in one
+    transaction on `conn` (or a pooled connection of its own).
+    """
+    sql_ensure = """
+        INSERT INTO public.scenario_assumptions (project_id, user_id)
+        VALUES ($1, $2)
+        ON CONFLICT (project_id) DO NOTHING;
+    """
+    sql = """
+        SELECT 
+            id, project_id, updated_at,
+            analysis_duration, discount_rate,
+            cpi_percentage, previous_allocation,
+            paved_deterioration_rate, gravel_loss_rate, climate_stress_factor
+        FROM public.scenario_assumptions
+        WHERE project_id = $1 AND user_id = $2
+    """
+    async with use_async_connection(conn, user_id) as db:
+        async with db.transaction():
+            await db.execute(sql_ensure, project_id, user_id)
+            row = await db.fetchrow(sql, project_id, user_id)
+    return dict(row) if row else None
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends
 from uuid import UUID
 
-from app.routers.projects import get_current_user_id
+from app.routers.projects import get_current_user_id, get_db
 from .schemas import ForecastParametersOut, ForecastParametersPatch
 from . import service
 
@@ -15,8 +15,11 @@ router = APIRouter()
 def get_forecast_parameters(
     project_id: UUID,
     user_id: str = Depends(get_current_user_id),
+    conn=Depends(get_db),
 ):
-    return service.get_forecast(project_id, user_id)
+    forecast = service.get_forecast(project_id, user_id, conn)
+    conn.commit()  # keeps the lazily created row
+    return forecast
 
 @router.patch(
     "/{project_id}/forecast",
@@ -27,5 +30,8 @@ def update_forecast_parameters(
     project_id: UUID,
     payload: ForecastParametersPatch,
     user_id: str = Depends(get_current_user_id),
+    conn=Depends(get_db),
 ):
-    return service.update_forecast(project_id, user_id, payload)
\ No newline at end of file
+    forecast = service.update_forecast(project_id, user_id, payload, conn)
+    conn.commit()
+    return forecast
@@ -3,26 +3,33 @@ from fastapi import HTTPException
 from . import repository as repo
 from .schemas import ForecastParametersOut, ForecastParametersPatch
 
-def get_forecast(project_id: UUID, user_id: str) -> ForecastParametersOut:
+def get_forecast(project_id: UUID, user_id: str, conn=None) -> ForecastParametersOut:
     # 1. Ensure DB row exists (Lazy Creation)
-    repo.ensure_assumptions_row(project_id, user_id)
+    repo.ensure_assumptions_row(project_id, user_id, conn)
     
     # 2. Fetch
-    data = repo.get_forecast_params(project_id, user_id)
+    data = repo.get_forecast_params(project_id, user_id, conn)
     if not data:
         raise HTTPException(404, "Forecast parameters not found")
         
     return ForecastParametersOut(**data)
 
-def update_forecast(project_id: UUID, user_id: str, payload: ForecastParametersPatch) -> ForecastParametersOut:
+async def get_forecast_async(project_id: UUID, user_id: str, conn=None) -> ForecastParametersOut:
+    data = await repo.load_forecast_params_async(project_id, user_id, conn)
+    if not data:
+        raise HTTPException(404, "Forecast parameters not found")
+
+    return ForecastParametersOut(**data)
+
+def update_forecast(project_id: UUID, user_id: str, payload: ForecastParametersPatch, conn=None) -> ForecastParametersOut:
     # 1. Ensure DB row exists
-    repo.ensure_assumptions_row(project_id, user_id)
+    repo.ensure_assumptions_row(project_id, user_id, conn)
     
     # 2. Update
     data = payload.model_dump(exclude_unset=True)
-    updated = repo.update_forecast_params(project_id, user_id, data)
+    updated = repo.update_forecast_params(project_id, user_id, data, conn)
     
     if not updated:
         raise HTTPException(500, "Failed to update parameters")
         
-    return ForecastParametersOut(**updated)
\ No newline at end of file
+    return ForecastParametersOut(**updated)
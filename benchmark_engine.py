@@ -0,0 +1,189 @@
+"""
+Benchmark harness for app/computation/engine.py and its batch variants.
+
+Measures wall time (best of N repeats) and peak Python/NumPy heap
+(tracemalloc, separate run) across analysis_duration, scenario count and
+Monte Carlo worker count, and writes the results as JSON.
+
+    python benchmark_engine.py                      # default grid -> bench_engine.json
+    python benchmark_engine.py --quick              # small grid for CI
+    python benchmark_engine.py --compare old.json   # exit 1 on throughput regressions
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")  # app imports create the client eagerly
+
+from app.computation import engine, monte_carlo
+from app.computation.schemas import MonteCarloRequest, SimulationRunOptions, SimulationVariant
+from app.scenarios.schemas import ForecastParametersOut
+
+# ------------- CONFIG -------------
+DURATIONS = [5, 10, 25, 50, 100]
+SCENARIOS = [1, 10, 100, 1_000, 10_000, 100_000]
+WORKERS = [1, 2, 4, 8]
+
+QUICK_DURATIONS = [5, 25, 100]
+QUICK_SCENARIOS = [1, 100, 10_000]
+QUICK_WORKERS = [1, 2]
+
+# The per-scenario wrapper is pure Python per row; cap it so the grid finishes.
+SINGLE_MAX_SCENARIOS = 1_000
+MONTE_CARLO_DRAWS = 20_000
+MONTE_CARLO_DURATION = 25
+
+NETWORK_PROFILE = {"pavedLengthKm": 4_200.0, "gravelLengthKm": 18_500.0, "avgVci": 54.0}
+# ----------------------------------
+
+
+def make_params(duration: int) -> ForecastParametersOut:
+    return ForecastParametersOut(
+        id=uuid.uuid4(),
+        project_id=uuid.uuid4(),
+        updated_at=datetime.now(timezone.utc),
+        analysis_duration=duration,
+    )
+
+
+def make_batch(params: ForecastParametersOut, scenarios: int) -> engine.ScenarioBatch:
+    """Spreads CPI and start VCI so rows are not identical."""
+    rng = np.random.default_rng(0)
+    base = engine.build_scenario_batch(params, NETWORK_PROFILE, [SimulationVariant()])
+    batch = base.repeat(scenarios)
+    batch.inflation = rng.uniform(0.03, 0.09, scenarios)
+    batch.start_vci = rng.uniform(30, 80, scenarios)
+    return batch
+
+
+def measure(fn, repeats: int) -> dict:
+    """Best wall time over `repeats`, then one traced run for peak memory."""
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"seconds": best, "peak_mem_mb": round(peak / 1_048_576, 3)}
+
+
+def bench_engines(durations, scenario_counts, repeats):
+    results = []
+    for duration in durations:
+        params = make_params(duration)
+        options = SimulationRunOptions(startYearOverride=2030)
+
+        for n in scenario_counts:
+            batch = make_batch(params, n)
+            cases = {
+                "batch": lambda: engine.run_ronet_batch(batch, duration, 2030),
+                "stream": lambda: sum(1 for _ in engine.iter_ronet_batch(batch, duration, 2030)),
+            }
+            if n <= SINGLE_MAX_SCENARIOS:
+                cases["single"] = lambda: [
+                    engine.run_ronet_simulation(params.project_id, params, NETWORK_PROFILE, options)
+                    for _ in range(n)
+                ]
+
+            for name, fn in cases.items():
+                row = {"engine": name, "duration": duration, "scenarios": n, "workers": 1}
+                row.update(measure(fn, repeats))
+                row["scenario_years_per_sec"] = round(n * duration / row["seconds"], 1)
+                results.append(row)
+                print(f"{name:>12}  T={duration:<4} N={n:<7} {row['seconds']*1000:10.2f} ms  "
+                      f"{row['peak_mem_mb']:9.2f} MB")
+    return results
+
+
+def bench_workers(worker_counts, repeats):
+    results = []
+    params = make_params(MONTE_CARLO_DURATION)
+    spec = MonteCarloRequest(draws=MONTE_CARLO_DRAWS, seed=1, startYearOverride=2030)
+
+    for workers in worker_counts:
+        os.environ["SIMULATION_MAX_WORKERS"] = str(workers)
+        fn = lambda: monte_carlo.run_monte_carlo(params.project_id, params, NETWORK_PROFILE, spec)
+        row = {
+            "engine": "monte_carlo",
+            "duration": MONTE_CARLO_DURATION,
+            "scenarios": MONTE_CARLO_DRAWS,
+            "workers": workers,
+        }
+        # tracemalloc only sees this process; worker memory is not included.
+        row.update(measure(fn, repeats))
+        row["scenario_years_per_sec"] = round(MONTE_CARLO_DRAWS * MONTE_CARLO_DURATION / row["seconds"], 1)
+        results.append(row)
+        print(f" monte_carlo  W={workers:<3} {row['seconds']*1000:10.2f} ms")
+    return results
+
+
+def compare(results, baseline_path: Path, tolerance: float) -> int:
+    """Prints cases whose throughput fell by more than `tolerance`; returns the count."""
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    key = lambda r: (r["engine"], r["duration"], r["scenarios"], r["workers"])
+    old = {key(r): r for r in baseline.get("results", [])}
+
+    regressions = 0
+    for r in results:
+        prev = old.get(key(r))
+        if not prev:
+            continue
+        ratio = r["scenario_years_per_sec"] / prev["scenario_years_per_sec"]
+        if ratio < 1 - tolerance:
+            regressions += 1
+            print(f"REGRESSION {key(r)}: {ratio:.2f}x of baseline throughput")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="small grid (CI smoke run)")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--out", type=Path, default=Path("bench_engine.json"))
+    parser.add_argument("--compare", type=Path, help="baseline JSON to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed throughput drop (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    durations = QUICK_DURATIONS if args.quick else DURATIONS
+    scenarios = QUICK_SCENARIOS if args.quick else SCENARIOS
+    workers = QUICK_WORKERS if args.quick else WORKERS
+
+    results = bench_engines(durations, scenarios, args.repeats)
+    results += bench_workers(workers, args.repeats)
+
+    report = {
+        "meta": {
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "engine_version": engine.ENGINE_VERSION,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "repeats": args.repeats,
+        },
+        "results": results,
+    }
+    args.out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"Written to {args.out}")
+
+    if args.compare:
+        return 1 if compare(results, args.compare, args.tolerance) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+"""
+The vectorized batch engine against the per-scenario loop it replaced.
+"""
+import uuid
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from app.computation import engine
+from app.computation.schemas import SimulationBatchRequest, SimulationRunOptions, SimulationVariant
+from app.scenarios.schemas import ForecastParametersOut
+
+START_YEAR = 2030
+
+NETWORK_PROFILE = {"pavedLengthKm": 4_200.0, "gravelLengthKm": 18_500.0, "avgVci": 54.0, "assetValue": 0}
+
+
+def make_params(duration: int = 12, cpi: float = 6.0, discount: float = 8.0) -> ForecastParametersOut:
+    return ForecastParametersOut(
+        id=uuid.uuid4(),
+        project_id=uuid.uuid4(),
+        updated_at=datetime.now(timezone.utc),
+        analysis_duration=duration,
+        cpi_percentage=cpi,
+        discount_rate=discount,
+    )
+
+
+def scalar_run(params, network_profile, include_paved=True, include_gravel=True, start_vci=None,
+               budget_cap=None, decay_scale=1.0):
+    """
+    The pre-batch engine loop, one scenario at a time (reference implementation),
+    plus the budget cap: spend is limited to the CPI-escalated cap and the year's
+    outcome blends between funded and do-nothing by the funded share.
+    """
+    paved_km = network_profile.get("pavedLengthKm", 0) if include_paved else 0
+    gravel_km = network_profile.get("gravelLengthKm", 0) if include_gravel else 0
+    inflation = params.cpi_percentage / 100.0
+    discount_rate = params.discount_rate / 100.0
+    base_annual_need = (float(paved_km) * 160_000) + (float(gravel_km) * 45_000)
+
+    current_vci = float(start_vci if start_vci is not None else network_profile.get("avgVci", 50))
+    current_asset_value = float(network_profile.get("assetValue", 0) or 0)
+    if current_asset_value == 0 and (paved_km > 0 or gravel_km > 0):
+        current_asset_value = (paved_km * 3500000) + (gravel_km * 250000)
+
+    years, cumulative_npv = [], 0.0
+    for i in range(params.analysis_duration):
+        condition_cost_factor = 1.0 + ((100 - current_vci) / 100.0)
+        nominal_need = base_annual_need * condition_cost_factor * (1 + inflation) ** i
+
+        is_do_nothing = (paved_km + gravel_km) == 0
+        decay = (3.5 if current_vci > 50 else 5.0) * decay_scale
+        if is_do_nothing:
+            actual_spend = 0.0
+            current_vci = max(0.0, current_vci - decay)
+            current_asset_value *= (1 - 0.04)
+        elif budget_cap is None:
+            actual_spend = nominal_need
+            current_vci = min(95.0, current_vci + 2.5)
+            current_asset_value *= (1 + inflation)
+        else:
+            actual_spend = min(nominal_need, budget_cap * (1 + inflation) ** i)
+            funded = actual_spend / nominal_need
+            current_vci = min(95.0, max(0.0, current_vci + funded * 2.5 - (1 - funded) * decay))
+            current_asset_value *= funded * (1 + inflation) + (1 - funded) * (1 - 0.04)
+
+        cumulative_npv += actual_spend / (1 + discount_rate) ** i
+
+        pct_good = max(0.0, min(100.0, (current_vci - 30) * 1.5))
+        pct_poor = max(0.0, min(100.0, (70 - current_vci) * 1.5))
+        pct_fair = max(0.0, 100.0 - pct_good - pct_poor)
+        years.append({
+            "year": START_YEAR + i,
+            "avg_condition_index": current_vci,
+            "pct_good": pct_good,
+            "pct_fair": pct_fair,
+            "pct_poor": pct_poor,
+            "total_maintenance_cost": actual_spend,
+            "asset_value": current_asset_value,
+        })
+    return years, cumulative_npv
+
+
+VARIANTS = [
+    SimulationVariant(label="full"),
+    SimulationVariant(label="paved only", include_gravel=False),
+    SimulationVariant(label="gravel only", include_paved=False, cpi_percentage=4.5),
+    SimulationVariant(label="do nothing", include_paved=False, include_gravel=False),
+    SimulationVariant(label="poor start, do nothing", include_paved=False, include_gravel=False, start_vci=35),
+    SimulationVariant(label="good start", start_vci=90, discount_rate=11.0),
+]
+
+
+def test_batch_matches_scalar_loop_per_variant():
+    params = make_params(duration=30)
+    request = SimulationBatchRequest(start_year_override=START_YEAR, variants=VARIANTS)
+
+    out = engine.run_ronet_simulation_batch(params.project_id, params, NETWORK_PROFILE, request)
+
+    assert out.years == list(range(START_YEAR, START_YEAR + 30))
+    for v, result in zip(VARIANTS, out.variants):
+        variant_params = make_params(
+            duration=30,
+            cpi=v.cpi_percentage if v.cpi_percentage is not None else params.cpi_percentage,
+            discount=v.discount_rate if v.discount_rate is not None else params.discount_rate,
+        )
+        years, npv = scalar_run(variant_params, NETWORK_PROFILE, v.include_paved, v.include_gravel, v.start_vci)
+
+        assert result.label == v.label
+        assert result.total_cost_npv == pytest.approx(npv, rel=1e-9)
+        for field in ("avg_condition_index", "pct_good", "pct_fair", "pct_poor",
+                      "total_maintenance_cost", "asset_value"):
+            assert getattr(result, field) == pytest.approx([y[field] for y in years], rel=1e-9, abs=0.051), field
+
+
+def test_single_run_matches_first_batch_row():
+    params = make_params()
+    options = SimulationRunOptions(start_year_override=START_YEAR, include_gravel=False)
+
+    single = engine.run_ronet_simulation(params.project_id, params, NETWORK_PROFILE, options)
+    batch = engine.run_ronet_simulation_batch(
+        params.project_id, params, NETWORK_PROFILE,
+        SimulationBatchRequest(start_year_override=START_YEAR, variants=[SimulationVariant(include_gravel=False)]),
+    )
+
+    row = batch.variants[0]
+    assert single.year_count == batch.year_count == params.analysis_duration
+    assert [y.avg_condition_index for y in single.yearly_data] == row.avg_condition_index
+    assert [y.total_maintenance_cost for y in single.yearly_data] == row.total_maintenance_cost
+    assert [y.asset_value for y in single.yearly_data] == row.asset_value
+    assert single.total_cost_npv == row.total_cost_npv
+    assert single.final_network_condition == row.final_network_condition
+
+
+def test_stream_matches_batch():
+    params = make_params(duration=8)
+    request = SimulationBatchRequest(start_year_override=START_YEAR, variants=VARIANTS)
+
+    batch = engine.run_ronet_simulation_batch(params.project_id, params, NETWORK_PROFILE, request)
+    events = list(engine.stream_ronet_simulation_batch(params, NETWORK_PROFILE, request))
+
+    years = [e for e in events if e["type"] == "year"]
+    summaries = [e for e in events if e["type"] == "summary"]
+    assert len(years) == len(VARIANTS) * 8
+    for e in years:
+        result = batch.variants[e["variant"]]
+        i = e["year"] - START_YEAR
+        assert e["avg_condition_index"] == result.avg_condition_index[i]
+        assert e["total_maintenance_cost"] == result.total_maintenance_cost[i]
+        assert e["asset_value"] == result.asset_value[i]
+    for e in summaries:
+        result = batch.variants[e["variant"]]
+        assert e["total_cost_npv"] == result.total_cost_npv
+        assert e["final_network_condition"] == result.final_network_condition
+
+
+FIELDS = ("avg_condition_index", "pct_good", "pct_fair", "pct_poor", "total_maintenance_cost", "asset_value")
+
+# (budget_cap in start-year Rand, decay_scale): uncapped, binding caps, a cap above need, no budget
+CAPS = [(np.inf, 1.0), (2.0e9, 1.0), (1.0e9, 1.4), (5.0e8, 0.6), (1.0e12, 1.0), (0.0, 1.0)]
+
+
+def capped_batch(params, n_rows=len(CAPS)):
+    base = engine.build_scenario_batch(params, NETWORK_PROFILE, [SimulationVariant()] * n_rows)
+    base.budget_cap = np.array([c for c, _ in CAPS[:n_rows]])
+    base.decay_scale = np.array([d for _, d in CAPS[:n_rows]])
+    return base
+
+
+def assert_row_matches(result, k, years, npv):
+    assert result.total_cost_npv[k] == pytest.approx(npv, rel=1e-9)
+    for field in FIELDS:
+        assert getattr(result, field)[k] == pytest.approx([y[field] for y in years], rel=1e-9, abs=1e-6), field
+
+
+def test_capped_batch_matches_scalar_loop():
+    params = make_params(duration=40)
+
+    result = engine.run_ronet_batch(capped_batch(params), 40, START_YEAR)
+
+    for k, (cap, decay_scale) in enumerate(CAPS):
+        years, npv = scalar_run(params, NETWORK_PROFILE, budget_cap=None if np.isinf(cap) else cap,
+                                decay_scale=decay_scale)
+        assert_row_matches(result, k, years, npv)
+    # the tight caps really bind: condition falls instead of improving
+    assert result.avg_condition_index[3, -1] < NETWORK_PROFILE["avgVci"] < result.avg_condition_index[0, -1]
+
+
+@pytest.mark.parametrize("k", range(len(CAPS)))
+def test_one_row_fast_path_matches_vectorized_rows(k):
+    params = make_params(duration=25)
+    vectorized = engine.run_ronet_batch(capped_batch(params), 25, START_YEAR)
+    batch = capped_batch(params)
+
+    single = engine.run_ronet_batch(
+        engine.ScenarioBatch(**{f: getattr(batch, f)[k:k + 1] for f in engine.ScenarioBatch.__dataclass_fields__}),
+        25, START_YEAR,
+    )
+
+    for field in (*FIELDS, "cumulative_cost_npv"):
+        np.testing.assert_allclose(getattr(single, field)[0], getattr(vectorized, field)[k], rtol=1e-12)
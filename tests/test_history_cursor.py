@@ -0,0 +1,86 @@
+import base64
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from app.computation.router import _decode_cursor, _encode_cursor, _history_page
+
+
+def test_cursor_round_trip():
+    run_at = datetime(2030, 1, 2, 3, 4, 5, 678901, tzinfo=timezone(timedelta(hours=2)))
+    run_id = uuid.uuid4()
+
+    cursor = _encode_cursor(run_at, run_id)
+
+    assert cursor.isascii() and "|" not in cursor
+    assert _decode_cursor(cursor) == (run_at, str(run_id))
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64 at all!",
+    base64.urlsafe_b64encode(b"2030-01-02T03:04:05+00:00").decode(),            # no id
+    base64.urlsafe_b64encode(b"yesterday|" + str(uuid.uuid4()).encode()).decode(),
+    base64.urlsafe_b64encode(b"2030-01-02T03:04:05+00:00|not-a-uuid").decode(),
+    base64.urlsafe_b64encode(b"\xff\xfe|\xfd").decode(),
+    "café",
+])
+def test_bad_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as exc:
+        _decode_cursor(cursor)
+    assert exc.value.status_code == 400
+
+
+class _Cursor:
+    def __init__(self, rows):
+        self.rows = rows
+        self.description = [("id",), ("run_at",)]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params):
+        self.sql, self.params = sql, params
+
+    def fetchall(self):
+        return self.rows
+
+
+class _Conn:
+    def __init__(self, rows):
+        self.cur = _Cursor(rows)
+
+    def cursor(self):
+        return self.cur
+
+
+def _rows(n):
+    start = datetime(2030, 1, 1, tzinfo=timezone.utc)
+    return [(uuid.uuid4(), start - timedelta(hours=i)) for i in range(n)]
+
+
+def test_history_page_returns_next_cursor_from_last_row():
+    rows = _rows(3)
+    conn = _Conn(rows)
+
+    runs, next_cursor = _history_page(conn, uuid.uuid4(), "sr.id, sr.run_at", 2, None)
+
+    assert [r["id"] for r in runs] == [rows[0][0], rows[1][0]]
+    assert conn.cur.params[-1] == 3                       # one extra row to detect a next page
+    assert _decode_cursor(next_cursor) == (rows[1][1], str(rows[1][0]))
+
+
+def test_history_page_last_page_and_keyset_params():
+    rows = _rows(2)
+    conn = _Conn(rows)
+    cursor = _encode_cursor(rows[0][1], rows[0][0])
+
+    runs, next_cursor = _history_page(conn, uuid.uuid4(), "sr.id, sr.run_at", 2, cursor)
+
+    assert len(runs) == 2 and next_cursor is None
+    assert "(sr.run_at, sr.id) < (%s, %s)" in conn.cur.sql
+    assert conn.cur.params[1:3] == [rows[0][1], str(rows[0][0])]
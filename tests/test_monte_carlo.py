@@ -0,0 +1,28 @@
+from app.computation.monte_carlo import run_monte_carlo
+from app.computation.schemas import MonteCarloRequest
+
+from .test_engine_batch import NETWORK_PROFILE, START_YEAR, make_params
+
+
+def _run(**spec):
+    params = make_params(duration=10)
+    request = MonteCarloRequest(draws=500, seed=7, start_year_override=START_YEAR, **spec)
+    return run_monte_carlo(params.project_id, params, NETWORK_PROFILE, request)
+
+
+def test_maintained_network_has_a_vci_band():
+    band = _run().avg_condition_index
+
+    assert all(lo < hi for lo, hi in zip(band.p10[:5], band.p90[:5]))
+
+
+def test_without_improvement_spread_the_funded_vci_is_flat():
+    band = _run(improvement_cv=0.0).avg_condition_index
+
+    assert band.p10 == band.p50 == band.p90
+
+
+def test_decay_spread_moves_do_nothing_runs():
+    band = _run(include_paved=False, include_gravel=False, improvement_cv=0.0).avg_condition_index
+
+    assert band.p10[-1] < band.p90[-1]
@@ -0,0 +1,20 @@
+import asyncio
+
+from psycopg2.errors import InsufficientPrivilege
+
+from app.db.rls import PERMISSION_ERRORS
+from app.main import app
+
+
+def test_rls_refusals_are_a_404():
+    for exc in PERMISSION_ERRORS:
+        handler = app.exception_handlers[exc]
+        response = asyncio.run(handler(None, exc("new row violates row-level security policy")))
+
+        assert response.status_code == 404
+        assert b"row-level security" not in response.body
+
+
+def test_both_drivers_are_covered():
+    assert InsufficientPrivilege in PERMISSION_ERRORS
+    assert any(e.__module__.startswith("asyncpg") for e in PERMISSION_ERRORS)
@@ -0,0 +1,104 @@
+import io
+import uuid
+
+import pandas as pd
+import pytest
+
+from app.routers import provincial_stats
+from app.routers.provincial_stats import _STAT_COLUMNS, _clean_chunk, _read_chunks, _update_stats
+
+COLUMNS = list(_STAT_COLUMNS.values())
+
+
+def _sheet_row(name, *values):
+    """One sheet row: name in column 0, values at the _STAT_COLUMNS positions."""
+    row = [name] + [None] * max(_STAT_COLUMNS)
+    for src, value in zip(_STAT_COLUMNS, values):
+        row[src] = value
+    return row
+
+
+def test_clean_chunk_parses_currency_and_skips_totals():
+    df = pd.DataFrame([
+        _sheet_row(" Gauteng ", "1,200", 3, "4.5", None, "R 10", "55%", "1 000", "R2,500.75"),
+        _sheet_row("Total", 1, 1, 1, 1, 1, 1, 1, 1),
+        _sheet_row("Province", "km", "km", "km", "km", "km", "vci", "vkm", "fuel"),
+        _sheet_row(None, 1, 1, 1, 1, 1, 1, 1, 1),
+        _sheet_row("Limpopo", "n/a", "", 2, 3, 4, 60, 7, 8),
+    ], dtype=object)
+
+    out = _clean_chunk(df)
+
+    assert list(out.columns) == ["province_name", *COLUMNS]
+    assert out["province_name"].tolist() == ["Gauteng", "Limpopo"]
+    gauteng, limpopo = (dict(zip(out.columns, r)) for r in out.itertuples(index=False, name=None))
+    assert gauteng == {
+        "province_name": "Gauteng", "km_arid": 1200.0, "km_semi_arid": 3.0, "km_dry_sub_humid": 4.5,
+        "km_moist_sub_humid": 0.0, "km_humid": 10.0, "avg_vci": 55.0, "vehicle_km": 1000.0,
+        "fuel_sales": 2500.75,
+    }
+    assert limpopo["km_arid"] == 0.0 and limpopo["km_semi_arid"] == 0.0
+    assert out[COLUMNS].dtypes.eq(float).all()
+
+
+def test_clean_chunk_keeps_numeric_columns_as_is():
+    df = pd.DataFrame([_sheet_row("Free State", 1.5, 2, 3, 4, 5, 60.25, 7, 8)])
+
+    out = _clean_chunk(df)
+
+    assert out.iloc[0]["km_arid"] == 1.5 and out.iloc[0]["avg_vci"] == 60.25
+
+
+class _Upload:
+    def __init__(self, filename, data):
+        self.filename = filename
+        self.file = io.BytesIO(data)
+
+
+def test_read_chunks_csv_skips_headers_and_chunks(monkeypatch):
+    monkeypatch.setattr(provincial_stats, "_CHUNK_ROWS", 2)
+    lines = ["h,h,h,h,h,h,h,h,h,h,h"] * 3 + [
+        ",".join(str(v) if v is not None else "" for v in _sheet_row(f"P{i}", *range(8))) for i in range(5)
+    ]
+
+    chunks = list(_read_chunks(_Upload("Book1.CSV", "\n".join(lines).encode())))
+
+    assert [len(c) for c in chunks] == [2, 2, 1]
+    assert pd.concat(_clean_chunk(c) for c in chunks)["province_name"].tolist() == [f"P{i}" for i in range(5)]
+
+
+class _Conn:
+    def cursor(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def test_update_stats_keeps_the_last_row_per_province(monkeypatch):
+    sent = []
+    monkeypatch.setattr(
+        provincial_stats, "execute_values",
+        lambda cur, sql, rows, template: sent.extend(rows),
+    )
+    project_id = uuid.uuid4()
+
+    _update_stats(_Conn(), project_id, [
+        ("Gauteng", *[1.0] * len(COLUMNS)),
+        ("Limpopo", *[2.0] * len(COLUMNS)),
+        ("Gauteng", *[3.0] * len(COLUMNS)),
+    ])
+
+    assert sent == [
+        (str(project_id), "Gauteng", *[3.0] * len(COLUMNS)),
+        (str(project_id), "Limpopo", *[2.0] * len(COLUMNS)),
+    ]
+
+
+def test_update_stats_without_rows_sends_nothing(monkeypatch):
+    monkeypatch.setattr(provincial_stats, "execute_values", pytest.fail)
+
+    _update_stats(_Conn(), uuid.uuid4(), [])
@@ -0,0 +1,45 @@
+from app.computation import results_codec
+
+ROWS_PAYLOAD = {
+    "project_id": "p-1",
+    "year_count": 2,
+    "total_cost_npv": 1234.5,
+    "final_network_condition": 57.5,
+    "yearly_data": [
+        {"year": 2030, "avg_condition_index": 55.0, "pct_good": 37.5, "pct_fair": 40.0, "pct_poor": 22.5,
+         "total_maintenance_cost": 1000.0, "asset_value": 5000.0},
+        {"year": 2031, "avg_condition_index": 57.5, "pct_good": 41.3, "pct_fair": 40.0, "pct_poor": 18.8,
+         "total_maintenance_cost": None, "asset_value": 5300.0},
+    ],
+}
+
+
+def test_columnar_round_trip_is_lossless():
+    columnar = results_codec.to_columnar(ROWS_PAYLOAD)
+
+    assert results_codec.is_columnar(columnar)
+    assert columnar["format"] == "columnar"
+    assert columnar["yearly_data"]["year"] == [2030, 2031]
+    assert columnar["yearly_data"]["total_maintenance_cost"] == [1000.0, None]
+    assert results_codec.to_rows(columnar) == ROWS_PAYLOAD
+
+
+def test_conversions_are_idempotent():
+    columnar = results_codec.to_columnar(ROWS_PAYLOAD)
+
+    assert results_codec.to_rows(ROWS_PAYLOAD) is ROWS_PAYLOAD
+    assert results_codec.to_columnar(columnar) is columnar
+
+
+def test_empty_payloads():
+    assert results_codec.to_columnar(None) is None
+    assert results_codec.to_rows(None) is None
+    assert results_codec.to_rows(results_codec.to_columnar({"yearly_data": []})) == {"yearly_data": []}
+
+
+def test_present_run_returns_the_requested_shape():
+    row = {"id": "r-1", "results_payload": results_codec.to_columnar(ROWS_PAYLOAD)}
+
+    assert results_codec.present_run(row)["results_payload"] == ROWS_PAYLOAD
+    assert results_codec.is_columnar(results_codec.present_run(row, "columnar")["results_payload"])
+    assert results_codec.is_columnar(row["results_payload"])   # input left alone
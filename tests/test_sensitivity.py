@@ -0,0 +1,28 @@
+from app.computation.schemas import SensitivityRequest
+from app.computation.sensitivity import run_sensitivity
+
+from .test_engine_batch import NETWORK_PROFILE, START_YEAR, make_params
+
+
+def _run(**spec):
+    params = make_params(duration=10)
+    request = SensitivityRequest(start_year_override=START_YEAR, **spec)
+    return run_sensitivity(params.project_id, params, NETWORK_PROFILE, request)
+
+
+def test_every_bar_moves_the_ranking_metric():
+    for rank_by in ("total_cost_npv", "final_network_condition"):
+        out = _run(rank_by=rank_by)
+        assert out.bars and all(b.swing > 0 for b in out.bars)
+
+
+def test_final_condition_is_driven_by_start_vci_and_improvement():
+    out = _run(rank_by="final_network_condition")
+
+    assert {b.assumption for b in out.bars} == {"avg_vci", "improvement_rate"}
+
+
+def test_do_nothing_condition_is_driven_by_decay():
+    out = _run(rank_by="final_network_condition", include_paved=False, include_gravel=False)
+
+    assert "decay_rate" in {b.assumption for b in out.bars}